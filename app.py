@@ -5,20 +5,29 @@ from dash import Dash, dcc, html
 # --- Local Module Imports ---
 # These imports bring in the UI components and callback logic from other files.
 from components.tabs import create_main_tabs
+from components.subcomponents.zone_selector import create_zone_selector
 from callbacks.market_callbacks import register_market_callbacks
-from callbacks.ev_callbacks import register_ev_callbacks
+from callbacks.ev_callbacks import register_ev_callbacks, JOB_POLL_INTERVAL_MS
+from callbacks.tab_callbacks import register_tab_callbacks
+from callbacks.api_routes import register_api_routes
+from callbacks.metrics_routes import register_metrics_routes
+from utils.prefetch import start_prefetcher
 
 # --- Constants ---
 # Define the application's primary timezone. All time-sensitive calculations and displays will use this.
 GERMAN_TIMEZONE = pytz.timezone('Europe/Berlin')
 
-def create_app() -> Dash:
+def create_app(prefetch: bool = True) -> Dash:
     """
     Creates and configures the main Dash application instance.
     
     This factory pattern encapsulates the app's setup, making it reusable,
     testable, and easier to manage.
 
+    Args:
+        prefetch (bool): Start the background price prefetcher. Benchmarks and tests pass
+            False, so the app makes no network requests of its own.
+
     Returns:
         Dash: The configured Dash application object.
     """
@@ -41,15 +50,25 @@ def create_app() -> Dash:
         # Centralized Data Storage using dcc.Store.
         # These components store data in the user's browser session, not on the server.
         dcc.Store(id='market-data-store'),      # Caches raw price data fetched from the Awattar API.
-        dcc.Store(id='ev-config-store'),        # Persists the user's EV configuration form data.
-        dcc.Store(id='analysis-results-store'), # Caches the results of the charging recommendation engine.
+        dcc.Store(id='analysis-results-store'), # Key of the current recommendation in the server-side result store.
+        dcc.Store(id='market-data-version'),    # Last slot of the stored prices, used to detect newly published slots.
+        dcc.Store(id='rendered-tabs', data=[]), # Tabs whose content has already been rendered into the page.
+        dcc.Store(id='analysis-job-store'),     # Id of the background analysis currently running for this session.
+
+        # Periodic check for newly published prices (every 5 minutes).
+        dcc.Interval(id='price-update-interval', interval=5 * 60 * 1000),
+        # Progress polling for background analyses, enabled only while one is running.
+        dcc.Interval(id='analysis-job-interval', interval=JOB_POLL_INTERVAL_MS, disabled=True),
 
         # Static Page Header
         html.Div(className='header-container', children=[
             html.H1("⚡ GridAware – Smart EV Charging Dashboard", className='header-title'),
-            html.P("Optimize your EV charging based on real-time German electricity prices.", className='header-subtitle')
+            html.P("Optimize your EV charging based on real-time day-ahead electricity prices.", className='header-subtitle')
         ]),
 
+        # Bidding zone selection, shared by the market and EV tabs.
+        create_zone_selector(),
+
         # Main Content Area, organized into tabs.
         create_main_tabs()
     ])
@@ -58,7 +77,22 @@ def create_app() -> Dash:
     # Callbacks are the functions that connect UI components (like buttons and dropdowns)
     # to the application's logic. They are registered with the app instance here.
     register_market_callbacks(app, GERMAN_TIMEZONE)
-    register_ev_callbacks(app)
+    register_ev_callbacks(app, GERMAN_TIMEZONE)
+    register_tab_callbacks(app)
+
+    # --- JSON API ---
+    # Headless endpoints on the Flask server for wallbox controllers and fleet backends.
+    register_api_routes(server, GERMAN_TIMEZONE)
+
+    # --- Metrics ---
+    # Callback stage timings, payload sizes, upstream latency and cache statistics at /metrics.
+    register_metrics_routes(app)
+
+    # --- Background Price Prefetching ---
+    # Keeps the shared price cache fresh and a warm copy in memory, so page loads never wait on
+    # disk or the Awattar API.
+    if prefetch:
+        start_prefetcher(GERMAN_TIMEZONE)
 
     return app
 
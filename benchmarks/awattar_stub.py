@@ -0,0 +1,85 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the Awattar market data endpoint, so fetch and parse paths can be
+# exercised without network access or rate limits. Latency and failures can be injected, and
+# changed while the server runs (server.latency_s, server.failure_rate), to simulate outages.
+
+# Usage (from the project root), e.g. a slow and flaky upstream with two weeks of 15-minute prices:
+#   python -m benchmarks.awattar_stub --days 14 --resolution 15 --latency-ms 800 --failure-rate 0.2 --port 8081
+#   GRIDAWARE_AWATTAR_URL=http://127.0.0.1:8081/v1/marketdata python app.py
+
+def _make_handler(records):
+    starts = [r['start_timestamp'] for r in records]
+
+    class AwattarStubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/v1/marketdata':
+                self.send_error(404)
+                return
+            if self.server.latency_s:
+                time.sleep(self.server.latency_s)
+            if random.random() < self.server.failure_rate:
+                self.send_error(self.server.failure_status)
+                return
+            # Like the real API, only slots starting in [start, end) are returned
+            query = parse_qs(url.query)
+            start = int(query.get('start', [starts[0] if starts else 0])[0])
+            end = int(query.get('end', [starts[-1] + 1 if starts else 0])[0])
+            data = [r for r, ts in zip(records, starts) if start <= ts < end]
+            body = json.dumps({'object': 'list', 'data': data, 'url': '/at/v1/marketdata'}).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return AwattarStubHandler
+
+def start_stub_server(records, host='127.0.0.1', port=0, latency_s=0.0, failure_rate=0.0, failure_status=503):
+    """
+    Serves `records` (Awattar-format dicts) on a background thread. Each request is delayed by
+    latency_s and fails with failure_status with probability failure_rate.
+    Returns (server, url), where url can replace utils.price_api.API_URL.
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(records))
+    server.latency_s, server.failure_rate, server.failure_status = latency_s, failure_rate, failure_status
+    threading.Thread(target=server.serve_forever, name='awattar-stub', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/marketdata"
+
+def main():
+    from benchmarks.synthetic_prices import synthetic_awattar_records
+
+    parser = argparse.ArgumentParser(description="Serve synthetic day-ahead prices in the Awattar API format.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--days', type=float, default=2, help="Length of the served series in days, starting at the next full hour.")
+    parser.add_argument('--resolution', type=int, default=60, help="Slot length in minutes.")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Delay added to every response.")
+    parser.add_argument('--failure-rate', type=float, default=0, help="Fraction of requests answered with --failure-status.")
+    parser.add_argument('--failure-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    records = synthetic_awattar_records(args.days, args.resolution, args.seed)
+    server, url = start_stub_server(records, args.host, args.port, args.latency_ms / 1000,
+                                    args.failure_rate, args.failure_status)
+    print(f"Serving {len(records)} slots at {url}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
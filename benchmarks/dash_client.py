@@ -0,0 +1,42 @@
+import json
+
+# Builds request bodies for Dash's /_dash-update-component endpoint, so callbacks can be
+# exercised through the full server path (deserialization, callback, response serialization).
+
+def find_callback_id(app, output):
+    """
+    Returns the callback_map key of the callback whose outputs include `output` ('id.property').
+    `app` is a Dash app or a callback map fetched with remote_callback_map.
+    """
+    for callback_id in getattr(app, 'callback_map', app):
+        outputs = [part.split('@')[0] for part in callback_id.strip('.').split('...')]
+        if output in outputs:
+            return callback_id
+    raise KeyError(f"No callback writes to {output}.")
+
+def callback_payload(app, output, input_values, state_values=()):
+    """
+    Request body for the callback writing to `output`, with its Inputs and States set to the given
+    values (in declaration order). The first Input is marked as the one that triggered the call.
+    """
+    callback_id = find_callback_id(app, output)
+    spec = getattr(app, 'callback_map', app)[callback_id]
+    inputs = [{**dep, 'value': value} for dep, value in zip(spec['inputs'], input_values)]
+    state = [{**dep, 'value': value} for dep, value in zip(spec.get('state', []), state_values)]
+    return {
+        'output': callback_id,
+        'inputs': inputs,
+        'state': state,
+        'changedPropIds': [f"{inputs[0]['id']}.{inputs[0]['property']}"]
+    }
+
+def remote_callback_map(session, base_url):
+    """Callback map of a running server, from /_dash-dependencies, in the shape of app.callback_map."""
+    response = session.get(f"{base_url}/_dash-dependencies", timeout=30)
+    response.raise_for_status()
+    return {dep['output']: {'inputs': dep['inputs'], 'state': dep['state']} for dep in response.json()}
+
+def post_callback(client, payload):
+    """Posts a payload with a Flask test client and returns (status_code, response bytes)."""
+    response = client.post('/_dash-update-component', data=json.dumps(payload), content_type='application/json')
+    return response.status_code, response.get_data()
@@ -0,0 +1,305 @@
+import os
+import sys
+import glob
+import json
+import time
+import random
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import importlib.util
+
+import numpy as np
+import requests
+
+from benchmarks.awattar_stub import start_stub_server
+from benchmarks.synthetic_prices import synthetic_awattar_records
+from benchmarks.dash_client import callback_payload, remote_callback_map
+
+# --- Constants ---
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WORKERS = os.cpu_count() or 2
+DEFAULT_THREADS = 4
+REQUEST_TIMEOUT_SECONDS = 60
+STARTUP_TIMEOUT_SECONDS = 60
+PERCENTILES = (50, 95, 99)
+# EV configuration entered by simulated users; the current SoC varies per iteration so that
+# only part of the analyses are served from the shared result cache.
+EV_CONFIG = {'capacity': 60, 'soc_target': 80, 'max_power': 11, 'efficiency': 90}
+SOC_CURRENT_CHOICES = tuple(range(10, 75, 5))
+# Banner prefixes of update_market_data, mapped to where the prices came from
+PRICE_SOURCE_BANNERS = (
+    ("Successfully fetched", 'api'),
+    ("Displaying latest", 'api'),
+    ("Fetch failed", 'fallback'),
+    ("Displaying cached data", 'fallback'),
+)
+
+# Usage (from the project root):
+#   python -m benchmarks.load_test --workers 4 --sessions 32 --duration 60
+#   python -m benchmarks.load_test --latency-ms 2000 --failure-rate 0.3 --outage --output load.json
+
+# --- Server ---
+
+def serve_prefork(host, port, workers):
+    """
+    Minimal pre-forking WSGI server used when gunicorn is not installed. The listening socket is
+    opened once; each forked worker builds its own app from wsgi.py and serves a thread per request.
+    """
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(1024)
+    listener.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            from wsgi import server
+            make_server(host, port, server, threaded=True, request_handler=QuietHandler,
+                        fd=listener.fileno()).serve_forever()
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+def start_app_server(workdir, host, port, workers, threads, env):
+    """Starts create_app() under gunicorn if available, else under serve_prefork. Returns (process, kind)."""
+    if importlib.util.find_spec('gunicorn') is not None:
+        command = [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+                   '--bind', f'{host}:{port}', '--log-level', 'warning', 'wsgi:server']
+        kind = 'gunicorn'
+    else:
+        command = [sys.executable, '-c',
+                   f"from benchmarks.load_test import serve_prefork; serve_prefork({host!r}, {port}, {workers})"]
+        kind = 'prefork'
+    process = subprocess.Popen(command, cwd=workdir, env=env, start_new_session=True)
+    return process, kind
+
+def wait_until_ready(base_url, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App server exited with code {process.returncode} during start-up.")
+        try:
+            if requests.get(base_url + '/', timeout=5).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"App server did not answer within {STARTUP_TIMEOUT_SECONDS} s.")
+
+def _free_port(host):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
+
+# --- Simulated Sessions ---
+
+def price_source(response):
+    """Classifies an update_market_data response as 'api', 'fallback' or 'unavailable'."""
+    text = response.get('status-banner', {}).get('children') or ''
+    for prefix, source in PRICE_SOURCE_BANNERS:
+        if text.startswith(prefix):
+            return 'unavailable' if "No cached data" in text else source
+    return 'unavailable'
+
+class LoadRecorder:
+    """Thread-safe collection of (step, latency, outcome) samples for one test phase."""
+
+    def __init__(self):
+        self.samples = []
+        self.sources = {}
+        self.sessions_completed = 0
+        self._lock = threading.Lock()
+
+    def add(self, step, seconds, outcome):
+        with self._lock:
+            self.samples.append((step, seconds, outcome))
+
+    def add_source(self, source):
+        with self._lock:
+            self.sources[source] = self.sources.get(source, 0) + 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions_completed += 1
+
+def post_timed(session, base_url, payload, step, recorder):
+    """Posts one callback and records its latency. Returns the parsed response, or None on errors."""
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{base_url}/_dash-update-component", json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            recorder.add(step, elapsed, f"http_{response.status_code}")
+            return None
+        recorder.add(step, elapsed, 'ok')
+        return response.json()['response']
+    except requests.exceptions.Timeout:
+        recorder.add(step, time.perf_counter() - started, 'timeout')
+    except requests.exceptions.RequestException:
+        recorder.add(step, time.perf_counter() - started, 'connection_error')
+    except (ValueError, KeyError):
+        recorder.add(step, time.perf_counter() - started, 'invalid_response')
+    return None
+
+def run_session(base_url, callbacks, deadline, recorder, seed):
+    """
+    One simulated user, repeated until the deadline: page load (prices from the warm copy),
+    an analysis, then 'Fetch Latest Prices' (shared cache, upstream or fallback).
+    """
+    rng = random.Random(seed)
+    session = requests.Session()
+    page_load = callback_payload(callbacks, 'market-data-store.data', [0, 'DE'])
+    page_load['changedPropIds'] = []
+    fetch = callback_payload(callbacks, 'market-data-store.data', [1, 'DE'])
+
+    while time.monotonic() < deadline:
+        response = post_timed(session, base_url, page_load, 'page_load', recorder)
+        store = (response or {}).get('market-data-store', {}).get('data')
+        if store is None:
+            # Nothing warm yet in this worker; the user clicks fetch first
+            response = post_timed(session, base_url, fetch, 'fetch_prices', recorder)
+            store = (response or {}).get('market-data-store', {}).get('data')
+
+        if store is not None:
+            analysis = callback_payload(callbacks, 'analysis-results-store.data', [1], [
+                store, EV_CONFIG['capacity'], rng.choice(SOC_CURRENT_CHOICES), EV_CONFIG['soc_target'],
+                EV_CONFIG['max_power'], EV_CONFIG['efficiency'], 'contiguous', None, 80, 25, None
+            ])
+            post_timed(session, base_url, analysis, 'run_analysis', recorder)
+
+        response = post_timed(session, base_url, fetch, 'fetch_prices', recorder)
+        if response is not None:
+            recorder.add_source(price_source(response))
+        recorder.session_done()
+
+def run_phase(base_url, callbacks, sessions, duration_s):
+    recorder = LoadRecorder()
+    deadline = time.monotonic() + duration_s
+    threads = [threading.Thread(target=run_session, args=(base_url, callbacks, deadline, recorder, i), daemon=True)
+               for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.perf_counter() - started)
+
+# --- Report ---
+
+def summarize(recorder, elapsed_s):
+    """Latency percentiles, throughput and error rates per step, plus fetch outcomes."""
+    steps = {}
+    for step in sorted({s[0] for s in recorder.samples}):
+        latencies = np.array([s[1] for s in recorder.samples if s[0] == step])
+        outcomes = [s[2] for s in recorder.samples if s[0] == step]
+        errors = {o: outcomes.count(o) for o in sorted(set(outcomes)) if o != 'ok'}
+        steps[step] = {
+            'requests': len(outcomes),
+            'throughput_rps': len(outcomes) / elapsed_s,
+            'error_rate': sum(errors.values()) / len(outcomes),
+            'errors': errors,
+            **{f"p{p}_ms": float(np.percentile(latencies, p)) * 1000 for p in PERCENTILES}
+        }
+    total = len(recorder.samples)
+    return {
+        'elapsed_s': elapsed_s,
+        'requests': total,
+        'throughput_rps': total / elapsed_s,
+        'error_rate': sum(1 for s in recorder.samples if s[2] != 'ok') / total if total else 0.0,
+        'sessions_per_second': recorder.sessions_completed / elapsed_s,
+        'fetch_sources': recorder.sources,
+        'steps': steps
+    }
+
+def print_report(name, summary):
+    print(f"\n== {name}: {summary['requests']} requests in {summary['elapsed_s']:.1f} s, "
+          f"{summary['throughput_rps']:.1f} req/s, {summary['sessions_per_second']:.2f} sessions/s, "
+          f"error rate {summary['error_rate']:.1%}")
+    print(f"{'step':<16}{'requests':>10}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for step, stats in summary['steps'].items():
+        print(f"{step:<16}{stats['requests']:>10}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['error_rate']:>9.1%}")
+        if stats['errors']:
+            print(f"{'':<16}errors: {', '.join(f'{k}={v}' for k, v in stats['errors'].items())}")
+    if summary['fetch_sources']:
+        print(f"fetch outcomes: {', '.join(f'{k}={v}' for k, v in sorted(summary['fetch_sources'].items()))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard under a multi-worker server against a local Awattar stand-in.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Server worker processes.")
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help="Threads per gunicorn worker.")
+    parser.add_argument('--sessions', type=int, default=16, help="Concurrent simulated sessions.")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds per phase.")
+    parser.add_argument('--days', type=float, default=2, help="Length of the served price series in days.")
+    parser.add_argument('--resolution', type=int, default=60, help="Slot length of the served series in minutes.")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Upstream response delay.")
+    parser.add_argument('--failure-rate', type=float, default=0, help="Fraction of upstream requests that fail.")
+    parser.add_argument('--outage', action='store_true',
+                        help="Add a second phase in which every upstream request fails and the shared caches have expired.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--output', help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    records = synthetic_awattar_records(args.days, args.resolution)
+    stub, stub_url = start_stub_server(records, args.host, 0, args.latency_ms / 1000, args.failure_rate)
+    port = _free_port(args.host)
+    base_url = f"http://{args.host}:{port}"
+    env = {
+        **os.environ,
+        'PYTHONPATH': PROJECT_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''),
+        'GRIDAWARE_AWATTAR_URL': stub_url,
+        'GRIDAWARE_AWATTAR_AT_URL': stub_url,
+    }
+
+    report = {'config': vars(args), 'phases': {}}
+    with tempfile.TemporaryDirectory(prefix='gridaware-load-') as workdir:
+        # A scratch data directory, so the test never touches the real price cache or archive
+        os.makedirs(os.path.join(workdir, 'data'))
+        process, kind = start_app_server(workdir, args.host, port, args.workers, args.threads, env)
+        try:
+            wait_until_ready(base_url, process)
+            callbacks = remote_callback_map(requests.Session(), base_url)
+            print(f"{kind} with {args.workers} workers at {base_url}; upstream stand-in at {stub_url}", file=sys.stderr)
+            report['server'] = kind
+
+            report['phases']['upstream_ok'] = run_phase(base_url, callbacks, args.sessions, args.duration)
+            print_report('upstream_ok', report['phases']['upstream_ok'])
+
+            if args.outage:
+                stub.failure_rate = 1.0
+                # Expire the shared caches so that fetches have to go upstream and fall back
+                for cache_file in glob.glob(os.path.join(workdir, 'data', 'price_cache*.json')):
+                    os.remove(cache_file)
+                report['phases']['upstream_outage'] = run_phase(base_url, callbacks, args.sessions, args.duration)
+                print_report('upstream_outage', report['phases']['upstream_outage'])
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=30)
+            stub.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import shutil
+import statistics
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+import pandas as pd
+import plotly
+import pytz
+
+import utils.price_api as price_api
+import utils.result_store as result_store
+from utils.ev_logic import find_optimal_charging, find_optimal_charging_deadline, find_cost_surface
+from utils.wire_format import encode_price_store
+from utils.price_series import PriceSeries
+from callbacks.market_callbacks import create_price_figure
+from callbacks import ev_callbacks
+from benchmarks.synthetic_prices import SERIES, LONG_SERIES, synthetic_awattar_records, synthetic_api_data
+from benchmarks.awattar_stub import start_stub_server
+from benchmarks.dash_client import callback_payload, post_callback
+
+# --- Constants ---
+BENCHMARK_TIMEZONE = pytz.timezone('Europe/Berlin')
+DEFAULT_CONFIG = {'capacity': 60.0, 'soc_current': 20.0, 'soc_target': 80.0, 'max_power': 11.0, 'efficiency': 90.0}
+# Deadline mode: departure at most 48 hours after the first slot, with a taper above 80% SoC
+DEADLINE_HOURS = 48
+DEADLINE_CONFIG = {**DEFAULT_CONFIG, 'soc_target': 95.0, 'power_curve': [[0, 11.0], [80, 11.0], [100, 2.75]]}
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+# Each case is repeated until it has run for at least MIN_TOTAL_SECONDS (bounded by the repeat limits).
+MIN_TOTAL_SECONDS = 0.5
+MIN_REPEATS = 3
+MAX_REPEATS = 50
+
+# Usage (from the project root):
+#   python -m benchmarks.run_benchmarks --output benchmark_results.json
+#   python -m benchmarks.run_benchmarks --quick --series 1d-60m,7d-15m
+
+def measure(func, setup=None):
+    """Runs func (after setup, which is not timed) repeatedly and returns timing statistics in seconds."""
+    if setup:
+        setup()
+    func()  # warm-up
+
+    timings = []
+    while len(timings) < MIN_REPEATS or (sum(timings) < MIN_TOTAL_SECONDS and len(timings) < MAX_REPEATS):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'max_s': max(timings),
+        'repeats': len(timings)
+    }
+
+def _benchmark_series(name, client, app):
+    """Times every benchmarked code path against one synthetic series."""
+    days, resolution_minutes = SERIES[name]
+    records = synthetic_awattar_records(days, resolution_minutes)
+    api_data = synthetic_api_data(days, resolution_minutes)
+    series = PriceSeries.from_api_data(api_data)
+    results = {}
+
+    # Parsing of the Awattar response, served by a local stand-in over HTTP
+    server, url = start_stub_server(records)
+    price_api.API_URL = url
+    start = pd.Timestamp(records[0]['start_timestamp'], unit='ms', tz='UTC').to_pydatetime()
+    end = pd.Timestamp(records[-1]['end_timestamp'], unit='ms', tz='UTC').to_pydatetime()
+    try:
+        results['fetch_market_prices'] = measure(lambda: price_api.fetch_market_prices(BENCHMARK_TIMEZONE, start, end))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results['find_optimal_charging'] = measure(lambda: find_optimal_charging(series, DEFAULT_CONFIG))
+    deadline_config = {**DEADLINE_CONFIG, 'departure_time': min(
+        series.start_times[0] + pd.Timedelta(hours=DEADLINE_HOURS),
+        series.start_times[-1] + pd.Timedelta(minutes=resolution_minutes)
+    )}
+    results['find_optimal_charging_deadline'] = measure(lambda: find_optimal_charging_deadline(series, deadline_config))
+    results['find_cost_surface'] = measure(
+        lambda: find_cost_surface(series, DEFAULT_CONFIG, *ev_callbacks.surface_axes(DEFAULT_CONFIG))
+    )
+    # Everything a fresh price version costs before the engine runs: parsing and local-time labels
+    results['parse_price_series'] = measure(
+        lambda: PriceSeries.from_api_data(api_data).local_labels(BENCHMARK_TIMEZONE)
+    )
+    results['create_price_figure'] = measure(lambda: create_price_figure(series, BENCHMARK_TIMEZONE).to_json())
+
+    analysis = find_optimal_charging(series, DEFAULT_CONFIG)
+    results['create_cost_breakdown_figure'] = measure(
+        lambda: ev_callbacks.create_cost_breakdown_figure(analysis['all_slots'], analysis['optimal_slot']['start_time']).to_json()
+    )
+
+    # Full callback through Dash's HTTP endpoint: computed, read from the result store written by
+    # another worker, and served from this process's cache
+    store = encode_price_store(series)
+    payload = callback_payload(app, 'analysis-results-store.data', [1], [
+        store, DEFAULT_CONFIG['capacity'], DEFAULT_CONFIG['soc_current'], DEFAULT_CONFIG['soc_target'],
+        DEFAULT_CONFIG['max_power'], DEFAULT_CONFIG['efficiency'], 'contiguous', None, 80, 25, None
+    ])
+
+    def run_analysis():
+        status, _ = post_callback(client, payload)
+        if status != 200:
+            raise RuntimeError(f"run_analysis returned HTTP {status}")
+
+    def clear_results():
+        ev_callbacks._analysis_cache.clear()
+        shutil.rmtree(result_store.RESULT_DIR, ignore_errors=True)
+
+    results['run_analysis'] = measure(run_analysis, setup=clear_results)
+    results['run_analysis_stored'] = measure(run_analysis, setup=ev_callbacks._analysis_cache.clear)
+    results['run_analysis_cached'] = measure(run_analysis)
+
+    return {f"{case}[{name}]": {**timing, 'slots': len(records)} for case, timing in results.items()}
+
+def check_thresholds(results, thresholds):
+    """Returns the cases whose median time exceeds the threshold (in seconds) recorded for them."""
+    regressions = []
+    for case, limit in thresholds.items():
+        if case in results and results[case]['median_s'] > limit:
+            regressions.append({'case': case, 'median_s': results[case]['median_s'], 'threshold_s': limit})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the price pipeline, engine, figures and callbacks.")
+    parser.add_argument('--series', default=','.join(SERIES), help=f"Series to run, comma-separated. Available: {', '.join(SERIES)}.")
+    parser.add_argument('--quick', action='store_true', help=f"Skip the long series ({', '.join(LONG_SERIES)}).")
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE, help="JSON file mapping case names to maximum median seconds.")
+    parser.add_argument('--output', help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    series_names = [s for s in args.series.split(',') if s and not (args.quick and s in LONG_SERIES)]
+    unknown = [s for s in series_names if s not in SERIES]
+    if unknown:
+        parser.error(f"Unknown series: {', '.join(unknown)}. Available: {', '.join(SERIES)}.")
+
+    thresholds_file = os.path.abspath(args.thresholds)
+    output_file = os.path.abspath(args.output) if args.output else None
+
+    # Run in a scratch directory so the benchmark never touches the real price cache or archive.
+    # The prefetcher stays off: it would fetch prices in the background while cases are timed.
+    results = {}
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='gridaware-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            os.makedirs('data')
+            from app import create_app
+            app = create_app(prefetch=False)
+            client = app.server.test_client()
+            # run_analysis would hand long series to the background job pool; time the inline path instead
+            ev_callbacks.BACKGROUND_JOB_MIN_SLOTS.clear()
+
+            for name in series_names:
+                print(f"Running {name} ...", file=sys.stderr)
+                results.update(_benchmark_series(name, client, app))
+        finally:
+            os.chdir(previous_cwd)
+
+    with open(thresholds_file, 'r') as f:
+        thresholds = json.load(f)
+    regressions = check_thresholds(results, thresholds)
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(dt_timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__
+        },
+        'results': results,
+        'regressions': regressions
+    }
+
+    for case, timing in results.items():
+        limit = thresholds.get(case)
+        limit_text = f"(limit {limit * 1000:.1f} ms)" if limit is not None else "(no limit)"
+        print(f"{case:<50} {timing['median_s'] * 1000:>10.2f} ms  {limit_text}")
+    if output_file:
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print(f"{len(regressions)} case(s) exceeded their thresholds.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+from benchmarks.run_benchmarks import THRESHOLDS_FILE, check_thresholds
+
+# --- Constants ---
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must not be imported by `import app`; they are loaded on first use instead.
+DEFERRED_MODULES = ('pandas', 'numpy', 'plotly.graph_objects', 'requests')
+DEFAULT_RUNS = 7
+
+# Usage (from the project root):
+#   python -m benchmarks.startup_time --runs 10
+
+# Runs in a fresh interpreter, so every measurement is a true cold start.
+_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import dash
+dash_done = time.perf_counter()
+import app
+import_done = time.perf_counter()
+deferred = [m for m in %r if m in sys.modules]
+app.create_app(prefetch=False)
+create_done = time.perf_counter()
+print(json.dumps({
+    'import_dash': dash_done - started,
+    'import_app': import_done - dash_done,
+    'create_app': create_done - import_done,
+    'total': create_done - started,
+    'eagerly_imported': deferred
+}))
+"""
+
+def measure_startup(runs=DEFAULT_RUNS):
+    """Starts `runs` fresh interpreters and returns the median time of each start-up phase."""
+    samples = []
+    env = {**os.environ, 'PYTHONPATH': PROJECT_ROOT + os.pathsep + os.environ.get('PYTHONPATH', '')}
+    with tempfile.TemporaryDirectory(prefix='gridaware-startup-') as workdir:
+        os.makedirs(os.path.join(workdir, 'data'))
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, '-c', _PROBE % (DEFERRED_MODULES,)],
+                cwd=workdir, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    phases = ('import_dash', 'import_app', 'create_app', 'total')
+    results = {
+        f"startup[{phase}]": {
+            'median_s': statistics.median(s[phase] for s in samples),
+            'min_s': min(s[phase] for s in samples),
+            'max_s': max(s[phase] for s in samples),
+            'repeats': runs
+        } for phase in phases
+    }
+    eagerly_imported = sorted({m for s in samples for m in s['eagerly_imported']})
+    return results, eagerly_imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start time of the app against the start-up budget.")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Number of fresh interpreters to start.")
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE, help="JSON file mapping case names to maximum median seconds.")
+    parser.add_argument('--output', help="Optional JSON file for the results.")
+    args = parser.parse_args()
+
+    results, eagerly_imported = measure_startup(args.runs)
+    with open(args.thresholds, 'r') as f:
+        thresholds = json.load(f)
+    regressions = check_thresholds(results, thresholds)
+
+    for case, timing in results.items():
+        limit = thresholds.get(case)
+        limit_text = f"(limit {limit * 1000:.1f} ms)" if limit is not None else "(no limit)"
+        print(f"{case:<30} {timing['median_s'] * 1000:>10.2f} ms  {limit_text}")
+    if eagerly_imported:
+        print(f"Imported at start-up although deferred: {', '.join(eagerly_imported)}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results, 'eagerly_imported': eagerly_imported, 'regressions': regressions}, f, indent=2)
+
+    if regressions or eagerly_imported:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
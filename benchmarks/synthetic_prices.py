@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+# Named series used by the benchmarks: (days, resolution in minutes).
+SERIES = {
+    '1d-60m': (1, 60),
+    '7d-15m': (7, 15),
+    '1y-60m': (365, 60),
+    '1y-15m': (365, 15),
+    '3y-15m': (3 * 365, 15),
+}
+# Series skipped by --quick runs.
+LONG_SERIES = ('1y-15m', '3y-15m')
+
+def synthetic_prices_eur_mwh(n_slots, resolution_minutes, seed=0):
+    """
+    Day-ahead-like prices in €/MWh: morning and evening peaks, a midday solar dip, cheaper
+    weekends, a seasonal swing, autocorrelated noise and occasional negative prices.
+    """
+    rng = np.random.default_rng(seed)
+    hours = np.arange(n_slots) * resolution_minutes / 60
+    hour_of_day = hours % 24
+    day = hours // 24
+
+    daily = (25 * np.exp(-((hour_of_day - 8) / 2) ** 2)
+             + 35 * np.exp(-((hour_of_day - 19) / 2.5) ** 2)
+             - 30 * np.exp(-((hour_of_day - 13) / 2.5) ** 2))
+    weekly = np.where(day % 7 >= 5, -15.0, 0.0)
+    seasonal = 20 * np.cos(2 * np.pi * day / 365)
+    noise = pd.Series(rng.normal(0, 8, n_slots)).ewm(alpha=0.3).mean().to_numpy()
+    spikes = rng.random(n_slots) < 0.002
+
+    prices = 90 + daily + weekly + seasonal + noise
+    prices[spikes] += rng.normal(0, 150, spikes.sum())
+    return np.round(prices, 2)
+
+def synthetic_awattar_records(days, resolution_minutes, seed=0, start=None):
+    """
+    Returns a series in the Awattar API format ([{'start_timestamp', 'end_timestamp',
+    'marketprice', 'unit'}, ...]), starting at `start` (default: the next full hour).
+    """
+    if start is None:
+        start = pd.Timestamp.now(tz='UTC').floor('h') + pd.Timedelta(hours=1)
+    n_slots = int(days * 24 * 60 // resolution_minutes)
+    start_ms = pd.Timestamp(start).value // 10**6 + np.arange(n_slots, dtype=np.int64) * resolution_minutes * 60_000
+    prices = synthetic_prices_eur_mwh(n_slots, resolution_minutes, seed)
+    return [{
+        'start_timestamp': int(ts),
+        'end_timestamp': int(ts) + resolution_minutes * 60_000,
+        'marketprice': float(price),
+        'unit': 'Eur/MWh'
+    } for ts, price in zip(start_ms, prices)]
+
+def synthetic_api_data(days, resolution_minutes, seed=0, start=None):
+    """Same series in the format returned by fetch_market_prices."""
+    records = synthetic_awattar_records(days, resolution_minutes, seed, start)
+    return {
+        'success': True,
+        'prices': [{
+            'start_time': pd.Timestamp(r['start_timestamp'], unit='ms', tz='UTC').isoformat(),
+            'price_eur_kwh': r['marketprice'] / 1000
+        } for r in records],
+        'resolution_minutes': resolution_minutes,
+        'timestamp': 'synthetic'
+    }
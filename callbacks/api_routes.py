@@ -0,0 +1,311 @@
+from flask import jsonify, request
+
+from utils.ev_logic import (
+    find_optimal_charging, find_optimal_charging_batch, find_optimal_charging_flexible, find_optimal_charging_deadline
+)
+from utils.fleet_scheduler import schedule_fleet_charging
+from utils.price_api import get_fallback_data
+from utils.price_cache import get_market_prices, future_prices_only
+from utils.price_sources import check_zone
+from utils.prefetch import get_warm_prices, on_new_prices
+from utils.zones import DEFAULT_ZONE
+from utils.price_series import PriceSeries
+from utils.lru_cache import LRUCache
+from callbacks.ev_callbacks import canonical_config, CONFIG_KEYS
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Constants ---
+# JSON endpoints for wallbox controllers and fleet backends. They share the price cache with
+# the dashboard but skip figure rendering and Dash's callback machinery.
+CHARGING_MODES = ('contiguous', 'flexible', 'deadline')
+MAX_BATCH_SIZE = 5000
+RESULT_CACHE_SIZE = 4096
+
+# Recommendations per (price-data version, mode, config)
+_api_results = LRUCache(RESULT_CACHE_SIZE)
+on_new_prices(_api_results.clear)
+
+def register_api_routes(server, timezone):
+    @server.route('/api/prices', methods=['GET'])
+    def api_prices():
+        zone = request.args.get('zone', DEFAULT_ZONE)
+        try:
+            check_zone(zone)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        series, source = get_current_prices(timezone, zone)
+        if series is None:
+            return jsonify({'success': False, 'error': "No market data is available."}), 503
+        return jsonify({
+            'success': True,
+            'zone': zone,
+            'source': source,
+            'price_version': series.version,
+            'timestamp': series.timestamp,
+            'resolution_minutes': series.resolution_minutes,
+            'prices': series.to_records()
+        })
+
+    @server.route('/api/recommendation', methods=['GET', 'POST'])
+    def api_recommendation():
+        try:
+            params = json_object_body() if request.method == 'POST' else request.args
+            mode = params.get('mode', 'contiguous')
+            zone = params.get('zone', DEFAULT_ZONE)
+            check_mode(mode)
+            check_zone(zone)
+            config = parse_config(params, mode)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        series, source = get_current_prices(timezone, zone)
+        if series is None:
+            return jsonify({'success': False, 'error': "No market data is available."}), 503
+
+        result = recommend_many(series, [config], mode)[0]
+        return jsonify({'zone': zone, 'source': source, 'price_version': series.version, **result})
+
+    @server.route('/api/recommendations', methods=['POST'])
+    def api_recommendations():
+        try:
+            body = json_object_body()
+            mode = body.get('mode', 'contiguous')
+            zone = body.get('zone', DEFAULT_ZONE)
+            raw_configs = body.get('configs')
+            check_mode(mode)
+            check_zone(zone)
+            if not isinstance(raw_configs, list) or not raw_configs:
+                raise ValueError("'configs' must be a non-empty list of EV configurations.")
+            if len(raw_configs) > MAX_BATCH_SIZE:
+                raise ValueError(f"At most {MAX_BATCH_SIZE} configurations can be evaluated per request.")
+            configs = []
+            for i, params in enumerate(raw_configs):
+                try:
+                    configs.append(parse_config(params, mode))
+                except ValueError as e:
+                    raise ValueError(f"Configuration {i}: {e}")
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        series, source = get_current_prices(timezone, zone)
+        if series is None:
+            return jsonify({'success': False, 'error': "No market data is available."}), 503
+
+        return jsonify({
+            'success': True,
+            'zone': zone,
+            'source': source,
+            'price_version': series.version,
+            'results': recommend_many(series, configs, mode)
+        })
+
+    @server.route('/api/fleet', methods=['POST'])
+    def api_fleet():
+        try:
+            body = json_object_body()
+            zone = body.get('zone', DEFAULT_ZONE)
+            site_limit_kw = body.get('site_limit_kw')
+            raw_configs = body.get('vehicles')
+            check_zone(zone)
+            if isinstance(site_limit_kw, bool) or not isinstance(site_limit_kw, (int, float)) or not 0 < site_limit_kw < np.inf:
+                raise ValueError("'site_limit_kw' must be a positive number.")
+            if not isinstance(raw_configs, list) or not raw_configs:
+                raise ValueError("'vehicles' must be a non-empty list of EV configurations.")
+            if len(raw_configs) > MAX_BATCH_SIZE:
+                raise ValueError(f"At most {MAX_BATCH_SIZE} vehicles can be scheduled per request.")
+            configs = []
+            for i, params in enumerate(raw_configs):
+                try:
+                    configs.append(parse_config(params))
+                except ValueError as e:
+                    raise ValueError(f"Vehicle {i}: {e}")
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        series, source = get_current_prices(timezone, zone)
+        if series is None:
+            return jsonify({'success': False, 'error': "No market data is available."}), 503
+
+        return jsonify({
+            'zone': zone,
+            'source': source,
+            'price_version': series.version,
+            **fleet_to_json(schedule_fleet_charging(series, configs, float(site_limit_kw)))
+        })
+
+def get_current_prices(timezone, zone=DEFAULT_ZONE):
+    """
+    Returns (series, source) for the freshest prices of a zone as a PriceSeries: the prefetcher's
+    warm copy, then the shared cache, then archived data. (None, None) if there is nothing to serve.
+    """
+    series, source = get_warm_prices(zone)
+    if series is not None:
+        return series, source
+
+    api_data = get_market_prices(timezone, zone)
+    if api_data['success']:
+        return PriceSeries.from_api_data(api_data), 'api'
+
+    fallback_data = get_fallback_data(zone)
+    if fallback_data and 'prices' in fallback_data:
+        fallback_data = future_prices_only(fallback_data)
+        if fallback_data['success']:
+            return PriceSeries.from_api_data(fallback_data), 'fallback'
+    return None, None
+
+def json_object_body():
+    """The request's JSON body as a dict ({} without a body); raises ValueError for any other JSON value."""
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    if not isinstance(body, dict):
+        raise ValueError("The request body must be a JSON object.")
+    return body
+
+def check_mode(mode):
+    if not isinstance(mode, str) or mode not in CHARGING_MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Expected one of: {', '.join(CHARGING_MODES)}.")
+
+def parse_config(params, mode='contiguous'):
+    """
+    Validates an EV configuration from query parameters or JSON and returns its canonical form.
+    The 'deadline' mode also needs departure_time (ISO 8601 with offset) and accepts an optional
+    power_curve ([[soc, kW], ...], JSON bodies only).
+    """
+    if not isinstance(params, dict) and not hasattr(params, 'get'):
+        raise ValueError("Expected an object with the EV configuration.")
+    required = CONFIG_KEYS + (('departure_time',) if mode == 'deadline' else ())
+    missing_fields = [key for key in required if params.get(key) in (None, '')]
+    if missing_fields:
+        raise ValueError(f"Missing configuration for: {', '.join(missing_fields)}.")
+    raw = {key: params.get(key) for key in CONFIG_KEYS}
+    if mode == 'deadline':
+        raw['departure_time'] = params.get('departure_time')
+        raw['power_curve'] = params.get('power_curve') if isinstance(params, dict) else None
+    try:
+        config = canonical_config(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Configuration values must be numbers: {', '.join(CONFIG_KEYS)}; "
+                         "departure_time must be an ISO 8601 time and power_curve a list of [soc, kW] pairs.")
+    if config.get('departure_time') and pd.Timestamp(config['departure_time']).tzinfo is None:
+        raise ValueError("departure_time must include a UTC offset, e.g. 2024-05-01T07:00:00+02:00.")
+    if not all(np.isfinite([config[key] for key in CONFIG_KEYS])):
+        raise ValueError("Configuration values must be finite numbers.")
+    if config['max_power'] <= 0 or config['efficiency'] <= 0 or config['capacity'] <= 0:
+        raise ValueError("capacity, max_power and efficiency must be positive.")
+    if not 0 <= config['soc_current'] <= 100 or not 0 <= config['soc_target'] <= 100:
+        raise ValueError("soc_current and soc_target must be between 0 and 100.")
+    if config['efficiency'] > 100:
+        raise ValueError("efficiency must be at most 100 (percent).")
+    if config['soc_current'] >= config['soc_target']:
+        raise ValueError("Target SoC must be higher than Current SoC.")
+    curve = config.get('power_curve')
+    if curve:
+        curve_soc = [soc for soc, _ in curve]
+        if not all(0 <= soc <= 100 for soc in curve_soc) or any(b <= a for a, b in zip(curve_soc, curve_soc[1:])):
+            raise ValueError("power_curve SoC points must be between 0 and 100 and strictly increasing.")
+        if not all(0 < kw < np.inf for _, kw in curve):
+            raise ValueError("power_curve power values (kW) must be positive.")
+    return config
+
+def recommend_many(series, configs, mode):
+    """
+    Returns one JSON-ready result per config. Cached results are reused; the remaining distinct
+    configs are evaluated together (one vectorized pass for contiguous charging).
+    """
+    keys = [(series.version, mode, tuple(config.values())) for config in configs]
+    configs_by_key = dict(zip(keys, configs))
+    results = {key: _api_results.get(key) for key in configs_by_key}
+    missing = [key for key, result in results.items() if result is None]
+
+    if missing:
+        missing_configs = [configs_by_key[key] for key in missing]
+        if mode == 'flexible':
+            computed = [result_to_json(find_optimal_charging_flexible(series, config)) for config in missing_configs]
+        elif mode == 'deadline':
+            computed = [result_to_json(find_optimal_charging_deadline(series, config)) for config in missing_configs]
+        elif len(missing_configs) == 1:
+            computed = [result_to_json(find_optimal_charging(series, missing_configs[0]))]
+        else:
+            batch = find_optimal_charging_batch(series, missing_configs)
+            computed = [batch_row_to_json(row) for row in batch.itertuples(index=False)]
+        for key, result in zip(missing, computed):
+            _api_results.put(key, result)
+            results[key] = result
+
+    return [results[key] for key in keys]
+
+def api_cache_stats():
+    """Hit/miss statistics of the API recommendation cache."""
+    return _api_results.stats()
+
+def result_to_json(analysis_results):
+    """Converts the output of find_optimal_charging(_flexible, _deadline) to a JSON-ready dict."""
+    if not analysis_results['success']:
+        return {'success': False, 'message': analysis_results['message']}
+
+    optimal = analysis_results['optimal_slot']
+    result = {
+        'success': True,
+        'message': analysis_results['message'],
+        'start_time': optimal['start_time'].isoformat(),
+        'end_time': optimal['end_time'].isoformat(),
+        'total_cost': round(float(optimal['total_cost']), 4),
+        'duration_hours': round(float(optimal['duration_hours']), 4),
+        'kwh_needed': round(float(optimal['kwh_needed']), 4),
+        'savings_eur': round(float(analysis_results['savings_eur']), 4)
+    }
+    if analysis_results.get('charging_slots') is not None:
+        result['charging_slots'] = [
+            {'start_time': row.start_time.isoformat(), 'end_time': row.end_time.isoformat(),
+             'kwh': round(float(row.kwh), 4), 'cost': round(float(row.cost), 4)}
+            for row in analysis_results['charging_slots'].itertuples(index=False)
+        ]
+    if analysis_results.get('departure_time') is not None:
+        result['departure_time'] = analysis_results['departure_time'].isoformat()
+    return result
+
+def batch_row_to_json(row):
+    """Converts one row of find_optimal_charging_batch to the same format as result_to_json."""
+    if not row.success:
+        return {'success': False, 'message': row.message}
+    return {
+        'success': True,
+        'message': row.message,
+        'start_time': row.start_time.isoformat(),
+        'end_time': row.end_time.isoformat(),
+        'total_cost': round(float(row.total_cost), 4),
+        'duration_hours': round(float(row.duration_hours), 4),
+        'kwh_needed': round(float(row.kwh_needed), 4),
+        'savings_eur': round(float(row.savings_eur), 4)
+    }
+
+def fleet_to_json(fleet_results):
+    """
+    Converts the output of schedule_fleet_charging to a JSON-ready dict. Each vehicle lists only
+    the slots it charges in. An infeasible plan is returned too, with 'unmet_kwh' per vehicle.
+    """
+    if 'schedule_kw' not in fleet_results:
+        return {'success': False, 'message': fleet_results['message']}
+
+    slot_starts = [ts.isoformat() for ts in fleet_results['slot_start_times']]
+    vehicles = []
+    for schedule_kw, cost, unmet_kwh in zip(fleet_results['schedule_kw'], fleet_results['vehicle_cost'], fleet_results['unmet_kwh']):
+        vehicles.append({
+            'total_cost': round(float(cost), 4),
+            'unmet_kwh': round(float(unmet_kwh), 4),
+            'charging_slots': [{'start_time': slot_starts[slot], 'kw': round(float(schedule_kw[slot]), 4)}
+                               for slot in np.flatnonzero(schedule_kw > 0)]
+        })
+    return {
+        'success': fleet_results['success'],
+        'message': fleet_results['message'],
+        'total_cost': round(fleet_results['total_cost'], 4),
+        'site_load': [{'start_time': start, 'kw': round(float(kw), 4)}
+                      for start, kw in zip(slot_starts, fleet_results['site_load_kw'])],
+        'vehicles': vehicles
+    }
@@ -1,23 +1,67 @@
-import json
-import pandas as pd
-import plotly.graph_objects as go
+from datetime import datetime, timedelta
 from dash.dependencies import Input, Output, State
-from dash import html, dcc, no_update
+from dash import html, dcc, no_update, Patch
 
-from utils.ev_logic import find_optimal_charging
+from utils.ev_logic import (
+    find_optimal_charging, find_optimal_charging_flexible, find_optimal_charging_deadline, find_cost_surface,
+    get_slot_hours,
+    extend_optimal_charging, extend_optimal_charging_flexible, extend_optimal_charging_deadline
+)
+from utils.prefetch import get_warm_prices, on_new_prices
+from utils.wire_format import decode_price_store, encode_analysis_results, decode_analysis_results, json_ready
+from utils.lru_cache import LRUCache
+from utils.metrics import instrumented_callback, stage
+from utils.background_jobs import submit_job, read_job, cancel_job
+from utils.result_store import result_key, put_result, get_result
+from utils.zones import DEFAULT_ZONE
+from utils.lazy_import import lazy_import
 
-def register_ev_callbacks(app):
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+
+# Recommendations shared across sessions, keyed like the result store (see analysis_key).
+# Many users enter the same car models and SoC values, so most clicks are served from here;
+# the result store on disk shares them with the other worker processes.
+ANALYSIS_CACHE_SIZE = 1024
+CONFIG_KEYS = ('capacity', 'soc_current', 'soc_target', 'max_power', 'efficiency')
+_analysis_cache = LRUCache(ANALYSIS_CACHE_SIZE)
+# Entries for older price data can no longer be hit once new prices are published
+on_new_prices(_analysis_cache.clear)
+
+# Horizons from which an analysis runs as a background job instead of inside the callback,
+# in price slots per mode (see analysis_slots). The deadline program costs more per slot.
+BACKGROUND_JOB_MIN_SLOTS = {'contiguous': 2000, 'flexible': 2000, 'deadline': 500}
+# How often the page asks for the progress of a background job
+JOB_POLL_INTERVAL_MS = 500
+# Share of a background job's progress bar covered by the engine
+ENGINE_PROGRESS_SHARE = 0.6
+# Progress once the cost surface is done; figures and encoding (see prepare_outputs) cover the rest
+SURFACE_PROGRESS = 0.7
+
+# Axes of the cost surface: common wallbox powers (kW) and target SoC steps (%), to which the
+# user's own values are added. The heatmap shows at most SURFACE_MAX_STARTS start times, so
+# only the slots those starts can reach are passed to find_cost_surface.
+SURFACE_POWERS_KW = (2.3, 3.7, 7.4, 11.0, 22.0)
+SURFACE_SOC_STEP = 10
+SURFACE_MAX_STARTS = 672
+
+def register_ev_callbacks(app, timezone):
     # Main analysis callback with simplified inputs
     @app.callback(
-        [Output('ev-config-store', 'data'),
-         Output('analysis-results-store', 'data'),
+        [Output('analysis-results-store', 'data'),
          Output('results-output', 'style'),
          Output('results-warning-banner', 'children'),
          Output('results-warning-banner', 'style'),
          Output('price-chart', 'figure', allow_duplicate=True),
          Output('results-summary-card', 'children'),
          Output('results-savings-card', 'children'),
-         Output('cost-breakdown-chart', 'figure')],
+         Output('cost-breakdown-chart', 'figure'),
+         Output('cost-surface-chart', 'figure'),
+         Output('analysis-job-store', 'data'),
+         Output('analysis-job-interval', 'disabled'),
+         Output('analysis-progress', 'children'),
+         Output('analysis-progress', 'style')],
         [Input('analyze-button', 'n_clicks')],
         [State('market-data-store', 'data'),
          State('ev-capacity', 'value'),
@@ -25,16 +69,26 @@ def register_ev_callbacks(app):
          State('ev-soc-target', 'value'),
          State('ev-max-power', 'value'),
          State('ev-efficiency', 'value'),
-         State('price-chart', 'figure')],
+         State('ev-charging-mode', 'value'),
+         State('ev-departure-time', 'value'),
+         State('ev-taper-start-soc', 'value'),
+         State('ev-taper-end-power', 'value'),
+         State('analysis-job-store', 'data')],
         prevent_initial_call=True
     )
-    def run_analysis(n_clicks, market_data, capacity, soc_current, soc_target, max_power, efficiency, existing_fig):
+    @instrumented_callback('run_analysis')
+    def run_analysis(n_clicks, market_data, capacity, soc_current, soc_target, max_power, efficiency, charging_mode,
+                     departure_time, taper_start_soc, taper_end_power, running_job):
         if n_clicks == 0:
-            return [no_update] * 9
+            return [no_update] * 13
+
+        # A new click supersedes the analysis still running in the background
+        if running_job:
+            cancel_job(running_job.get('id'))
 
         # --- 1. Validate Inputs ---
-        if not market_data or not market_data.get('prices'):
-            return show_warning("Market data is not loaded. Please fetch prices on the 'Live Market Prices' tab first.")
+        if not market_data or not market_data.get('price_deltas'):
+            return (*show_warning("Market data is not loaded. Please fetch prices on the 'Live Market Prices' tab first."), *job_outputs())
 
         config = {
             'capacity': capacity, 'soc_current': soc_current, 'soc_target': soc_target,
@@ -43,65 +97,329 @@ def register_ev_callbacks(app):
         
         missing_fields = [k for k, v in config.items() if v is None]
         if missing_fields:
-            return show_warning(f"Analysis failed. Missing configuration for: {', '.join(missing_fields)}.")
+            return (*show_warning(f"Analysis failed. Missing configuration for: {', '.join(missing_fields)}."), *job_outputs())
 
         if soc_current >= soc_target:
-             return show_warning("Target SoC must be higher than Current SoC.")
+             return (*show_warning("Target SoC must be higher than Current SoC."), *job_outputs())
+
+        if charging_mode == 'deadline':
+            departure = next_departure(departure_time, timezone)
+            if departure is None:
+                return (*show_warning("Please enter the departure time as HH:MM (e.g., 07:00)."), *job_outputs())
+            config['departure_time'] = departure.isoformat()
+            config['power_curve'] = build_power_curve(max_power, taper_start_soc, taper_end_power)
+
+        # --- 2. Run Recommendation Engine (or reuse a cached result for the same prices and config) ---
+        config = canonical_config(config)
+        with stage('parse'):
+            series = decode_price_store(market_data)
+        key = analysis_key(series.version, config, charging_mode)
+        cached = get_analysis(key)
+
+        min_job_slots = BACKGROUND_JOB_MIN_SLOTS.get(charging_mode)
+        slots = analysis_slots(series, config)
+        if cached is None and min_job_slots is not None and slots >= min_job_slots:
+            # Long horizon: computed in the job pool, and picked up by poll_analysis_job
+            job = submit_job(compute_analysis, (series, config, charging_mode, timezone),
+                             meta={'key': key, 'config': config, 'mode': charging_mode})
+            if not job['success']:
+                return (*show_warning(job['error']), *job_outputs())
+            return (*[no_update] * 2, "", {'display': 'none'}, *[no_update] * 5,
+                    *job_outputs({'id': job['job_id']}, 0.0, slots))
+
+        if cached is None:
+            cached = compute_analysis(series, config, charging_mode, timezone)
+            store_analysis(key, config, charging_mode, cached)
+        return (*analysis_outputs(key, cached), *job_outputs())
+
+    # Follows a background analysis started by run_analysis and shows its result once it is done.
+    # Job status is shared on disk, so any worker process can answer these polls.
+    @app.callback(
+        [Output('analysis-results-store', 'data', allow_duplicate=True),
+         Output('results-output', 'style', allow_duplicate=True),
+         Output('results-warning-banner', 'children', allow_duplicate=True),
+         Output('results-warning-banner', 'style', allow_duplicate=True),
+         Output('price-chart', 'figure', allow_duplicate=True),
+         Output('results-summary-card', 'children', allow_duplicate=True),
+         Output('results-savings-card', 'children', allow_duplicate=True),
+         Output('cost-breakdown-chart', 'figure', allow_duplicate=True),
+         Output('cost-surface-chart', 'figure', allow_duplicate=True),
+         Output('analysis-job-store', 'data', allow_duplicate=True),
+         Output('analysis-job-interval', 'disabled', allow_duplicate=True),
+         Output('analysis-progress', 'children', allow_duplicate=True),
+         Output('analysis-progress', 'style', allow_duplicate=True)],
+        [Input('analysis-job-interval', 'n_intervals')],
+        [State('analysis-job-store', 'data')],
+        prevent_initial_call=True
+    )
+    @instrumented_callback('poll_analysis_job')
+    def poll_analysis_job(n_intervals, running_job):
+        if not running_job:
+            return (*[no_update] * 9, *job_outputs())
+
+        job = read_job(running_job.get('id'))
+        if job is None:
+            return (*show_warning("The background analysis was lost. Please run it again."), *job_outputs())
+        if job['status'] in ('queued', 'running'):
+            return (*[no_update] * 9, *job_outputs(no_update, job['progress'], running_job.get('slots')))
+        if job['status'] == 'cancelled':
+            return (*[no_update] * 9, *job_outputs())
+        if job['status'] == 'failed':
+            return (*show_warning(f"The analysis failed: {job.get('error')}"), *job_outputs())
+
+        meta = job['meta']
+        store_analysis(meta['key'], meta['config'], meta['mode'], job['result'])
+        return (*analysis_outputs(meta['key'], job['result']), *job_outputs())
+
+    # Updates an existing recommendation when newly published prices are appended to the store.
+    # Only the windows touching the new slots are evaluated, and nothing is sent to the browser
+    # unless the new slots actually change the optimum.
+    @app.callback(
+        [Output('analysis-results-store', 'data', allow_duplicate=True),
+         Output('price-chart', 'figure', allow_duplicate=True),
+         Output('results-summary-card', 'children', allow_duplicate=True),
+         Output('results-savings-card', 'children', allow_duplicate=True),
+         Output('cost-breakdown-chart', 'figure', allow_duplicate=True),
+         Output('cost-surface-chart', 'figure', allow_duplicate=True)],
+        [Input('market-data-version', 'data')],
+        [State('analysis-results-store', 'data')],
+        prevent_initial_call=True
+    )
+    def refresh_analysis_with_new_prices(version, key):
+        if not version or not version.get('first_new_start') or not key:
+            return [no_update] * 6
+
+        record = get_result(key)
+        latest, source = get_warm_prices(version.get('zone', DEFAULT_ZONE))
+        if record is None or 'warning' in record['outputs'] or latest is None:
+            return [no_update] * 6
+
+        config, charging_mode = canonical_config(record['config']), record['mode']
+        previous_results = decode_analysis_results(record['outputs']['encoded_results'])
+        if charging_mode == 'flexible':
+            changed, analysis_results = extend_optimal_charging_flexible(latest, config, previous_results, version['first_new_start'])
+        elif charging_mode == 'deadline':
+            changed, analysis_results = extend_optimal_charging_deadline(latest, config, previous_results, version['first_new_start'])
+        else:
+            changed, analysis_results = extend_optimal_charging(latest, config, previous_results, version['first_new_start'])
+
+        if not changed:
+            return [no_update] * 6
 
-        # --- 2. Run Simplified Recommendation Engine ---
-        price_df = pd.DataFrame(market_data['prices'])
-        analysis_results = find_optimal_charging(price_df, config)
+        surface = None if charging_mode == 'deadline' else compute_cost_surface(latest, config)
+        outputs = prepare_outputs(analysis_results, surface, config, timezone)
+        new_key = analysis_key(latest.version, config, charging_mode)
+        store_analysis(new_key, config, charging_mode, outputs)
+        return (new_key, outputs['price_overlay'], outputs['summary_card'], outputs['savings_card'],
+                outputs['cost_breakdown_fig'], outputs['cost_surface_fig'])
 
+def canonical_config(config):
+    """Normalizes the config values so equivalent inputs (e.g. 75 and 75.0) share cache entries."""
+    canonical = {key: round(float(config[key]), 3) for key in CONFIG_KEYS}
+    if config.get('departure_time'):
+        canonical['departure_time'] = pd.Timestamp(config['departure_time']).isoformat()
+    if config.get('power_curve'):
+        canonical['power_curve'] = tuple((round(float(soc), 3), round(float(kw), 3)) for soc, kw in config['power_curve'])
+    return canonical
+
+def next_departure(time_text, timezone):
+    """Next occurrence of a local 'HH:MM' time as an aware datetime, or None if it cannot be parsed."""
+    try:
+        departure_time = datetime.strptime((time_text or '').strip(), '%H:%M').time()
+    except ValueError:
+        return None
+    now = datetime.now(timezone)
+    departure = timezone.localize(datetime.combine(now.date(), departure_time))
+    if departure <= now:
+        departure = timezone.localize(datetime.combine(now.date() + timedelta(days=1), departure_time))
+    return departure
+
+def build_power_curve(max_power, taper_start_soc, taper_end_power):
+    """
+    Power-versus-SoC curve ([[soc, kW], ...]): full power up to taper_start_soc, then falling
+    linearly to taper_end_power percent of max_power at 100% SoC.
+    """
+    taper_start_soc = 80 if taper_start_soc is None else taper_start_soc
+    taper_end_power = 100 if taper_end_power is None else taper_end_power
+    return [[0, max_power], [taper_start_soc, max_power], [100, max_power * taper_end_power / 100]]
+
+def analysis_slots(series, config):
+    """Price slots the engine has to consider: the whole series, or those before the departure time."""
+    if config.get('departure_time'):
+        return len(series) - len(series.since(config['departure_time']))
+    return len(series)
+
+def analysis_key(price_version, config, charging_mode):
+    """Key of an analysis in the shared caches and the result store; also the browser's handle."""
+    return result_key(price_version, config, charging_mode)
+
+def get_analysis(key):
+    """
+    Outputs of compute_analysis for a key from this process's cache or, if another worker (or an
+    earlier page load) computed them, from the result store. None if the analysis has not run.
+    """
+    cached = _analysis_cache.get(key)
+    if cached is None:
+        record = get_result(key)
+        if record is not None:
+            cached = record['outputs']
+            _analysis_cache.put(key, cached)
+    return cached
+
+def store_analysis(key, config, charging_mode, outputs):
+    """Keeps the outputs of an analysis in this process and in the shared result store."""
+    _analysis_cache.put(key, outputs)
+    put_result(key, {'config': config, 'mode': charging_mode, 'outputs': outputs})
+
+def analysis_cache_stats():
+    """Hit/miss statistics of the shared recommendation cache."""
+    return _analysis_cache.stats()
+
+def compute_analysis(series, config, charging_mode, timezone, progress=None):
+    """
+    Runs the engine on a PriceSeries for the selected charging mode and prepares every output
+    of run_analysis. Returns {'warning': message} if the engine fails. The result is safe to share
+    between sessions. progress is passed on by background jobs (see utils.background_jobs).
+    """
+    engine_progress = None
+    if progress is not None:
+        # The engine accounts for most of the work; figures and encoding follow
+        engine_progress = lambda fraction: progress(ENGINE_PROGRESS_SHARE * fraction)
+
+    with stage('engine'):
+        if charging_mode == 'flexible':
+            analysis_results = find_optimal_charging_flexible(series, config, engine_progress)
+        elif charging_mode == 'deadline':
+            analysis_results = find_optimal_charging_deadline(series, config, engine_progress)
+        else:
+            analysis_results = find_optimal_charging(series, config, engine_progress)
         if not analysis_results['success']:
-            return show_warning(analysis_results['message'])
+            return {'warning': analysis_results['message']}
+        if engine_progress is not None and engine_progress(1.0) is False:
+            return {'warning': 'The analysis was cancelled.'}
+        # Costs at other powers and targets; the deadline plan follows a power curve instead
+        surface = None if charging_mode == 'deadline' else compute_cost_surface(series, config)
 
-        # --- 3. Prepare Outputs ---
-        optimal = analysis_results['optimal_slot']
-        
-        summary_card = create_summary_card(optimal, soc_target)
-        
-        savings_card = html.P(
-            f"You save {analysis_results['savings_eur']:.2f}€ compared to charging in the most expensive period.",
-            className='savings-text'
+    output_progress = None
+    if progress is not None:
+        output_progress = lambda fraction: progress(SURFACE_PROGRESS + (1 - SURFACE_PROGRESS) * fraction)
+    outputs = prepare_outputs(analysis_results, surface, config, timezone, output_progress)
+    if outputs is None:
+        return {'warning': 'The analysis was cancelled.'}
+    return outputs
+
+def prepare_outputs(analysis_results, surface, config, timezone, progress=None):
+    """
+    Figures, cards and encoded results of an analysis as plain JSON, the form in which they are
+    cached, stored on disk and returned to the browser. On long series these steps take longer
+    than the engine, so progress(fraction), if given, is called between them; None is returned
+    once it returns False.
+    """
+    report = progress or (lambda fraction: True)
+    if report(0.0) is False:
+        return None
+    with stage('figure'):
+        summary_card, savings_card, cost_breakdown_fig, price_overlay = create_analysis_outputs(
+            analysis_results, config['soc_target'], timezone
         )
-        
+        if report(0.4) is False:
+            return None
+        cost_surface_fig = create_cost_surface_figure(surface, config, timezone)
+    outputs = {
+        'encoded_results': encode_analysis_results(analysis_results),
+        'summary_card': summary_card,
+        'savings_card': savings_card,
+        'cost_breakdown_fig': cost_breakdown_fig,
+        'cost_surface_fig': cost_surface_fig,
+        'price_overlay': price_overlay
+    }
+    with stage('serialization'):
+        serialized = {}
+        for i, (name, value) in enumerate(outputs.items()):
+            if report(0.5 + 0.5 * i / len(outputs)) is False:
+                return None
+            serialized[name] = json_ready(value)
+        return serialized
+
+def create_analysis_outputs(analysis_results, soc_target, timezone):
+    """
+    Builds the summary card, savings card, cost chart and price-chart overlay for a result.
+    The overlay is a Patch, so the price chart's trace data never travels with an analysis.
+    """
+    optimal = analysis_results['optimal_slot']
+    
+    charging_slots = analysis_results.get('charging_slots')
+    summary_card = create_summary_card(optimal, soc_target, charging_slots)
+    
+    # Each engine measures savings against its own baseline
+    if analysis_results.get('departure_time') is not None:
+        baseline = "charging immediately"
+    elif charging_slots is not None:
+        baseline = "buying the same energy in the most expensive slots"
+    else:
+        baseline = "an uninterrupted charge in the most expensive period"
+    savings_text = f"You save {analysis_results['savings_eur']:.2f}€ compared to {baseline}."
+    savings_card = html.P(savings_text, className='savings-text')
+    
+    if charging_slots is not None:
+        # Interruptible plan: the chart shows continuous blocks, with the plan's cost as a reference line
+        cost_breakdown_fig = create_cost_breakdown_figure(
+            analysis_results['all_slots'],
+            analysis_results['contiguous_start_time'],
+            flexible_cost=optimal['total_cost'],
+            flexible_label='Plan before departure' if analysis_results.get('departure_time') is not None else 'Interruptible plan'
+        )
+    else:
         cost_breakdown_fig = create_cost_breakdown_figure(
             analysis_results['all_slots'], 
             optimal['start_time']
         )
-        
-        updated_price_fig = add_recommendation_overlay(existing_fig, optimal['start_time'], optimal['end_time'])
-        
-        style_visible = {'display': 'block'}
-        style_hidden = {'display': 'none'}
+    
+    updated_price_fig = create_recommendation_overlay_patch(get_charging_windows(analysis_results), timezone)
+    return summary_card, savings_card, cost_breakdown_fig, updated_price_fig
 
-        # Serialize results for storage
-        analysis_results_serializable = analysis_results.copy()
-        
-        all_slots_df = analysis_results_serializable['all_slots']
-        all_slots_df['start_time'] = all_slots_df['start_time'].apply(lambda ts: ts.isoformat())
-        analysis_results_serializable['all_slots'] = all_slots_df.to_dict('records')
-        
-        analysis_results_serializable['optimal_slot']['start_time'] = analysis_results['optimal_slot']['start_time'].isoformat()
-        analysis_results_serializable['optimal_slot']['end_time'] = analysis_results['optimal_slot']['end_time'].isoformat()
-        
-        return (
-            json.dumps(config),
-            json.dumps(analysis_results_serializable),
-            style_visible, "", style_hidden, updated_price_fig,
-            summary_card, savings_card, cost_breakdown_fig
-        )
+def analysis_outputs(key, cached):
+    """
+    The analysis outputs of run_analysis (all but the job outputs) for a result of
+    compute_analysis. The browser keeps only the key; the encoded results stay on the server.
+    """
+    if 'warning' in cached:
+        return show_warning(cached['warning'])
+    return (
+        key,
+        {'display': 'block'}, "", {'display': 'none'}, cached['price_overlay'],
+        cached['summary_card'], cached['savings_card'], cached['cost_breakdown_fig'], cached['cost_surface_fig']
+    )
+
+def job_outputs(job=None, progress=None, slots=None):
+    """
+    Job store, poll interval and progress banner outputs. Without a progress value the job is
+    over: the store is cleared and polling stops.
+    """
+    if progress is None:
+        return None, True, None, {'display': 'none'}
+    if job is not no_update:
+        job = {**job, 'slots': slots}
+    percent = int(progress * 100)
+    progress_banner = [
+        html.Span(f"Analyzing {slots or 'all'} price slots in the background... {percent}%"),
+        html.Progress(value=str(percent), max='100', className='analysis-progress-bar'),
+        html.Small("Clicking 'Save & Analyze' again cancels this analysis and starts a new one.")
+    ]
+    return job, False, progress_banner, {'display': 'block'}
 
 def show_warning(message):
     style_hidden = {'display': 'none'}
     style_visible = {'display': 'block'}
-    no_fig_update = go.Figure()
+    # Only clear the cost charts' traces instead of sending whole new figures
+    no_fig_update = Patch()
+    no_fig_update['data'] = []
     return (
-        no_update, no_update, style_hidden, message, style_visible, 
-        no_update, None, None, no_fig_update
+        no_update, style_hidden, message, style_visible, 
+        no_update, None, None, no_fig_update, no_fig_update
     )
 
-def create_summary_card(optimal, target_soc):
+def create_summary_card(optimal, target_soc, charging_slots=None):
     duration_h = int(optimal['duration_hours'])
     duration_m = int((optimal['duration_hours'] * 60) % 60)
     
@@ -115,11 +433,14 @@ def create_summary_card(optimal, target_soc):
         html.Div([html.Span("Duration", className='summary-label'), html.Span(f"{duration_h}h {duration_m}m", className='summary-value')], className='summary-item'),
         html.Div([html.Span("Energy Added", className='summary-label'), html.Span(f"{optimal['kwh_needed']:.2f} kWh", className='summary-value')], className='summary-item'),
         html.Div([html.Span("Estimated Cost", className='summary-label'), html.Span(f"{optimal['total_cost']:.2f} €", className='summary-value')], className='summary-item'),
-    ])
+    ] + ([
+        html.Div([html.Span("Charging Slots", className='summary-label'), html.Span(f"{len(charging_slots)} (interruptible)", className='summary-value')], className='summary-item'),
+    ] if charging_slots is not None else []))
 
-def create_cost_breakdown_figure(all_slots_df, optimal_start_time):
+def create_cost_breakdown_figure(all_slots_df, optimal_start_time, flexible_cost=None, flexible_label='Interruptible plan'):
     """
     Creates a line chart comparing the cost of charging at every possible start time.
+    If flexible_cost is given, the cost of the interruptible plan is drawn as a reference line.
     This version uses a datetime axis, which is the correct and robust way to 
     prevent the chart from expanding and breaking the UI.
     """
@@ -151,6 +472,12 @@ def create_cost_breakdown_figure(all_slots_df, optimal_start_time):
         marker=dict(color='#c0392b', size=12, symbol='star', line=dict(width=1, color='white')),
         hovertemplate='Optimal Start: %{x|%H:%M}<br>Lowest Cost: %{y:.2f}€<extra></extra>'
     ))
+
+    if flexible_cost is not None:
+        fig.add_hline(
+            y=flexible_cost, line_dash='dash', line_color='#27ae60',
+            annotation_text=flexible_label, annotation_position='bottom right'
+        )
     
     fig.update_layout(
         title='Cost Comparison by Start Time',
@@ -166,12 +493,137 @@ def create_cost_breakdown_figure(all_slots_df, optimal_start_time):
     )
     return fig
 
-def add_recommendation_overlay(figure_json, start_time, end_time):
-    fig = go.Figure(figure_json)
-    fig.add_vrect(
-        x0=start_time, x1=end_time,
-        fillcolor="green", opacity=0.25,
-        layer="below", line_width=0,
-        annotation_text="Optimal Window", annotation_position="top left"
+def surface_axes(config):
+    """Charging powers (kW) and target SoCs (%) of the cost surface, including the configured ones."""
+    powers = sorted({*SURFACE_POWERS_KW, config['max_power']})
+    first_step = (int(config['soc_current']) // SURFACE_SOC_STEP + 1) * SURFACE_SOC_STEP
+    soc_targets = sorted({*range(first_step, 101, SURFACE_SOC_STEP), config['soc_target']})
+    return powers, soc_targets
+
+def compute_cost_surface(series, config):
+    """
+    find_cost_surface over the first SURFACE_MAX_STARTS start times: the series is cut after
+    the last slot the longest window (highest target at the lowest power) from those starts
+    can reach.
+    """
+    powers, soc_targets = surface_axes(config)
+    kwh_needed_from_grid = (max(soc_targets) - config['soc_current']) / 100 * config['capacity'] / (config['efficiency'] / 100)
+    slot_hours = get_slot_hours(series.slice(0, SURFACE_MAX_STARTS).start_times)
+    longest_window = max(int(np.ceil(kwh_needed_from_grid / min(powers) / slot_hours)), 1)
+    return find_cost_surface(series.slice(0, SURFACE_MAX_STARTS + longest_window - 1), config, powers, soc_targets)
+
+def create_cost_surface_figure(surface, config, timezone):
+    """
+    Heatmap of the charging cost by start time and charging power, with a button to show
+    target SoC on the y-axis instead. Both views are part of the figure, so switching between
+    them happens in the browser. The cheapest start of each row is marked, the configured
+    power or target with a star. Markers only cover the start times shown.
+    """
+    fig = go.Figure()
+    layout = dict(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter, sans-serif"),
+        margin=dict(l=40, r=20, t=40, b=40),
+        showlegend=False
+    )
+    if surface is None or not surface['success']:
+        note = surface['message'] if surface else "The cost surface assumes constant charging power, so it is not shown for 'Ready by departure'."
+        fig.update_layout(
+            **layout, xaxis=dict(visible=False), yaxis=dict(visible=False),
+            annotations=[dict(text=note, xref='paper', yref='paper', x=0.5, y=0.5, showarrow=False)]
+        )
+        return fig
+
+    n_starts = min(SURFACE_MAX_STARTS, surface['costs'].shape[2])
+    annotations = []
+    if surface['costs'].shape[2] > n_starts:
+        annotations.append(dict(
+            text=(f"Only the first {n_starts} start times are shown. The cheapest-start markers cover this "
+                  "range only and can differ from the recommendation."),
+            xref='paper', yref='paper', x=0, y=-0.22, xanchor='left', yanchor='top', showarrow=False,
+            font=dict(size=11, color='#7f8c8d')
+        ))
+    labels = surface['start_times'][:n_starts].tz_convert(timezone).strftime('%Y-%m-%d %H:%M')
+    power_row = surface['powers'].tolist().index(config['max_power'])
+    soc_row = surface['soc_targets'].tolist().index(config['soc_target'])
+    views = [
+        ('By charging power', 'Cost by Start Time and Charging Power', 'Charging Power (kW)',
+         [f"{power:g} kW" for power in surface['powers']], surface['costs'][soc_row, :, :n_starts], power_row),
+        ('By target SoC', 'Cost by Start Time and Target SoC', 'Target SoC (%)',
+         [f"{soc:g}%" for soc in surface['soc_targets']], surface['costs'][:, power_row, :n_starts], soc_row),
+    ]
+
+    for i, (_, _, axis_title, rows, costs, selected_row) in enumerate(views):
+        fig.add_trace(go.Heatmap(
+            x=labels, y=rows, z=np.round(costs, 3), visible=i == 0,
+            colorscale='Viridis', colorbar=dict(title='€'),
+            hovertemplate=f'Start Time: %{{x}}<br>{axis_title}: %{{y}}<br>Cost: %{{z:.2f}}€<extra></extra>'
+        ))
+        # Cheapest start per row, among the start times shown
+        has_cost = ~np.isnan(costs).all(axis=1)
+        best = np.nanargmin(np.where(has_cost[:, None], costs, 0.0), axis=1)
+        fig.add_trace(go.Scatter(
+            x=labels[best[has_cost]], y=np.asarray(rows)[has_cost], visible=i == 0, mode='markers',
+            marker=dict(
+                color='white', line=dict(width=1, color='#c0392b'),
+                symbol=['star' if row == selected_row else 'circle' for row in np.flatnonzero(has_cost)],
+                size=[14 if row == selected_row else 8 for row in np.flatnonzero(has_cost)]
+            ),
+            hovertemplate='Cheapest Start: %{x}<br>%{y}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        **{**layout, 'margin': dict(l=40, r=20, t=40, b=80 if annotations else 40)},
+        annotations=annotations,
+        title=views[0][1],
+        xaxis_title='Possible Start Times',
+        yaxis=dict(title=views[0][2], type='category'),
+        updatemenus=[dict(
+            type='buttons', direction='right', x=1, xanchor='right', y=1.15, yanchor='top', showactive=True,
+            buttons=[dict(
+                label=label, method='update',
+                args=[{'visible': [view == i for view in range(len(views)) for _ in range(2)]},
+                      {'title.text': title, 'yaxis.title.text': axis_title}]
+            ) for i, (label, title, axis_title, _, _, _) in enumerate(views)]
+        )]
     )
-    return fig
\ No newline at end of file
+    return fig
+
+def get_charging_windows(analysis_results):
+    """Returns the (start, end) periods to highlight, merging back-to-back interruptible slots."""
+    charging_slots = analysis_results.get('charging_slots')
+    if charging_slots is None:
+        optimal = analysis_results['optimal_slot']
+        return [(optimal['start_time'], optimal['end_time'])]
+
+    windows = []
+    for start_time, end_time in zip(charging_slots['start_time'], charging_slots['end_time']):
+        if windows and start_time <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], end_time)
+        else:
+            windows.append((start_time, end_time))
+    return windows
+
+def create_recommendation_overlay_patch(windows, timezone):
+    """
+    Returns a Patch that replaces the price chart's highlight shapes with the given windows.
+    The chart's x-axis uses local-time labels, so the window bounds are converted to match.
+    """
+    shapes = []
+    for start_time, end_time in windows:
+        shapes.append({
+            'type': 'rect', 'xref': 'x', 'yref': 'paper',
+            'x0': start_time.tz_convert(timezone).strftime('%Y-%m-%d %H:%M'),
+            'x1': end_time.tz_convert(timezone).strftime('%Y-%m-%d %H:%M'),
+            'y0': 0, 'y1': 1,
+            'fillcolor': 'green', 'opacity': 0.25, 'layer': 'below', 'line': {'width': 0}
+        })
+
+    patch = Patch()
+    patch['layout']['shapes'] = shapes
+    patch['layout']['annotations'] = [{
+        'text': 'Optimal Window', 'xref': 'x', 'yref': 'paper',
+        'x': shapes[0]['x0'], 'y': 1, 'xanchor': 'left', 'yanchor': 'top', 'showarrow': False
+    }] if shapes else []
+    return patch
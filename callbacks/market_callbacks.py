@@ -1,60 +1,87 @@
 import json
-import pandas as pd
-import plotly.graph_objects as go
 from dash.dependencies import Input, Output, State
-from dash import html, no_update
+from dash import html, no_update, Patch, ctx
 
-from utils.price_api import fetch_market_prices, get_fallback_data, save_fallback_data
+from utils.price_api import get_fallback_data
+from utils.price_cache import get_market_prices
+from utils.price_sources import zone_label
+from utils.prefetch import get_warm_prices
+from utils.zones import DEFAULT_ZONE
+from utils.wire_format import encode_price_store, price_store_version, price_store_extension
+from utils.price_series import PriceSeries
+from utils.lru_cache import LRUCache
+from utils.metrics import instrumented_callback, stage
+from utils.lazy_import import lazy_import
+
+go = lazy_import('plotly.graph_objects')
+
+# Price figures are identical for every session that sees the same data, so they are built
+# once per price-data version and kept as plain JSON-ready dicts.
+FIGURE_CACHE_SIZE = 8
+_price_figure_cache = LRUCache(FIGURE_CACHE_SIZE)
 
 def register_market_callbacks(app, timezone):
     @app.callback(
         [Output('market-data-store', 'data'),
+         Output('market-data-version', 'data'),
          Output('status-banner', 'children'),
          Output('status-banner', 'style'),
          Output('price-chart', 'figure')],
-        [Input('fetch-prices-button', 'n_clicks')],
-        [State('market-data-store', 'data')]
+        [Input('fetch-prices-button', 'n_clicks'),
+         Input('zone-selector', 'value')]
     )
-    def update_market_data(n_clicks, existing_data):
-        if n_clicks == 0:
-            # On initial load, try to use fallback data
-            fallback_data = get_fallback_data()
-            if fallback_data and 'prices' in fallback_data:
-                df = build_dataframe_from_stored_data(fallback_data, timezone)
-                fig = create_price_figure(df)
-                banner_text = f"Displaying cached data from {fallback_data.get('timestamp', 'an unknown time')}. Click 'Fetch Latest Prices' to update."
-                return fallback_data, banner_text, {'display': 'block', 'borderColor': '#f39c12', 'backgroundColor': '#fdf5e6', 'color': '#f39c12'}, fig
-            
+    @instrumented_callback('update_market_data')
+    def update_market_data(n_clicks, zone):
+        zone = zone or DEFAULT_ZONE
+        if ctx.triggered_id != 'fetch-prices-button':
+            # On initial load and when the zone changes, use the prices kept in memory by the
+            # background prefetcher. This never touches disk or network, so the chart is never delayed.
+            with stage('fetch'):
+                warm_series, source = get_warm_prices(zone)
+            if warm_series is not None:
+                fig = get_price_figure(warm_series, timezone)
+                if source == 'api':
+                    banner_text = f"Displaying latest prices. Source: {zone_label(zone)}. Last Updated: {warm_series.timestamp}"
+                    banner_style = {'display': 'block', 'borderColor': '#27ae60', 'backgroundColor': '#e9f7ef', 'color': '#27ae60'}
+                else:
+                    banner_text = f"Displaying cached data from {warm_series.timestamp or 'an unknown time'}. Click 'Fetch Latest Prices' to update."
+                    banner_style = {'display': 'block', 'borderColor': '#f39c12', 'backgroundColor': '#fdf5e6', 'color': '#f39c12'}
+                return store_with_version(warm_series) + (banner_text, banner_style, fig)
+
+        if ctx.triggered_id is None:
             # Default empty state
             empty_fig = go.Figure().update_layout(
                 xaxis={'visible': False}, yaxis={'visible': False}, annotations=[{'text': "No market data loaded.", 'showarrow': False, 'font': {'size': 16}}]
             )
             banner_text = "No market data loaded. Please click 'Fetch Latest Prices.'"
             banner_style = {'display': 'block', 'borderColor': '#2980b9', 'backgroundColor': '#eaf2f8', 'color': '#2980b9'}
-            return no_update, banner_text, banner_style, empty_fig
+            return no_update, no_update, banner_text, banner_style, empty_fig
 
-        # Fetch new data from API
-        api_data = fetch_market_prices(timezone)
+        # Get prices from the shared cache, which only calls the API once the cached copy expires
+        with stage('fetch'):
+            api_data = get_market_prices(timezone, zone)
 
         if api_data['success']:
-            # API call was successful
-            save_fallback_data(api_data)
-            df = build_dataframe_from_stored_data(api_data, timezone)
-            fig = create_price_figure(df)
-            banner_text = f"Successfully fetched latest prices. Source: Awattar API. Last Updated: {api_data.get('timestamp')}"
+            # API call was successful (the cache has already saved it as fallback data)
+            with stage('parse'):
+                series = PriceSeries.from_api_data(api_data)
+            fig = get_price_figure(series, timezone)
+            banner_text = f"Successfully fetched latest prices. Source: {zone_label(zone)}. Last Updated: {series.timestamp}"
             banner_style = {'display': 'block', 'borderColor': '#27ae60', 'backgroundColor': '#e9f7ef', 'color': '#27ae60'}
-            # api_data is now JSON serializable and safe to store
-            return api_data, banner_text, banner_style, fig
+            # Send the compact columnar encoding to the browser
+            return store_with_version(series) + (banner_text, banner_style, fig)
         else:
             # API call failed, attempt to use fallback
             error_message = api_data['error']
-            fallback_data = get_fallback_data()
+            with stage('fetch'):
+                fallback_data = get_fallback_data(zone)
             if fallback_data and 'prices' in fallback_data:
-                df = build_dataframe_from_stored_data(fallback_data, timezone)
-                fig = create_price_figure(df)
-                banner_text = f"Fetch failed: {error_message}. Displaying last known data from {fallback_data.get('timestamp')}."
+                with stage('parse'):
+                    series = PriceSeries.from_api_data(fallback_data)
+                fig = get_price_figure(series, timezone)
+                banner_text = f"Fetch failed: {error_message}. Displaying last known data from {series.timestamp}."
                 banner_style = {'display': 'block', 'borderColor': '#c0392b', 'backgroundColor': '#fbeae5', 'color': '#c0392b'}
-                return fallback_data, banner_text, banner_style, fig
+                return store_with_version(series) + (banner_text, banner_style, fig)
             else:
                 # API failed and no fallback available
                 empty_fig = go.Figure().update_layout(
@@ -62,31 +89,89 @@ def register_market_callbacks(app, timezone):
                 )
                 banner_text = f"Fetch failed: {error_message}. No cached data is available."
                 banner_style = {'display': 'block', 'borderColor': '#c0392b', 'backgroundColor': '#fbeae5', 'color': '#c0392b'}
-                return None, banner_text, banner_style, empty_fig
-
-def build_dataframe_from_stored_data(stored_data, timezone):
-    """Helper to reconstruct a DataFrame from JSON-serializable stored data."""
-    df = pd.DataFrame(stored_data['prices'])
-    df['start_time'] = pd.to_datetime(df['start_time'])
-    df['start_time_local'] = df['start_time'].dt.tz_convert(timezone).dt.strftime('%Y-%m-%d %H:%M')
-    return df
-
-def create_price_figure(df):
-    """Helper function to create the Plotly figure for prices."""
-    df_display = df.head(24)
+                return None, None, banner_text, banner_style, empty_fig
+
+    # Periodically checks the shared price cache for newly published slots. New slots are
+    # appended to the browser's store with a Patch instead of re-sending the whole series.
+    @app.callback(
+        [Output('market-data-store', 'data', allow_duplicate=True),
+         Output('market-data-version', 'data', allow_duplicate=True),
+         Output('status-banner', 'children', allow_duplicate=True)],
+        [Input('price-update-interval', 'n_intervals')],
+        [State('market-data-version', 'data')],
+        prevent_initial_call=True
+    )
+    def extend_market_data(n_intervals, version):
+        if not version:
+            return no_update, no_update, no_update
+
+        latest, source = get_warm_prices(version.get('zone', DEFAULT_ZONE))
+        if latest is None or source != 'api':
+            return no_update, no_update, no_update
+
+        new_slots = latest.after(version['last_start'])
+        if len(new_slots) == 0:
+            return no_update, no_update, no_update
+
+        banner_text = f"New prices were published and added automatically. Last Updated: {latest.timestamp}"
+        price_deltas, new_version = price_store_extension(version, new_slots)
+        if price_deltas is None:
+            # The new slots do not continue the stored series; replace it
+            store = encode_price_store(latest)
+            return store, price_store_version(store, first_new_start=new_slots.start_times[0].isoformat()), banner_text
+
+        patch = Patch()
+        patch['price_deltas'].extend(price_deltas)
+        patch['timestamp'] = latest.timestamp
+        return patch, new_version, banner_text
+
+def store_with_version(series):
+    """Encodes a PriceSeries for market-data-store and returns (store, version)."""
+    with stage('serialization'):
+        store = encode_price_store(series)
+        return store, price_store_version(store)
+
+def get_price_figure(series, timezone):
+    """
+    Returns the price figure for a PriceSeries as a JSON-ready dict, from a process-wide cache
+    keyed by the content of the series. Callbacks can return it without rebuilding.
+    """
+    key = (series.version, str(timezone))
+
+    def build():
+        with stage('figure'):
+            fig = create_price_figure(series, timezone)
+        with stage('serialization'):
+            return json.loads(fig.to_json())
+
+    return _price_figure_cache.get_or_create(key, build)
+
+def price_figure_cache_stats():
+    """Hit/miss statistics of the shared price figure cache."""
+    return _price_figure_cache.stats()
+
+def create_price_figure(series, timezone):
+    """
+    Helper function to create the Plotly figure for prices.
+    Shows the next 24 hours at the resolution of the series (24 hourly or 96 quarter-hourly bars).
+    """
+    resolution_minutes = series.resolution_minutes
+    display = series.slice(0, int(24 * 60 // resolution_minutes))
+    resolution_label = 'Hourly' if resolution_minutes == 60 else f'{resolution_minutes}-Minute'
+
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        x=df_display['start_time_local'],
-        y=df_display['price_eur_kwh'],
-        marker_color=df_display['price_eur_kwh'],
+        x=display.local_labels(timezone),
+        y=display.prices,
+        marker_color=display.prices,
         marker_colorscale='viridis',
         hoverinfo='x+y',
         hovertemplate='Time: %{x}<br>Price: %{y:.2f} €/kWh<extra></extra>'
     ))
 
     fig.update_layout(
-        title='Hourly Electricity Prices for the Next 24 Hours',
-        xaxis_title='Hour of Day (Local Time)',
+        title=f'{resolution_label} Electricity Prices for the Next 24 Hours',
+        xaxis_title='Time of Day (Local Time)',
         yaxis_title='Price (€/kWh)',
         xaxis=dict(tickformat='%H:%M'),
         plot_bgcolor='rgba(0,0,0,0)',
@@ -0,0 +1,65 @@
+from flask import Response, request
+
+from utils.metrics import record_payload, register_collector, render_metrics
+from callbacks.market_callbacks import price_figure_cache_stats
+from callbacks.ev_callbacks import analysis_cache_stats
+from callbacks.api_routes import api_cache_stats
+from utils.result_store import result_store_stats
+from utils.background_jobs import job_stats
+
+# Caches reported on /metrics, by name
+CACHE_STATS = {
+    'price_figure': price_figure_cache_stats,
+    'analysis': analysis_cache_stats,
+    'api_results': api_cache_stats,
+    'result_store': result_store_stats,
+}
+
+def register_metrics_routes(app):
+    """
+    Records request and response sizes of Dash callbacks and serves all collected metrics at
+    /metrics in the Prometheus text format.
+    """
+    server = app.server
+
+    def callback_name():
+        body = request.get_json(silent=True) or {}
+        spec = app.callback_map.get(body.get('output'))
+        return spec['callback'].__name__ if spec else 'unknown'
+
+    @server.after_request
+    def record_callback_payload(response):
+        if request.path.endswith('/_dash-update-component') and request.method == 'POST':
+            name = callback_name()
+            record_payload(name, 'request', request.content_length or 0)
+            if not response.direct_passthrough:
+                record_payload(name, 'response', response.calculate_content_length() or len(response.get_data()))
+        return response
+
+    @server.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def collect_cache_metrics():
+    """Size and hit/miss counters of the shared result caches, grouped by metric."""
+    stats = {name: get_stats() for name, get_stats in CACHE_STATS.items()}
+    metrics = []
+    for metric, metric_type, help_text, key in [
+        ('gridaware_cache_entries', 'gauge', "Entries held in each result cache.", 'size'),
+        ('gridaware_cache_hits_total', 'counter', "Result cache hits.", 'hits'),
+        ('gridaware_cache_misses_total', 'counter', "Result cache misses.", 'misses'),
+    ]:
+        metrics += [(metric, metric_type, help_text, {'cache': name}, cache[key]) for name, cache in stats.items()]
+    return metrics
+
+register_collector(collect_cache_metrics)
+
+def collect_job_metrics():
+    """Background analyses waiting or running in this worker's process pool."""
+    stats = job_stats()
+    return [
+        ('gridaware_background_jobs_pending', 'gauge', "Background jobs queued or running in this worker's pool.", {}, stats['pending']),
+        ('gridaware_background_job_processes', 'gauge', "Size of each worker's background job pool.", {}, stats['processes']),
+    ]
+
+register_collector(collect_job_metrics)
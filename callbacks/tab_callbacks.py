@@ -0,0 +1,31 @@
+from dash.dependencies import Input, Output, State
+from dash import no_update
+
+from components.ev_tab import create_ev_tab
+from components.about_tab import create_about_tab
+
+# Tabs rendered on first selection: tab value -> (index of its output, layout factory)
+LAZY_TABS = {
+    'tab-ev': (0, create_ev_tab),
+    'tab-about': (1, create_about_tab),
+}
+
+def register_tab_callbacks(app):
+    # Renders a tab's content the first time it is opened. The content then stays in the page,
+    # so form inputs and results survive switching between tabs.
+    @app.callback(
+        [Output('ev-tab-content', 'children'),
+         Output('about-tab-content', 'children'),
+         Output('rendered-tabs', 'data')],
+        [Input('app-tabs', 'value')],
+        [State('rendered-tabs', 'data')]
+    )
+    def render_tab_content(tab, rendered_tabs):
+        rendered_tabs = rendered_tabs or []
+        if tab not in LAZY_TABS or tab in rendered_tabs:
+            return no_update, no_update, no_update
+
+        index, create_tab = LAZY_TABS[tab]
+        outputs = [no_update, no_update, rendered_tabs + [tab]]
+        outputs[index] = create_tab()
+        return outputs
@@ -22,7 +22,7 @@ def create_about_tab():
             ]),
             html.Li([
                 html.B("User Control:"),
-                " Market data is only fetched on user request. All charging parameters are user-configurable."
+                " Market data can be refreshed on request at any time. All charging parameters are user-configurable."
             ]),
             html.Li([
                 html.B("Actionable Insights:"),
@@ -32,7 +32,8 @@ def create_about_tab():
         
         html.H3("Data Source"),
         html.P([
-            "Live market prices are sourced directly from the Awattar Germany API. More information can be found on their official documentation page: ",
+            "Live market prices are sourced directly from the Awattar API for Germany (DE-LU) or Austria (AT), selectable above the tabs. "
+            "A local price file can be added as a further source by setting GRIDAWARE_PRICE_FILE. More information on the Awattar API can be found on their official documentation page: ",
             html.A("https://www.awattar.de/services/api", href="https://www.awattar.de/services/api", target="_blank")
         ]),
 
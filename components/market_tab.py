@@ -5,7 +5,7 @@ from .subcomponents.price_plot import create_price_plot
 def create_market_tab():
     """Creates the layout for the 'Live Market Prices' tab."""
     return html.Div(className='card', children=[
-        html.H2("Hourly Electricity Market Prices", className='card-header'),
+        html.H2("Electricity Market Prices", className='card-header'),
         
         # Status banner to show fetch status, errors, and timestamps
         create_status_banner(),
@@ -2,8 +2,8 @@ from dash import dcc, html
 
 def create_ev_config_form():
     """
-    Creates the simplified layout for the EV configuration input form.
-    Removes presets, time windows, and modes for a more direct analysis.
+    Creates the layout for the EV configuration input form.
+    The departure time and taper inputs are only used by the 'Ready by departure' mode.
     """
     return html.Div(className='form-grid', children=[
         # Battery Capacity
@@ -31,4 +31,32 @@ def create_ev_config_form():
             html.Label("Charging Efficiency (%)", className='input-label'),
             dcc.Input(id='ev-efficiency', type='number', min=50, max=100, value=90, step=1, required=True)
         ]),
+        # Charging Mode
+        html.Div(className='input-group', children=[
+            html.Label("Charging Mode", className='input-label'),
+            dcc.RadioItems(
+                id='ev-charging-mode',
+                options=[
+                    {'label': 'Continuous block', 'value': 'contiguous'},
+                    {'label': 'Interruptible (cheapest hours)', 'value': 'flexible'},
+                    {'label': 'Ready by departure (with power taper)', 'value': 'deadline'}
+                ],
+                value='contiguous',
+                className='radio-group'
+            )
+        ]),
+        # Departure Time (deadline mode)
+        html.Div(className='input-group', children=[
+            html.Label("Departure Time (HH:MM)", className='input-label'),
+            dcc.Input(id='ev-departure-time', type='text', placeholder="e.g., 07:00", debounce=True)
+        ]),
+        # Power Taper (deadline mode)
+        html.Div(className='input-group', children=[
+            html.Label("Taper Starts at SoC (%)", className='input-label'),
+            dcc.Input(id='ev-taper-start-soc', type='number', min=0, max=100, value=80, step=1)
+        ]),
+        html.Div(className='input-group', children=[
+            html.Label("Power at 100% SoC (% of max)", className='input-label'),
+            dcc.Input(id='ev-taper-end-power', type='number', min=1, max=100, value=25, step=1)
+        ]),
     ])
\ No newline at end of file
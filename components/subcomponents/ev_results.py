@@ -6,6 +6,7 @@ def create_ev_results():
         id='ev-results-container',
         children=[
             html.Div(id='results-warning-banner', style={'display': 'none'}, className='status-banner status-banner-warning'),
+            html.Div(id='analysis-progress', style={'display': 'none'}, className='status-banner status-banner-info'),
             html.Div(id='results-output', style={'display': 'none'}, children=[
                 html.Div(className='results-grid', children=[
                     # Left Side: Summary Card
@@ -16,7 +17,9 @@ def create_ev_results():
                         html.Div(id='results-savings-card', className='savings-card'),
                         dcc.Graph(id='cost-breakdown-chart', config={'displayModeBar': False})
                     ])
-                ])
+                ]),
+                # Full width below: cost by start time and charging power (or target SoC)
+                dcc.Graph(id='cost-surface-chart', config={'displayModeBar': False})
             ])
         ]
     )
\ No newline at end of file
@@ -0,0 +1,20 @@
+from dash import dcc, html
+
+from utils.price_sources import list_zones
+from utils.zones import DEFAULT_ZONE
+
+def create_zone_selector():
+    """
+    Creates the bidding zone dropdown shown above the tabs. The selected zone applies to the
+    price chart and to the charging recommendations.
+    """
+    return html.Div(className='zone-selector-container', children=[
+        html.Label("Bidding zone / price source:", htmlFor='zone-selector', className='zone-selector-label'),
+        dcc.Dropdown(
+            id='zone-selector',
+            options=[{'label': label, 'value': zone} for zone, label in list_zones()],
+            value=DEFAULT_ZONE,
+            clearable=False,
+            className='zone-selector'
+        )
+    ])
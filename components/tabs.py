@@ -1,18 +1,20 @@
 from dash import dcc, html
 from .market_tab import create_market_tab
-from .ev_tab import create_ev_tab
-from .about_tab import create_about_tab
 
 def create_main_tabs():
-    """Creates the main Dash Tabs component with all three tabs."""
+    """
+    Creates the main Dash Tabs component with all three tabs.
+    Only the market tab is part of the initial layout; the EV and About tabs are filled in
+    by render_tab_content the first time they are selected.
+    """
     return dcc.Tabs(id="app-tabs", value='tab-market', className='custom-tabs-container', children=[
         dcc.Tab(label='Live Market Prices', value='tab-market', className='custom-tab', selected_className='custom-tab--selected', children=[
             create_market_tab()
         ]),
         dcc.Tab(label='EV Charging Optimization', value='tab-ev', className='custom-tab', selected_className='custom-tab--selected', children=[
-            create_ev_tab()
+            html.Div(id='ev-tab-content')
         ]),
         dcc.Tab(label='About & Help', value='tab-about', className='custom-tab', selected_className='custom-tab--selected', children=[
-            create_about_tab()
+            html.Div(id='about-tab-content')
         ]),
-    ])
\ No newline at end of file
+    ])
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import pytz
+from flask import Flask
+
+from callbacks import api_routes
+from callbacks.api_routes import register_api_routes, parse_config
+from utils.price_series import PriceSeries
+
+CONFIG = {'capacity': 60, 'soc_current': 20, 'soc_target': 80, 'max_power': 11, 'efficiency': 90}
+
+@pytest.fixture
+def client():
+    server = Flask(__name__)
+    register_api_routes(server, pytz.timezone('Europe/Berlin'))
+    return server.test_client()
+
+@pytest.mark.parametrize('url', ['/api/recommendation', '/api/recommendations'])
+@pytest.mark.parametrize('body', [[1, 2], "x", 5])
+def test_non_object_body_is_rejected(client, url, body):
+    response = client.post(url, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+@pytest.mark.parametrize('field', ['mode', 'zone'])
+def test_non_string_mode_or_zone_is_rejected(client, field):
+    response = client.post('/api/recommendation', json={**CONFIG, field: ['a']})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('overrides', [
+    {'soc_target': 300},
+    {'soc_current': -5},
+    {'efficiency': 500},
+    {'efficiency': 0},
+])
+def test_out_of_range_config_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        parse_config({**CONFIG, **overrides})
+
+def test_valid_config_is_canonical():
+    assert parse_config(CONFIG) == {key: float(value) for key, value in CONFIG.items()}
+
+DEADLINE_CONFIG = {**CONFIG, 'departure_time': '2024-05-01T07:00:00+02:00'}
+
+@pytest.mark.parametrize('power_curve', [
+    [[0, -5], [100, -5]],
+    [[0, 11], [100, 0]],
+    [[50, 11], [10, 3]],
+    [[0, 11], [0, 7]],
+    [[-10, 11], [100, 7]],
+    [[0, 11], [120, 7]],
+    [[0, 11], [100]],
+    'fast',
+])
+def test_invalid_power_curve_is_rejected(power_curve):
+    with pytest.raises(ValueError):
+        parse_config({**DEADLINE_CONFIG, 'power_curve': power_curve}, 'deadline')
+
+def test_invalid_power_curve_returns_400(client):
+    response = client.post('/api/recommendation',
+                           json={**DEADLINE_CONFIG, 'mode': 'deadline', 'power_curve': [[0, -5], [100, -5]]})
+    assert response.status_code == 400
+    assert 'power_curve' in response.get_json()['error']
+
+def test_valid_power_curve_is_kept():
+    config = parse_config({**DEADLINE_CONFIG, 'power_curve': [[0, 11], [80, 11], [100, 3.3]]}, 'deadline')
+    assert config['power_curve'] == ((0.0, 11.0), (80.0, 11.0), (100.0, 3.3))
+
+FLEET_BODY = {'site_limit_kw': 15, 'vehicles': [CONFIG, {**CONFIG, 'soc_current': 50}]}
+
+@pytest.fixture
+def fleet_client(client, monkeypatch):
+    prices = np.array([0.3, 0.1, np.nan, 0.2, 0.05, 0.25] * 4)
+    series = PriceSeries(1_704_067_200 + np.arange(len(prices)) * 3600, prices, 60)
+    monkeypatch.setattr(api_routes, 'get_current_prices', lambda timezone, zone: (series, 'api'))
+    return client
+
+def test_fleet_schedule(fleet_client):
+    response = fleet_client.post('/api/fleet', json=FLEET_BODY)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['success'] is True
+    assert len(data['vehicles']) == 2
+    assert max(slot['kw'] for slot in data['site_load']) <= 15
+    assert data['total_cost'] == pytest.approx(sum(v['total_cost'] for v in data['vehicles']), abs=1e-3)
+    # No charging in the slots without a price
+    assert all(slot['kw'] == 0 for slot in data['site_load'][2::6])
+
+def test_fleet_reports_unmet_energy(fleet_client):
+    data = fleet_client.post('/api/fleet', json={**FLEET_BODY, 'site_limit_kw': 0.5}).get_json()
+    assert data['success'] is False
+    assert all(v['unmet_kwh'] > 0 for v in data['vehicles'])
+
+@pytest.mark.parametrize('overrides', [
+    {'site_limit_kw': 0},
+    {'site_limit_kw': 'high'},
+    {'vehicles': []},
+    {'vehicles': [{**CONFIG, 'soc_target': 300}]},
+])
+def test_invalid_fleet_request_is_rejected(fleet_client, overrides):
+    response = fleet_client.post('/api/fleet', json={**FLEET_BODY, **overrides})
+    assert response.status_code == 400
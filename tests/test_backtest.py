@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.backtest import run_backtest, summarize_backtest, build_config_grid, _realized_cost
+from utils.ev_logic import find_optimal_charging_flexible
+from utils.price_archive import append_prices
+from utils.price_series import PriceSeries
+
+FIRST_DAY, LAST_DAY = date(2024, 3, 4), date(2024, 3, 8)
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """Hourly prices from 2024-03-01 to 2024-03-11 (UTC) in a scratch archive, one of them missing."""
+    monkeypatch.chdir(tmp_path)
+    start_times = pd.date_range('2024-03-01', '2024-03-11', freq='h', tz='UTC', inclusive='left')
+    hours = start_times.hour.to_numpy()
+    # Expensive evenings, cheap nights and middays, plus some day-to-day variation
+    prices = 0.2 + 0.1 * np.cos((hours - 19) / 24 * 2 * np.pi) + np.random.default_rng(0).uniform(0, 0.05, len(hours))
+    # 2024-03-06 10:00 UTC, far from the night charge of the 5th
+    prices[start_times.get_loc(pd.Timestamp('2024-03-06 10:00', tz='UTC'))] = np.nan
+    append_prices([{'start_time': ts.isoformat(), 'price_eur_kwh': price} for ts, price in zip(start_times, prices)])
+    return pd.Series(prices, index=start_times)
+
+@pytest.fixture
+def configs():
+    return build_config_grid([60.0], [20.0], [80.0], [3.7, 11.0], [90.0])
+
+def test_strategies_on_a_synthetic_archive(archive, configs):
+    results = run_backtest(FIRST_DAY, LAST_DAY, configs, workers=1)
+    costs = results.pivot_table(index=['day', 'config_id'], columns='strategy', values='cost')
+    naive = results.groupby(['day', 'config_id'])['naive_cost'].first()
+
+    assert set(results['strategy']) == {'contiguous', 'flexible', 'deadline'}
+    assert len(costs) == 5 * len(configs)
+    assert costs.notna().all().all()
+    assert (costs['flexible'] <= costs['contiguous'] + 1e-9).all()
+    assert (costs['contiguous'] <= naive + 1e-9).all()
+    # Departure at 07:00 leaves fewer slots than the whole 24-hour horizon
+    assert (costs['deadline'] >= costs['flexible'] - 1e-9).all()
+
+    summary = summarize_backtest(results, configs)
+    assert (summary['savings_eur'] >= 0).all()
+
+def test_flexible_strategy_uses_the_engine(archive, configs):
+    results = run_backtest(FIRST_DAY, FIRST_DAY, configs, strategy_names=('flexible',), workers=1)
+
+    day = archive['2024-03-04 17:00':'2024-03-05 16:00']  # 18:00 to 18:00 Berlin time
+    series = PriceSeries(day.index.asi8 // 10**9, day.to_numpy(), 60)
+    for config_id, config in configs.iterrows():
+        expected = find_optimal_charging_flexible(series, config.to_dict())['optimal_slot']['total_cost']
+        assert results.loc[results['config_id'] == config_id, 'cost'].item() == pytest.approx(expected)
+
+def test_missing_price_only_affects_charges_through_it(archive, configs):
+    results = run_backtest(date(2024, 3, 5), date(2024, 3, 5), configs, strategy_names=('contiguous',), workers=1)
+    # The horizon holds the missing slot, but the night charge does not use it
+    assert results['cost'].notna().all()
+    assert results['naive_cost'].notna().all()
+
+def test_realized_cost_is_nan_only_for_charges_through_a_missing_price():
+    prices = np.array([0.1, 0.2, np.nan, 0.4, 0.5])
+    first_slot = np.array([0, 3, 1, 0])
+    kwh_needed = np.array([2.0, 2.0, 2.0, 2.5])
+    kwh_per_slot = np.full(4, 1.0)
+    cost = _realized_cost(prices, first_slot, kwh_needed, kwh_per_slot)
+    np.testing.assert_allclose(cost, [0.3, 0.9, np.nan, np.nan])
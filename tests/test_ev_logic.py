@@ -0,0 +1,203 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import ev_logic
+from utils.price_series import PriceSeries
+from utils.ev_logic import (
+    find_optimal_charging, find_optimal_charging_batch, find_optimal_charging_flexible, find_optimal_charging_deadline,
+    find_cost_surface, _range_argmin, _time_to_charge, SOC_STEP_PERCENT
+)
+
+T0 = 1_704_067_200  # 2024-01-01 00:00 UTC
+
+def hourly_series(prices):
+    return PriceSeries(T0 + np.arange(len(prices)) * 3600, prices, 60)
+
+def departure_after(n_slots):
+    return pd.Timestamp(T0 + n_slots * 3600, unit='s', tz='UTC').isoformat()
+
+CONFIG = {'capacity': 30.0, 'soc_current': 0.0, 'soc_target': 10.0, 'max_power': 1.0, 'efficiency': 100.0}
+
+def prices_with_gaps(*missing):
+    prices = np.full(24, 0.5)
+    prices[10:13] = 0.1
+    prices[list(missing)] = np.nan
+    return prices
+
+def rolling_window_costs(prices, slots_needed, kwh_needed):
+    """Window costs as the original pandas engine computed them (a rolling sum by end slot)."""
+    sums = pd.Series(prices).rolling(window=slots_needed).sum().to_numpy()[slots_needed - 1:]
+    return sums / slots_needed * kwh_needed
+
+@pytest.mark.parametrize('missing', [(2,), (0,), (0, 11), (5, 20, 23)])
+def test_contiguous_skips_only_windows_with_missing_prices(missing):
+    prices = prices_with_gaps(*missing)
+    result = find_optimal_charging(hourly_series(prices), CONFIG)
+    assert result['success'], result['message']
+
+    expected = rolling_window_costs(prices, 3, 3.0)
+    np.testing.assert_allclose(result['all_slots']['total_cost'], expected, equal_nan=True)
+    assert result['optimal_slot']['total_cost'] == pytest.approx(np.nanmin(expected))
+    assert result['optimal_slot']['start_time'] == hourly_series(prices).start_times[int(np.nanargmin(expected))]
+    assert result['savings_eur'] == pytest.approx(np.nanmax(expected) - np.nanmin(expected))
+
+def test_contiguous_fails_without_a_fully_priced_window():
+    prices = np.array([0.1, np.nan, 0.2, np.nan, 0.3])
+    result = find_optimal_charging(hourly_series(prices), {**CONFIG, 'soc_target': 6.0})
+    assert not result['success']
+
+@pytest.mark.parametrize('seed', range(20))
+def test_range_argmin_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 40))
+    values = rng.integers(-5, 5, n).astype(float)  # ties included
+    lo = rng.integers(0, n, 50)
+    hi = np.maximum(lo, rng.integers(0, n, 50))
+
+    best = _range_argmin(values, lo, hi)
+    assert np.all((lo <= best) & (best <= hi))
+    np.testing.assert_array_equal(values[best], [values[l:h + 1].min() for l, h in zip(lo, hi)])
+
+def brute_force_deadline_cost(prices, config):
+    """Cheapest cost over every SoC path on the engine's grid, enumerated exhaustively."""
+    n_steps = int(np.ceil((config['soc_target'] - config['soc_current']) / SOC_STEP_PERCENT))
+    soc_grid = np.linspace(config['soc_current'], config['soc_target'], n_steps + 1)
+    hours_to = _time_to_charge(soc_grid, config)
+    grid_kwh = (soc_grid - soc_grid[0]) * config['capacity'] / config['efficiency']
+
+    best = np.inf
+    for path in itertools.product(range(len(soc_grid)), repeat=len(prices)):
+        if path[-1] != len(soc_grid) - 1:
+            continue
+        cost, previous = 0.0, 0
+        for price, j in zip(prices, path):
+            if j < previous or hours_to[j] - hours_to[previous] > 1 + 1e-9:
+                break
+            if j > previous:
+                if np.isnan(price):
+                    break
+                cost += price * (grid_kwh[j] - grid_kwh[previous])
+            previous = j
+        else:
+            best = min(best, cost)
+    return best
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('power_curve', [None, ((0.0, 1.2), (51.0, 1.2), (52.5, 0.3))], ids=['flat', 'taper'])
+def test_deadline_matches_brute_force(seed, power_curve):
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.uniform(-0.05, 0.4, 5), 4)
+    if seed % 3 == 0:
+        prices[rng.integers(0, 5)] = np.nan
+    # 0.6 kW adds 1% (two grid steps) per hour, so the target needs at least 3 of the 5 slots
+    config = {'capacity': 60.0, 'soc_current': 50.0, 'soc_target': 53.0, 'max_power': 1.2 if power_curve else 0.6,
+              'efficiency': 100.0, 'departure_time': departure_after(len(prices)), 'power_curve': power_curve}
+
+    expected = brute_force_deadline_cost(prices, config)
+    result = find_optimal_charging_deadline(hourly_series(prices), config)
+    if np.isinf(expected):
+        assert not result['success']
+    else:
+        assert result['success'], result['message']
+        assert result['optimal_slot']['total_cost'] == pytest.approx(expected, abs=1e-9)
+        assert result['charging_slots']['cost'].sum() == pytest.approx(expected, abs=1e-9)
+
+def test_deadline_with_constant_power_fills_the_cheapest_slots():
+    prices = np.array([0.30, 0.10, 0.25, 0.05, 0.20, 0.15])
+    # 6 kWh needed at 2 kW: the three cheapest hours
+    config = {'capacity': 50.0, 'soc_current': 40.0, 'soc_target': 52.0, 'max_power': 2.0,
+              'efficiency': 100.0, 'departure_time': departure_after(len(prices))}
+
+    result = find_optimal_charging_deadline(hourly_series(prices), config)
+    assert result['success'], result['message']
+    assert result['optimal_slot']['total_cost'] == pytest.approx(2.0 * (0.05 + 0.10 + 0.15))
+    assert list(result['charging_slots']['start_time'].dt.hour) == [1, 3, 5]
+
+def test_deadline_ignores_slots_after_departure():
+    prices = np.array([0.30, 0.20, 0.01, 0.01])
+    config = {'capacity': 50.0, 'soc_current': 40.0, 'soc_target': 44.0, 'max_power': 2.0,
+              'efficiency': 100.0, 'departure_time': departure_after(2)}
+
+    result = find_optimal_charging_deadline(hourly_series(prices), config)
+    assert result['success'], result['message']
+    assert result['optimal_slot']['total_cost'] == pytest.approx(2.0 * 0.20)
+
+BATCH_CONFIGS = [
+    CONFIG,
+    {**CONFIG, 'soc_target': 4.0},
+    {**CONFIG, 'max_power': 0.4, 'efficiency': 90.0},
+    {**CONFIG, 'soc_current': 50.0, 'soc_target': 40.0},
+    {**CONFIG, 'max_power': 0.01},
+]
+
+@pytest.mark.parametrize('missing', [(), (0,), (2, 11), (0, 1, 2, 3)])
+def test_batch_matches_the_single_engine(missing):
+    series = hourly_series(prices_with_gaps(*missing))
+    batch = find_optimal_charging_batch(series, BATCH_CONFIGS)
+
+    for config, (_, row) in zip(BATCH_CONFIGS, batch.iterrows()):
+        single = find_optimal_charging(series, config)
+        assert row['success'] == single['success']
+        if not single['success']:
+            assert row['message'] == single['message']
+            continue
+        optimal = single['optimal_slot']
+        assert row['start_time'] == optimal['start_time']
+        assert row['total_cost'] == pytest.approx(optimal['total_cost'])
+        assert row['savings_eur'] == pytest.approx(single['savings_eur'])
+
+@pytest.mark.parametrize('missing', [(), (0,), (2, 11)])
+def test_cost_surface_matches_the_single_engine(missing):
+    prices = prices_with_gaps(*missing)
+    powers, soc_targets = [0.5, 1.0, 3.0], [4.0, 10.0]
+    surface = find_cost_surface(hourly_series(prices), CONFIG, powers, soc_targets)
+    assert surface['success']
+
+    for i, soc_target in enumerate(soc_targets):
+        for j, power in enumerate(powers):
+            config = {**CONFIG, 'soc_target': soc_target, 'max_power': power}
+            single = find_optimal_charging(hourly_series(prices), config)
+            costs = surface['costs'][i, j]
+            window_costs = single['all_slots']['total_cost'].to_numpy()
+            np.testing.assert_allclose(costs[:len(window_costs)], window_costs, equal_nan=True)
+            assert np.isnan(costs[len(window_costs):]).all()
+
+def test_flexible_skips_missing_prices():
+    prices = np.array([0.3, np.nan, 0.1, np.nan, 0.2, np.nan, 0.05])
+    result = find_optimal_charging_flexible(hourly_series(prices), CONFIG)
+    assert result['success'], result['message']
+    assert list(result['charging_slots']['start_time'].dt.hour) == [2, 4, 6]
+    assert result['optimal_slot']['total_cost'] == pytest.approx(0.35)
+    assert result['savings_eur'] == pytest.approx(0.6 - 0.35)
+    # No three consecutive slots are priced, so there is no continuous block to compare with
+    assert result['all_slots']['total_cost'].isna().all()
+
+def test_flexible_compares_with_the_cheapest_priced_block():
+    prices = prices_with_gaps(0, 11)
+    result = find_optimal_charging_flexible(hourly_series(prices), CONFIG)
+    assert result['success'], result['message']
+    expected = rolling_window_costs(prices, 3, 3.0)
+    assert result['contiguous_start_time'] == hourly_series(prices).start_times[int(np.nanargmin(expected))]
+
+def test_flexible_fails_with_too_few_priced_slots():
+    prices = np.array([0.3, np.nan, 0.1, np.nan])
+    result = find_optimal_charging_flexible(hourly_series(prices), CONFIG)
+    assert not result['success']
+
+@pytest.mark.parametrize('engine', [find_optimal_charging, find_optimal_charging_flexible])
+def test_vectorized_engines_report_progress_and_stop_when_cancelled(engine, monkeypatch):
+    monkeypatch.setattr(ev_logic, 'PROGRESS_CHUNK_SLOTS', 5)
+    series = hourly_series(prices_with_gaps(2))
+    reported = []
+    result = engine(series, CONFIG, lambda fraction: reported.append(fraction) or True)
+    assert result['success'], result['message']
+    assert reported == sorted(reported) and len(reported) > 2
+    unchunked = engine(series, CONFIG)
+    assert result['optimal_slot'] == unchunked['optimal_slot']
+    np.testing.assert_array_equal(result['all_slots']['total_cost'], unchunked['all_slots']['total_cost'])
+
+    cancelled = engine(series, CONFIG, lambda fraction: fraction < 0.5)
+    assert not cancelled['success'] and cancelled['cancelled']
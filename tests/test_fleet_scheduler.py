@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from utils.price_series import PriceSeries
+from utils.ev_logic import find_optimal_charging
+from utils.fleet_scheduler import schedule_fleet_charging
+
+T0 = 1_704_067_200  # 2024-01-01 00:00 UTC
+
+def quarter_hour_series(prices):
+    return PriceSeries(T0 + np.arange(len(prices)) * 900, prices, 15)
+
+def random_fleet(n_vehicles, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'capacity': float(rng.uniform(40, 100)), 'soc_current': float(rng.uniform(10, 50)), 'soc_target': 80.0,
+             'max_power': float(rng.choice([3.7, 7.4, 11.0, 22.0])), 'efficiency': 90.0}
+            for _ in range(n_vehicles)]
+
+def random_prices(n_slots, seed=0):
+    return np.random.default_rng(seed).uniform(0.05, 0.35, n_slots)
+
+@pytest.mark.parametrize('site_limit_kw', [50.0, 300.0, 5000.0])
+def test_site_limit_is_never_exceeded(site_limit_kw):
+    fleet = random_fleet(400)
+    result = schedule_fleet_charging(quarter_hour_series(random_prices(192)), fleet, site_limit_kw)
+
+    assert result['site_load_kw'].max() <= site_limit_kw
+    assert result['schedule_kw'].sum(axis=0).max() <= site_limit_kw * (1 + 1e-12)
+    assert (result['schedule_kw'] <= np.array([v['max_power'] for v in fleet])[:, None] + 1e-9).all()
+
+def test_infeasible_demand_is_reported():
+    fleet = random_fleet(50)
+    result = schedule_fleet_charging(quarter_hour_series(random_prices(8)), fleet, 20.0)
+
+    assert not result['success']
+    assert 'cannot be fully charged' in result['message']
+    assert result['unmet_kwh'].sum() > 0
+    # Whatever could be delivered fills the site limit in every slot
+    np.testing.assert_allclose(result['site_load_kw'], 20.0)
+
+def test_delivered_energy_matches_demand():
+    fleet = random_fleet(30)
+    result = schedule_fleet_charging(quarter_hour_series(random_prices(192)), fleet, 200.0)
+
+    assert result['success'], result['message']
+    demand = [(v['soc_target'] - v['soc_current']) / 100 * v['capacity'] / (v['efficiency'] / 100) for v in fleet]
+    np.testing.assert_allclose(result['schedule_kw'].sum(axis=1) * 0.25, demand)
+
+def test_total_cost_beats_the_per_vehicle_loop():
+    fleet = random_fleet(20)
+    series = quarter_hour_series(random_prices(192))
+    result = schedule_fleet_charging(series, fleet, 10_000.0)
+
+    loop_cost = sum(find_optimal_charging(series, vehicle)['optimal_slot']['total_cost'] for vehicle in fleet)
+    assert result['success'], result['message']
+    assert result['total_cost'] < loop_cost
+
+def test_missing_prices_are_not_used():
+    prices = random_prices(96)
+    prices[[0, 10, 50]] = np.nan
+    result = schedule_fleet_charging(quarter_hour_series(prices), random_fleet(10), 100.0)
+
+    assert result['success'], result['message']
+    assert np.isfinite(result['vehicle_cost']).all()
+    assert (result['site_load_kw'][[0, 10, 50]] == 0).all()
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+import requests
+
+from utils import http_client
+from utils.http_client import get_json, MAX_ATTEMPTS, TOTAL_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS, BACKOFF_MAX_SECONDS
+
+URL = 'https://prices.example/v1/marketdata'
+
+class Clock:
+    """Stands in for the time module: sleeping and timed-out requests advance a fake clock."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def response(status_code, body=None, headers=None):
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = json.dumps(body or {}).encode()
+    result.headers.update(headers or {})
+    return result
+
+class StubSession:
+    """Answers each GET with the next queued outcome: a response, or an exception (timeouts raised once they expire)."""
+    def __init__(self, clock, outcomes):
+        self.clock, self.outcomes, self.timeouts = clock, list(outcomes), []
+
+    def get(self, url, params=None, timeout=None):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            if isinstance(outcome, requests.exceptions.Timeout):
+                self.clock.now += timeout[0] if isinstance(outcome, requests.exceptions.ConnectTimeout) else timeout[1]
+            raise outcome
+        return outcome
+
+@pytest.fixture
+def stub(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client, 'time', clock)
+
+    def make(*outcomes):
+        session = StubSession(clock, outcomes)
+        monkeypatch.setattr(http_client, 'get_session', lambda: session)
+        return session
+    return clock, make
+
+def test_server_errors_are_retried_with_backoff(stub):
+    clock, make = stub
+    session = make(response(503), response(502), response(200, {'data': [1]}))
+
+    assert get_json(URL) == {'data': [1]}
+    assert len(session.timeouts) == 3
+    assert len(clock.sleeps) == 2
+    # Full jitter below an exponentially growing cap
+    assert 0 <= clock.sleeps[0] <= 0.5 and 0 <= clock.sleeps[1] <= 1.0
+
+def test_retry_after_is_honoured_up_to_the_cap(stub):
+    clock, make = stub
+    make(response(429, headers={'Retry-After': '2'}), response(429, headers={'Retry-After': '120'}), response(200))
+
+    get_json(URL)
+    assert clock.sleeps == [2.0, BACKOFF_MAX_SECONDS]
+
+def test_client_errors_are_not_retried(stub):
+    clock, make = stub
+    session = make(response(404))
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        get_json(URL)
+    assert len(session.timeouts) == 1 and clock.sleeps == []
+
+def test_last_server_error_is_raised(stub):
+    clock, make = stub
+    session = make(*[response(500)] * MAX_ATTEMPTS)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        get_json(URL)
+    assert len(session.timeouts) == MAX_ATTEMPTS
+
+def test_connection_errors_are_retried_until_the_last_attempt(stub):
+    clock, make = stub
+    session = make(*[requests.exceptions.ConnectionError()] * MAX_ATTEMPTS)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        get_json(URL)
+    assert len(session.timeouts) == MAX_ATTEMPTS
+    assert len(clock.sleeps) == MAX_ATTEMPTS - 1
+
+def test_hung_upstream_stays_within_the_total_budget(stub):
+    clock, make = stub
+    session = make(requests.exceptions.ConnectTimeout(), *[requests.exceptions.ReadTimeout()] * (MAX_ATTEMPTS - 1))
+
+    with pytest.raises(requests.exceptions.Timeout):
+        get_json(URL)
+    assert clock.now <= TOTAL_TIMEOUT_SECONDS
+    # The second attempt only gets what is left of the budget, and no third one fits
+    assert len(session.timeouts) == 2
+    assert session.timeouts[1][1] < READ_TIMEOUT_SECONDS
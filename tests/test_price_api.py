@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from utils.price_api import get_fallback_data, save_fallback_data
+
+LEGACY_DATA = {
+    'success': True,
+    'timestamp': '2025-07-30 20:31:15 CEST',
+    'prices': [
+        {'start_time': '2025-07-30T19:00:00+00:00', 'price_eur_kwh': 0.109},
+        {'start_time': '2025-07-30T20:00:00+00:00', 'price_eur_kwh': 0.104},
+    ]
+}
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path / 'data'
+
+def write_legacy(data_dir, data=LEGACY_DATA):
+    (data_dir / 'last_prices.json').write_text(json.dumps(data))
+
+def test_legacy_fallback_is_imported(data_dir):
+    write_legacy(data_dir)
+    fallback = get_fallback_data()
+    assert fallback['timestamp'] == LEGACY_DATA['timestamp']
+    assert [p['price_eur_kwh'] for p in fallback['prices']] == [0.109, 0.104]
+    assert fallback['prices'][0]['start_time'] == '2025-07-30T19:00:00+00:00'
+
+def test_legacy_fallback_is_imported_once(data_dir):
+    write_legacy(data_dir)
+    get_fallback_data()
+    write_legacy(data_dir, {**LEGACY_DATA, 'timestamp': 'changed'})
+    assert get_fallback_data()['timestamp'] == LEGACY_DATA['timestamp']
+
+def test_newer_fetch_wins_over_legacy_fallback(data_dir):
+    write_legacy(data_dir)
+    save_fallback_data({'success': True, 'timestamp': 'new', 'prices': [
+        {'start_time': '2025-08-01T10:00:00+00:00', 'price_eur_kwh': 0.2}
+    ]})
+    fallback = get_fallback_data()
+    assert fallback['timestamp'] == 'new'
+    assert [p['price_eur_kwh'] for p in fallback['prices']] == [0.2]
+
+@pytest.mark.parametrize('content', ['not json', '[1, 2]', '{"success": false}', '{"success": true, "prices": [{"x": 1}]}'])
+def test_unusable_legacy_fallback_is_ignored(data_dir, content):
+    (data_dir / 'last_prices.json').write_text(content)
+    assert get_fallback_data() is None
+
+def test_legacy_fallback_only_applies_to_the_default_zone(data_dir):
+    write_legacy(data_dir)
+    assert get_fallback_data('AT') is None
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+
+from utils import price_cache
+from utils.file_lock import file_lock
+from utils.price_cache import get_market_prices, read_cache_expiry
+from utils.zones import DEFAULT_ZONE, zone_path
+
+FAILURE = {'success': False, 'error': "Upstream is down."}
+
+def hourly_prices(hours=24):
+    start = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return {
+        'success': True,
+        'timestamp': 'now',
+        'prices': [{'start_time': (start + timedelta(hours=h)).isoformat(), 'price_eur_kwh': 0.1 + h / 100}
+                   for h in range(hours)]
+    }
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """Scratch cache whose zone source answers with the queued results, recording every call."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(price_cache, '_memo', {})
+    # Every successful fetch expires at once, so the next request asks the source again
+    monkeypatch.setattr(price_cache, 'compute_expiry', lambda api_data, now_utc: now_utc)
+    calls, results = [], []
+
+    def fetch_zone_prices(zone, timezone, start=None):
+        calls.append(start)
+        return results.pop(0)
+
+    monkeypatch.setattr(price_cache, 'fetch_zone_prices', fetch_zone_prices)
+    return calls, results
+
+def test_failure_after_a_successful_fetch_keeps_the_last_good_prices(source, monkeypatch):
+    calls, results = source
+    good = hourly_prices()
+    results.extend([good, FAILURE])
+
+    assert get_market_prices(dt_timezone.utc)['prices'] == good['prices']
+    # The refresh fails, but the prices fetched before are still served
+    assert get_market_prices(dt_timezone.utc)['prices'] == good['prices']
+    assert len(calls) == 2
+    assert read_cache_expiry() > datetime.now(dt_timezone.utc).timestamp()
+
+    # Within the back-off the source is not asked again
+    assert get_market_prices(dt_timezone.utc)['prices'] == good['prices']
+    assert len(calls) == 2
+
+    # Once it has passed, the next request retries and a success clears the failure
+    monkeypatch.setattr(price_cache, 'FAILURE_TTL_SECONDS', 0)
+    next_slot = {'start_time': hourly_prices(25)['prices'][-1]['start_time'], 'price_eur_kwh': 0.2}
+    results.append({**good, 'prices': [next_slot]})
+    assert get_market_prices(dt_timezone.utc)['prices'] == good['prices'] + [next_slot]
+    # Only the slots after the last good one were requested
+    assert calls[-1] == datetime.fromisoformat(next_slot['start_time'])
+    assert 'failure' not in price_cache._read_entry()
+
+def test_failure_without_good_prices_is_served_during_the_back_off(source):
+    calls, results = source
+    results.append(FAILURE)
+
+    assert get_market_prices(dt_timezone.utc) == FAILURE
+    assert get_market_prices(dt_timezone.utc) == FAILURE
+    assert len(calls) == 1
+
+def test_expired_prices_are_served_while_another_worker_refreshes(source):
+    calls, results = source
+    good = hourly_prices()
+    results.append(good)
+    get_market_prices(dt_timezone.utc)
+
+    # The entry has expired, but the refresh lock is held elsewhere: answer at once from the cache
+    with file_lock(zone_path(price_cache.LOCK_FILE, DEFAULT_ZONE)):
+        assert get_market_prices(dt_timezone.utc)['prices'] == good['prices']
+    assert len(calls) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.price_series import PriceSeries
+
+def test_series_does_not_share_the_callers_arrays():
+    epoch_s = np.array([0, 3600, 7200])
+    prices = np.array([0.1, 0.2, 0.3])
+    series = PriceSeries(epoch_s, prices)
+    version = series.version
+
+    epoch_s[0], prices[0] = 60, 99.0
+    assert series.epoch_s[0] == 0 and series.prices[0] == 0.1
+    assert series.version == version
+
+def test_series_does_not_share_the_frames_columns():
+    df = pd.DataFrame({
+        'start_time': pd.date_range('2024-01-01', periods=3, freq='h', tz='UTC'),
+        'price_eur_kwh': [0.1, 0.2, 0.3]
+    })
+    series = PriceSeries.from_frame(df)
+    version = series.version
+
+    df.loc[0, 'price_eur_kwh'] = 99.0
+    assert series.prices[0] == 0.1
+    assert series.version == version
+
+def test_arrays_are_read_only():
+    series = PriceSeries([0, 3600], [0.1, 0.2])
+    with pytest.raises(ValueError):
+        series.prices[0] = 1.0
+    with pytest.raises(AttributeError):
+        series.prices = np.zeros(2)
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils.price_series import PriceSeries
+from utils.wire_format import (
+    encode_price_store, decode_price_store, price_store_version, price_store_extension
+)
+
+T0 = 1_700_000_100  # on a 15-minute boundary
+STEP = 900
+
+def round_trip(series):
+    # Through JSON, as the store is sent to the browser and back
+    return decode_price_store(json.loads(json.dumps(encode_price_store(series))))
+
+def assert_same_series(decoded, series):
+    np.testing.assert_array_equal(decoded.epoch_s, series.epoch_s)
+    np.testing.assert_allclose(decoded.prices, series.prices, rtol=0, atol=1e-9, equal_nan=True)
+    assert decoded.resolution_minutes == series.resolution_minutes
+
+@pytest.mark.parametrize('epoch_s', [
+    T0 + np.arange(6) * STEP,
+    T0 + np.array([0, 1, 2, 4, 5, 9]) * STEP,
+], ids=['regular', 'irregular'])
+@pytest.mark.parametrize('prices', [
+    [0.12345, 0.2, -0.05, 0.0, 0.31, 0.18],
+    [np.nan, 0.2, np.nan, np.nan, 0.31, np.nan],
+    [np.nan] * 6,
+], ids=['complete', 'missing', 'all-missing'])
+def test_round_trip(epoch_s, prices):
+    series = PriceSeries(epoch_s, prices, 15)
+    decoded = round_trip(series)
+    assert_same_series(decoded, series)
+    assert decoded.version == series.version
+
+def test_missing_prices_are_sent_as_null():
+    store = encode_price_store(PriceSeries(T0 + np.arange(3) * STEP, [0.1, np.nan, 0.3], 15))
+    assert store['price_deltas'] == [10_000, None, 20_000]
+
+def test_extension_with_missing_prices():
+    prices = [0.1, 0.2, np.nan, 0.4, np.nan, np.nan, 0.15]
+    full = PriceSeries(T0 + np.arange(len(prices)) * STEP, prices, 15)
+    store = encode_price_store(full.slice(0, 3))
+
+    deltas, version = price_store_extension(price_store_version(store), full.slice(3))
+    store['price_deltas'].extend(deltas)
+    assert_same_series(decode_price_store(store), full)
+    assert version == {**price_store_version(store), 'first_new_start': version['first_new_start']}
+
+def test_version_distinguishes_missing_prices():
+    epoch_s = T0 + np.arange(2) * STEP
+    assert PriceSeries(epoch_s, [0.0, 0.1], 15).version != PriceSeries(epoch_s, [np.nan, 0.1], 15).version
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_lock import write_json_atomic
+from utils.metrics import inc_counter
+from utils.wire_format import json_ready
+
+# --- Constants ---
+# Expensive analyses run in a small process pool next to each web worker, so they never hold
+# one of its request threads. Job status is written to local disk, so a progress poll can be
+# answered by any worker process on the host, not only by the one that started the job.
+JOB_DIR = "data/jobs"
+JOB_PROCESSES = int(os.environ.get('GRIDAWARE_JOB_PROCESSES', 2))
+# Unfinished jobs per web worker; further submissions are refused until one completes.
+MAX_PENDING_JOBS = 8
+# Minimum time between two progress writes of a running job.
+PROGRESS_WRITE_SECONDS = 0.25
+# Status files of finished (or abandoned) jobs are removed after this long.
+JOB_TTL_SECONDS = 60 * 60
+
+_pool = {'pid': None, 'executor': None, 'pending': set()}
+_pool_lock = threading.Lock()
+
+def _status_path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.json")
+
+def _cancel_path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.cancel")
+
+def _write_status(job_id, status, **fields):
+    write_json_atomic(_status_path(job_id), {'id': job_id, 'status': status, 'updated': time.time(), **fields})
+
+def _cancel_requested(job_id):
+    return os.path.exists(_cancel_path(job_id))
+
+def _get_executor():
+    """The pool of the current process; forked web workers start their own."""
+    with _pool_lock:
+        if _pool['pid'] != os.getpid():
+            # Spawned rather than forked: web workers run threads (prefetcher, request handlers)
+            # whose locks a forked child could inherit in a held state.
+            _pool['executor'] = ProcessPoolExecutor(JOB_PROCESSES, mp_context=multiprocessing.get_context('spawn'))
+            _pool['pid'], _pool['pending'] = os.getpid(), set()
+        return _pool['executor']
+
+def _remove_expired_jobs():
+    cutoff = time.time() - JOB_TTL_SECONDS
+    try:
+        names = os.listdir(JOB_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(JOB_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+class _ProgressReporter:
+    """Passed to the job function as progress(fraction); returns False once the job is cancelled."""
+
+    def __init__(self, job_id, meta):
+        self.job_id, self.meta = job_id, meta
+        self.last_write = 0.0
+
+    def __call__(self, fraction):
+        if _cancel_requested(self.job_id):
+            return False
+        now = time.monotonic()
+        if now - self.last_write >= PROGRESS_WRITE_SECONDS:
+            _write_status(self.job_id, 'running', progress=round(float(fraction), 3), meta=self.meta)
+            self.last_write = now
+        return True
+
+def _run_job(job_id, func, args, meta):
+    # Runs in a pool process. Plotly figures and Dash components in the result are converted
+    # to plain JSON (see json_ready).
+    if _cancel_requested(job_id):
+        _write_status(job_id, 'cancelled', meta=meta)
+        return 'cancelled'
+    _write_status(job_id, 'running', progress=0.0, meta=meta)
+    try:
+        result = func(*args, progress=_ProgressReporter(job_id, meta))
+        if _cancel_requested(job_id):
+            _write_status(job_id, 'cancelled', meta=meta)
+            return 'cancelled'
+        _write_status(job_id, 'done', progress=1.0, meta=meta, result=json_ready(result))
+        return 'done'
+    except Exception as e:
+        _write_status(job_id, 'failed', meta=meta, error=str(e))
+        return 'failed'
+
+def _job_finished(job_id, future):
+    with _pool_lock:
+        _pool['pending'].discard(job_id)
+    if future.cancelled():
+        _write_status(job_id, 'cancelled')
+        status = 'cancelled'
+    elif future.exception() is not None:
+        # The pool process died (e.g. killed for memory) before the job could record it
+        _write_status(job_id, 'failed', error=str(future.exception()) or "The analysis process stopped unexpectedly.")
+        status = 'failed'
+    else:
+        status = future.result()
+    inc_counter('gridaware_background_jobs_total', "Background jobs by final status.", {'status': status})
+
+def submit_job(func, args, meta=None):
+    """
+    Runs func(*args, progress=...) in the background process pool. func must be a module-level
+    function; progress(fraction) returns False once the job has been cancelled, and func should
+    then return early. meta (JSON-ready) is stored with the job's status.
+
+    Returns {'success': True, 'job_id': str}, or {'success': False, 'error': str} if too many
+    jobs are already waiting.
+    """
+    executor = _get_executor()
+    with _pool_lock:
+        if len(_pool['pending']) >= MAX_PENDING_JOBS:
+            return {'success': False, 'error': "The server is busy with other analyses. Please try again shortly."}
+        job_id = uuid.uuid4().hex
+        _pool['pending'].add(job_id)
+
+    _remove_expired_jobs()
+    _write_status(job_id, 'queued', progress=0.0, meta=meta)
+    try:
+        future = executor.submit(_run_job, job_id, func, args, meta)
+    except RuntimeError as e:
+        # Broken pool (a worker process died); the next submission starts a new one
+        with _pool_lock:
+            _pool['pid'] = None
+            _pool['pending'].discard(job_id)
+        _write_status(job_id, 'failed', meta=meta, error=str(e))
+        return {'success': False, 'error': f"The analysis could not be started: {e}"}
+    future.add_done_callback(lambda f: _job_finished(job_id, f))
+    return {'success': True, 'job_id': job_id}
+
+def read_job(job_id):
+    """Status of a job ({'id', 'status', 'progress', 'meta', 'result' or 'error'}), or None if unknown."""
+    if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+        return None
+    try:
+        with open(_status_path(job_id)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+def cancel_job(job_id):
+    """
+    Asks a job to stop. Queued jobs are dropped before they start and running ones stop at
+    their next progress report. Works from any worker process.
+    """
+    job = read_job(job_id)
+    if job is None or job['status'] not in ('queued', 'running'):
+        return
+    with open(_cancel_path(job_id), 'w'):
+        pass
+
+def job_stats():
+    with _pool_lock:
+        pending = len(_pool['pending']) if _pool['pid'] == os.getpid() else 0
+    return {'pending': pending, 'max_pending': MAX_PENDING_JOBS, 'processes': JOB_PROCESSES}
@@ -0,0 +1,232 @@
+import os
+import argparse
+import itertools
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from utils.ev_logic import (
+    find_optimal_charging_batch, find_optimal_charging_flexible, find_optimal_charging_deadline,
+    get_slot_hours, _masked_prefix, _window_sums
+)
+from utils.price_archive import query_prices
+from utils.price_series import PriceSeries
+from utils.zones import DEFAULT_ZONE
+
+# --- Constants ---
+BACKTEST_TIMEZONE = pytz.timezone('Europe/Berlin')
+DEFAULT_PLUG_IN_HOUR = 18
+DEFAULT_HORIZON_HOURS = 24
+# Local hour by which the 'deadline' strategy has to finish (the next morning for evening plug-ins)
+DEFAULT_DEPARTURE_HOUR = 7
+
+# Usage (from the project root):
+#   python -m utils.backtest --start 2024-01-01 --end 2024-12-31 --max-power 3.7,11,22
+
+def build_config_grid(capacity, soc_current, soc_target, max_power, efficiency):
+    """Returns a DataFrame with one row per combination of the given config values."""
+    rows = itertools.product(capacity, soc_current, soc_target, max_power, efficiency)
+    return pd.DataFrame(list(rows), columns=['capacity', 'soc_current', 'soc_target', 'max_power', 'efficiency'])
+
+def _realized_cost(prices, first_slot, kwh_needed, kwh_per_slot):
+    """
+    Cost of charging at full power through `prices` from first_slot onwards until kwh_needed is
+    delivered, with the remainder at partial power in the last slot. Everything except prices is
+    a per-config array; configs that run out of slots or charge in a slot without a price get NaN.
+    """
+    prefix = _masked_prefix(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        full_slots = np.floor(kwh_needed / kwh_per_slot)
+    feasible = np.isfinite(full_slots) & (kwh_needed > 0) & (first_slot >= 0)
+    full_slots = np.where(feasible, full_slots, 0).astype(np.int64)
+    first_slot = np.where(feasible, first_slot, 0).astype(np.int64)
+
+    partial_kwh = np.where(feasible, kwh_needed - full_slots * kwh_per_slot, 0.0)
+    has_partial = partial_kwh > 1e-9
+    end_slot = first_slot + full_slots
+    feasible &= end_slot + has_partial <= len(prices)
+
+    end_slot = np.minimum(end_slot, len(prices))
+    next_price = prices[np.minimum(end_slot, len(prices) - 1)]
+    cost = kwh_per_slot * _window_sums(prefix, first_slot, end_slot) + np.where(has_partial, partial_kwh * next_price, 0.0)
+    return np.where(feasible, cost, np.nan)
+
+def _day_series(start_times, prices):
+    return PriceSeries(start_times.asi8 // 10**9, prices, int(round(get_slot_hours(start_times) * 60)))
+
+def _engine_costs(engine, configs):
+    """Total cost of engine(config) for every config row, NaN where the engine finds no plan."""
+    costs = np.full(len(configs), np.nan)
+    for i, config in enumerate(configs.to_dict('records')):
+        results = engine(config)
+        if results['success']:
+            costs[i] = results['optimal_slot']['total_cost']
+    return costs
+
+def _naive_strategy(start_times, prices, configs, kwh_needed, kwh_per_slot, departure):
+    """Charges immediately at plug-in time."""
+    return _realized_cost(prices, np.zeros(len(configs), dtype=np.int64), kwh_needed, kwh_per_slot)
+
+def _contiguous_strategy(start_times, prices, configs, kwh_needed, kwh_per_slot, departure):
+    """Starts at the beginning of the block chosen by find_optimal_charging (batch engine)."""
+    day_df = pd.DataFrame({'start_time': start_times, 'price_eur_kwh': prices})
+    results = find_optimal_charging_batch(day_df, configs)
+    first_slot = np.where(
+        results['success'].to_numpy(),
+        start_times.searchsorted(pd.DatetimeIndex(results['start_time'].fillna(start_times[0]))),
+        -1
+    )
+    return _realized_cost(prices, first_slot, kwh_needed, kwh_per_slot)
+
+def _flexible_strategy(start_times, prices, configs, kwh_needed, kwh_per_slot, departure):
+    """The interruptible plan of find_optimal_charging_flexible."""
+    series = _day_series(start_times, prices)
+    return _engine_costs(lambda config: find_optimal_charging_flexible(series, config), configs)
+
+def _deadline_strategy(start_times, prices, configs, kwh_needed, kwh_per_slot, departure):
+    """The plan of find_optimal_charging_deadline, finishing by the day's departure time."""
+    series = _day_series(start_times, prices)
+    departure_time = departure.isoformat()
+    return _engine_costs(lambda config: find_optimal_charging_deadline(series, {**config, 'departure_time': departure_time}), configs)
+
+# Strategies available to the backtest. Each receives one day of prices and returns the
+# realized cost per config (NaN where the charge cannot be completed).
+STRATEGIES = {
+    'contiguous': _contiguous_strategy,
+    'flexible': _flexible_strategy,
+    'deadline': _deadline_strategy,
+}
+
+def _backtest_days(days, configs, strategy_names):
+    """Worker task: evaluates all strategies for a chunk of (day, start_times, prices, departure) tuples."""
+    kwh_needed = ((configs['soc_target'] - configs['soc_current']) / 100 * configs['capacity']
+                  / (configs['efficiency'] / 100)).to_numpy(dtype=float)
+    frames = []
+    for day, start_times, prices, departure in days:
+        kwh_per_slot = configs['max_power'].to_numpy(dtype=float) * get_slot_hours(start_times)
+        naive_cost = _naive_strategy(start_times, prices, configs, kwh_needed, kwh_per_slot, departure)
+        for name in strategy_names:
+            frames.append(pd.DataFrame({
+                'day': day,
+                'config_id': configs.index,
+                'strategy': name,
+                'cost': STRATEGIES[name](start_times, prices, configs, kwh_needed, kwh_per_slot, departure),
+                'naive_cost': naive_cost
+            }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def _split_into_days(price_df, first_day, last_day, plug_in_hour, horizon_hours, departure_hour=DEFAULT_DEPARTURE_HOUR):
+    """
+    Cuts the price history into one horizon per day, starting at the local plug-in hour. Each day
+    also carries its departure: the first departure_hour after plug-in, at most the horizon end.
+    """
+    epoch_s = price_df['start_time'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    prices = price_df['price_eur_kwh'].to_numpy(dtype=float)
+    start_index = pd.DatetimeIndex(price_df['start_time'])
+
+    days = []
+    day = first_day
+    while day <= last_day:
+        plug_in = BACKTEST_TIMEZONE.localize(datetime(day.year, day.month, day.day, plug_in_hour))
+        horizon_end = plug_in + timedelta(hours=horizon_hours)
+        departure_day = day if departure_hour > plug_in_hour else day + timedelta(days=1)
+        departure = min(BACKTEST_TIMEZONE.localize(datetime(departure_day.year, departure_day.month, departure_day.day, departure_hour)), horizon_end)
+        first = np.searchsorted(epoch_s, int(plug_in.timestamp()))
+        last = np.searchsorted(epoch_s, int(horizon_end.timestamp()))
+        if last - first >= 2:
+            day_starts = start_index[first:last]
+            # Skip days with gaps in the archive; they would distort the comparison
+            if (last - first) * get_slot_hours(day_starts) >= horizon_hours:
+                days.append((day.isoformat(), day_starts, prices[first:last], departure))
+        day += timedelta(days=1)
+    return days
+
+def run_backtest(first_day, last_day, configs, strategy_names=tuple(STRATEGIES),
+                 plug_in_hour=DEFAULT_PLUG_IN_HOUR, horizon_hours=DEFAULT_HORIZON_HOURS, workers=None,
+                 zone=DEFAULT_ZONE, departure_hour=DEFAULT_DEPARTURE_HOUR):
+    """
+    Replays a zone's archived price days through the charging strategies for every config and returns a
+    long DataFrame with the columns day, config_id, strategy, cost and naive_cost.
+    Days are distributed over a process pool. The 'deadline' strategy has to finish by the
+    local departure_hour; the others may use the whole horizon.
+    """
+    price_df = query_prices(
+        BACKTEST_TIMEZONE.localize(datetime(first_day.year, first_day.month, first_day.day)),
+        BACKTEST_TIMEZONE.localize(datetime(last_day.year, last_day.month, last_day.day) + timedelta(days=2)),
+        zone
+    )
+    days = _split_into_days(price_df, first_day, last_day, plug_in_hour, horizon_hours, departure_hour)
+    if not days:
+        return pd.DataFrame(columns=['day', 'config_id', 'strategy', 'cost', 'naive_cost'])
+
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool busy without pickling each day separately
+    chunk_size = max(1, len(days) // (workers * 4))
+    chunks = [days[i:i + chunk_size] for i in range(0, len(days), chunk_size)]
+
+    if workers == 1:
+        frames = [_backtest_days(chunk, configs, strategy_names) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_backtest_days, chunks, itertools.repeat(configs), itertools.repeat(strategy_names)))
+    return pd.concat(frames, ignore_index=True)
+
+def summarize_backtest(results, configs):
+    """Aggregates backtest results per config and strategy, including savings versus naive charging."""
+    valid = results.dropna(subset=['cost', 'naive_cost'])
+    summary = valid.groupby(['config_id', 'strategy']).agg(
+        days=('day', 'nunique'),
+        avg_cost=('cost', 'mean'),
+        avg_naive_cost=('naive_cost', 'mean'),
+        total_cost=('cost', 'sum'),
+        total_naive_cost=('naive_cost', 'sum')
+    ).reset_index()
+    summary['savings_eur'] = summary['total_naive_cost'] - summary['total_cost']
+    summary['savings_pct'] = summary['savings_eur'] / summary['total_naive_cost'] * 100
+    return configs.join(summary.set_index('config_id'), how='inner').reset_index(drop=True)
+
+def _float_list(text):
+    return [float(v) for v in text.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest charging strategies against archived day-ahead prices.")
+    parser.add_argument('--start', required=True, help="First day (YYYY-MM-DD, local time).")
+    parser.add_argument('--end', required=True, help="Last day (YYYY-MM-DD, local time).")
+    parser.add_argument('--capacity', type=_float_list, default=[60.0], help="Battery capacities in kWh, comma-separated.")
+    parser.add_argument('--soc-current', type=_float_list, default=[20.0], help="Current SoC values in %%, comma-separated.")
+    parser.add_argument('--soc-target', type=_float_list, default=[80.0], help="Target SoC values in %%, comma-separated.")
+    parser.add_argument('--max-power', type=_float_list, default=[11.0], help="Charging powers in kW, comma-separated.")
+    parser.add_argument('--efficiency', type=_float_list, default=[90.0], help="Charging efficiencies in %%, comma-separated.")
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help="Strategies to evaluate, comma-separated.")
+    parser.add_argument('--plug-in-hour', type=int, default=DEFAULT_PLUG_IN_HOUR, help="Local hour at which vehicles are plugged in.")
+    parser.add_argument('--horizon-hours', type=int, default=DEFAULT_HORIZON_HOURS, help="Hours of prices available after plug-in.")
+    parser.add_argument('--departure-hour', type=int, default=DEFAULT_DEPARTURE_HOUR, help="Local hour by which the 'deadline' strategy must finish.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes (default: all CPUs).")
+    parser.add_argument('--zone', default=DEFAULT_ZONE, help="Bidding zone whose archive is replayed (e.g. DE, AT).")
+    parser.add_argument('--output', help="Optional CSV file for the per-config summary.")
+    args = parser.parse_args()
+
+    strategy_names = [s for s in args.strategies.split(',') if s]
+    unknown = [s for s in strategy_names if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"Unknown strategies: {', '.join(unknown)}. Available: {', '.join(STRATEGIES)}.")
+
+    configs = build_config_grid(args.capacity, args.soc_current, args.soc_target, args.max_power, args.efficiency)
+    results = run_backtest(
+        datetime.strptime(args.start, '%Y-%m-%d').date(), datetime.strptime(args.end, '%Y-%m-%d').date(),
+        configs, strategy_names, args.plug_in_hour, args.horizon_hours, args.workers, args.zone, args.departure_hour
+    )
+    if results.empty:
+        print("No archived price days found in the requested range.")
+        return
+
+    summary = summarize_backtest(results, configs)
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    if args.output:
+        summary.to_csv(args.output, index=False)
+
+if __name__ == '__main__':
+    main()
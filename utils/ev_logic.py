@@ -1,19 +1,31 @@
-import pandas as pd
 from datetime import timedelta
-import numpy as np
 
-def find_optimal_charging(price_df, config):
+from utils.price_series import as_price_series
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+# Start times evaluated between two progress reports of a background job (see _rolling_sums).
+PROGRESS_CHUNK_SLOTS = 16384
+
+CANCELLED_RESULT = {'success': False, 'cancelled': True, 'message': 'The analysis was cancelled.'}
+
+def find_optimal_charging(price_df, config, progress=None):
     """
     Core logic to calculate the best charging start time based on simplified config.
     This version finds the single cheapest continuous block of time to charge.
+    Works with any slot resolution (e.g. hourly or 15-minute prices).
     
     Returns a dictionary with success status and results.
+
+    progress, if given, is called with the completed fraction of the window evaluation;
+    returning False stops the analysis.
     """
     try:
         # 1. Prepare data and configuration
-        df = price_df.copy()
-        df['start_time'] = pd.to_datetime(df['start_time'])
-        df = df.sort_values('start_time').reset_index(drop=True)
+        start_times, prices = _sorted_price_arrays(price_df)
+        slot_hours = get_slot_hours(start_times)
 
         kwh_to_add = (config['soc_target'] - config['soc_current']) / 100 * config['capacity']
         if kwh_to_add <= 0:
@@ -22,30 +34,29 @@ def find_optimal_charging(price_df, config):
         kwh_needed_from_grid = kwh_to_add / (config['efficiency'] / 100)
         duration_hours = kwh_needed_from_grid / config['max_power']
         
-        # Number of one-hour price slots needed for the charge (rounded up)
-        slots_needed = int(np.ceil(duration_hours))
+        # Number of price slots (hourly or quarter-hourly) needed for the charge (rounded up)
+        slots_needed = int(np.ceil(duration_hours / slot_hours))
         if slots_needed == 0:
             return {'success': False, 'message': 'Calculated charging duration is zero.'}
 
-        if len(df) < slots_needed:
+        if len(prices) < slots_needed:
             return {'success': False, 'message': f'Not enough future price data available to complete the required {duration_hours:.1f} hour charge.'}
 
-        # 2. Find the cheapest block of 'slots_needed' hours using a rolling sum
-        df['rolling_cost'] = df['price_eur_kwh'].rolling(window=slots_needed).sum()
+        # 2. Cost of every block of 'slots_needed' slots from a single prefix sum
+        window_sums = _rolling_sums(_masked_prefix(prices), slots_needed, progress)
+        if window_sums is None:
+            return dict(CANCELLED_RESULT)
 
-        if df['rolling_cost'].isnull().all():
+        if np.isnan(window_sums).all():
             return {'success': False, 'message': 'Could not calculate charging costs. Please check price data.'}
 
-        # The index where the rolling cost is the minimum marks the *end* of the best window
-        min_cost_end_idx = df['rolling_cost'].idxmin()
-        start_idx = min_cost_end_idx - slots_needed + 1
-        optimal_window_df = df.iloc[start_idx : min_cost_end_idx + 1]
+        start_idx = int(np.nanargmin(window_sums))
 
         # 3. Calculate results for the optimal slot
-        avg_price_in_window = optimal_window_df['price_eur_kwh'].mean()
+        avg_price_in_window = window_sums[start_idx] / slots_needed
         total_cost = avg_price_in_window * kwh_needed_from_grid
         
-        start_time = optimal_window_df.iloc[0]['start_time']
+        start_time = start_times[start_idx]
         end_time = start_time + timedelta(hours=duration_hours)
 
         optimal_slot = {
@@ -56,16 +67,13 @@ def find_optimal_charging(price_df, config):
             'kwh_needed': kwh_needed_from_grid
         }
 
-        # For comparison, find the most expensive slot
-        max_cost_end_idx = df['rolling_cost'].idxmax()
-        max_start_idx = max_cost_end_idx - slots_needed + 1
-        most_expensive_window_df = df.iloc[max_start_idx : max_cost_end_idx + 1]
-        savings = (most_expensive_window_df['price_eur_kwh'].mean() * kwh_needed_from_grid) - total_cost
+        # For comparison, find the most expensive block
+        savings = (np.nanmax(window_sums) / slots_needed * kwh_needed_from_grid) - total_cost
 
         # Create a DataFrame of all possible start times and their associated costs for the plot
         all_slots_df = pd.DataFrame({
-            'start_time': df['start_time'].iloc[:len(df) - slots_needed + 1],
-            'total_cost': (df['rolling_cost'].dropna() / slots_needed) * (kwh_needed_from_grid / duration_hours) * duration_hours
+            'start_time': start_times[:len(window_sums)],
+            'total_cost': window_sums / slots_needed * kwh_needed_from_grid
         })
 
         return {
@@ -77,4 +85,513 @@ def find_optimal_charging(price_df, config):
         }
         
     except Exception as e:
-        return {'success': False, 'message': f'An unexpected error occurred during analysis: {e}'}
\ No newline at end of file
+        return {'success': False, 'message': f'An unexpected error occurred during analysis: {e}'}
+
+def get_slot_hours(start_times):
+    """
+    Returns the length of one price slot in hours, inferred from the spacing of the sorted
+    start times, so hourly and 15-minute series are both handled. Defaults to one hour.
+    """
+    if len(start_times) < 2:
+        return 1.0
+    return float(np.median(np.diff(start_times.asi8))) / 3.6e12
+
+def _sorted_price_arrays(price_df):
+    """
+    Returns sorted start times and prices as arrays. A PriceSeries is used as-is, without
+    copying; DataFrames (e.g. from the archive) are parsed once.
+    """
+    series = as_price_series(price_df)
+    return series.start_times, series.prices
+
+def _masked_prefix(prices):
+    """
+    Prefix sums of the prices with missing (NaN) slots counted as zero, and prefix counts of the
+    missing slots, so that a missing price only affects the windows that contain it.
+    """
+    missing = np.isnan(prices)
+    return (np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, prices)))),
+            np.concatenate(([0], np.cumsum(missing))))
+
+def _window_sums(prefix, starts, ends):
+    """Sums of prices[starts:ends] from a _masked_prefix; NaN where a window has a missing price."""
+    sums, missing = prefix
+    return np.where(missing[ends] > missing[starts], np.nan, sums[ends] - sums[starts])
+
+def _rolling_sums(prefix, window, progress=None):
+    """
+    Sums of every block of `window` consecutive slots, by start slot. With progress, the blocks
+    are evaluated PROGRESS_CHUNK_SLOTS at a time and progress(fraction) is called before each
+    chunk; None is returned if it returns False.
+    """
+    n_slots = len(prefix[0]) - 1
+    starts = np.arange(max(n_slots - window + 1, 0))
+    if progress is None:
+        return _window_sums(prefix, starts, starts + window)
+
+    sums = np.empty(len(starts))
+    for first in range(0, len(starts), PROGRESS_CHUNK_SLOTS):
+        if progress(first / len(starts)) is False:
+            return None
+        chunk = starts[first:first + PROGRESS_CHUNK_SLOTS]
+        sums[first:first + PROGRESS_CHUNK_SLOTS] = _window_sums(prefix, chunk, chunk + window)
+    return sums
+
+def find_optimal_charging_batch(price_df, configs):
+    """
+    Vectorized counterpart of find_optimal_charging for many vehicle configurations.
+    The price data is parsed once and every config is evaluated against a single prefix-sum
+    array, so the cost per additional vehicle is a few NumPy operations.
+
+    `configs` is a list of config dicts, a dict of arrays or a DataFrame with the columns
+    capacity, soc_current, soc_target, max_power and efficiency.
+
+    Returns a DataFrame with one row per config and the columns success, message, start_time,
+    end_time, total_cost, duration_hours, kwh_needed and savings_eur.
+    """
+    cfg = pd.DataFrame(configs)
+    capacity = cfg['capacity'].to_numpy(dtype=float)
+    soc_current = cfg['soc_current'].to_numpy(dtype=float)
+    soc_target = cfg['soc_target'].to_numpy(dtype=float)
+    max_power = cfg['max_power'].to_numpy(dtype=float)
+    efficiency = cfg['efficiency'].to_numpy(dtype=float)
+
+    start_times, prices = _sorted_price_arrays(price_df)
+    slot_hours = get_slot_hours(start_times)
+    n_slots = len(prices)
+    n_configs = len(cfg)
+
+    # 1. Energy and duration for every config, mirroring the single-config engine
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kwh_to_add = (soc_target - soc_current) / 100 * capacity
+        kwh_needed_from_grid = kwh_to_add / (efficiency / 100)
+        duration_hours = kwh_needed_from_grid / max_power
+        slots_needed = np.ceil(duration_hours / slot_hours)
+
+    messages = np.full(n_configs, 'Analysis successful.', dtype=object)
+    complete = np.isfinite(kwh_to_add) & np.isfinite(duration_hours)
+    messages[~complete] = 'Missing or invalid configuration values.'
+    no_energy = complete & (kwh_to_add <= 0)
+    messages[no_energy] = 'Target SoC must be higher than current SoC.'
+    zero_duration = complete & ~no_energy & (slots_needed <= 0)
+    messages[zero_duration] = 'Calculated charging duration is zero.'
+    too_long = complete & ~no_energy & ~zero_duration & (slots_needed > n_slots)
+    for i in np.flatnonzero(too_long):
+        messages[i] = f'Not enough future price data available to complete the required {duration_hours[i]:.1f} hour charge.'
+    valid = complete & ~no_energy & ~zero_duration & ~too_long
+
+    # 2. Cheapest and most expensive window per distinct window length, from one prefix sum
+    prefix = _masked_prefix(prices)
+    best_start = np.zeros(n_configs, dtype=np.int64)
+    best_sum = np.full(n_configs, np.nan)
+    worst_sum = np.full(n_configs, np.nan)
+    for window in np.unique(slots_needed[valid]).astype(np.int64):
+        window_sums = _rolling_sums(prefix, window)
+        rows = valid & (slots_needed == window)
+        if np.isnan(window_sums).all():
+            messages[rows] = 'Could not calculate charging costs. Please check price data.'
+            valid &= ~rows
+            continue
+        best_start[rows] = np.nanargmin(window_sums)
+        best_sum[rows] = np.nanmin(window_sums)
+        worst_sum[rows] = np.nanmax(window_sums)
+
+    # 3. Assemble results; the window average price is billed over the full grid energy
+    with np.errstate(invalid='ignore'):
+        total_cost = np.where(valid, best_sum / slots_needed * kwh_needed_from_grid, np.nan)
+        savings = np.where(valid, worst_sum / slots_needed * kwh_needed_from_grid, np.nan) - total_cost
+
+    start_time = pd.Series(start_times[best_start] if n_slots else pd.NaT, index=cfg.index).where(valid)
+    end_time = start_time + pd.to_timedelta(np.where(valid, duration_hours, np.nan), unit='h').round('us')
+
+    return pd.DataFrame({
+        'success': valid,
+        'message': messages,
+        'start_time': start_time,
+        'end_time': end_time,
+        'total_cost': total_cost,
+        'duration_hours': np.where(valid, duration_hours, np.nan),
+        'kwh_needed': np.where(valid, kwh_needed_from_grid, np.nan),
+        'savings_eur': savings
+    }, index=cfg.index)
+
+def find_cost_surface(price_df, config, powers, soc_targets=None):
+    """
+    Cost of a continuous charge for every start time, charging power and target SoC, priced
+    like find_optimal_charging. All blocks are read from one prefix-sum array in a single
+    vectorized step, so exploring other wallbox powers or targets needs no further engine runs.
+
+    `powers` (kW) and `soc_targets` (%) are the surface axes; without soc_targets only
+    config['soc_target'] is used. The other config values are fixed.
+
+    Returns a dictionary with success status; on success 'costs' has the shape
+    (len(soc_targets), len(powers), number of start times), with NaN where the charge would run
+    past the end of the price data, covers a missing price or the target is not above the
+    current SoC.
+    """
+    try:
+        start_times, prices = _sorted_price_arrays(price_df)
+        slot_hours = get_slot_hours(start_times)
+        powers = np.asarray(powers, dtype=float)
+        soc_targets = np.asarray([config['soc_target']] if soc_targets is None else soc_targets, dtype=float)
+        n_slots = len(prices)
+        if n_slots == 0:
+            return {'success': False, 'message': 'No future price data available.'}
+
+        # 1. Grid energy per target and window length per (target, power)
+        kwh_needed_from_grid = (soc_targets - config['soc_current']) / 100 * config['capacity'] / (config['efficiency'] / 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slots_needed = np.ceil(kwh_needed_from_grid[:, None] / powers[None, :] / slot_hours)
+        valid = np.isfinite(slots_needed) & (slots_needed > 0)
+        slots_needed = np.where(valid, slots_needed, 1).astype(np.int64)
+
+        # 2. Window sums for every (target, power, start) from a single prefix sum
+        starts = np.arange(n_slots)
+        ends = starts + slots_needed[:, :, None]
+        window_sums = _window_sums(_masked_prefix(prices), starts, np.minimum(ends, n_slots))
+        fits = valid[:, :, None] & (ends <= n_slots)
+        costs = np.where(fits, window_sums / slots_needed[:, :, None] * kwh_needed_from_grid[:, None, None], np.nan)
+
+        return {
+            'success': True,
+            'start_times': start_times,
+            'powers': powers,
+            'soc_targets': soc_targets,
+            'costs': costs,
+            'message': 'Analysis successful.'
+        }
+
+    except Exception as e:
+        return {'success': False, 'message': f'An unexpected error occurred during analysis: {e}'}
+
+def find_optimal_charging_flexible(price_df, config, progress=None):
+    """
+    Interruptible alternative to find_optimal_charging: picks the cheapest slots anywhere in
+    the horizon instead of one continuous block. Whole slots are charged at max_power and the
+    remaining energy is charged at partial power in the next cheapest slot.
+
+    Returns a dictionary with success status and results. In addition to the keys returned by
+    find_optimal_charging, 'charging_slots' lists the selected slots in time order and
+    'contiguous_start_time' marks the best continuous block for comparison.
+
+    progress works as in find_optimal_charging; the slot selection itself is a single step.
+    """
+    try:
+        start_times, prices = _sorted_price_arrays(price_df)
+
+        kwh_to_add = (config['soc_target'] - config['soc_current']) / 100 * config['capacity']
+        if kwh_to_add <= 0:
+            return {'success': False, 'message': 'Target SoC must be higher than current SoC.'}
+
+        kwh_needed_from_grid = kwh_to_add / (config['efficiency'] / 100)
+        duration_hours = kwh_needed_from_grid / config['max_power']
+
+        # Whole slots at full power, plus one slot at partial power for the remainder
+        slot_hours = get_slot_hours(start_times)
+        kwh_per_slot = config['max_power'] * slot_hours
+        full_slots = int(kwh_needed_from_grid // kwh_per_slot)
+        partial_kwh = kwh_needed_from_grid - full_slots * kwh_per_slot
+        slots_needed = full_slots + (1 if partial_kwh > 1e-9 else 0)
+        if slots_needed == 0:
+            return {'success': False, 'message': 'Calculated charging duration is zero.'}
+
+        # Missing (NaN) prices sort last, so they are only picked if too few slots have a price
+        if np.count_nonzero(~np.isnan(prices)) < slots_needed:
+            return {'success': False, 'message': f'Not enough future price data available to complete the required {duration_hours:.1f} hour charge.'}
+
+        # 1. Select the k cheapest slots in linear time, then order only those k by price
+        #    so the partial-power remainder lands in the most expensive of them.
+        cheapest = np.argpartition(prices, slots_needed - 1)[:slots_needed]
+        cheapest = cheapest[np.argsort(prices[cheapest], kind='stable')]
+        slot_kwh = np.full(slots_needed, kwh_per_slot)
+        if slots_needed > full_slots:
+            slot_kwh[-1] = partial_kwh
+        total_cost = float(np.dot(prices[cheapest], slot_kwh))
+
+        # For comparison, the same energy bought in the most expensive slots
+        priciest = np.argpartition(-prices, slots_needed - 1)[:slots_needed]
+        priciest = priciest[np.argsort(-prices[priciest], kind='stable')]
+        savings = float(np.dot(prices[priciest], slot_kwh)) - total_cost
+
+        # 2. Lay out the selected slots in time order
+        order = np.argsort(cheapest)
+        chosen, chosen_kwh = cheapest[order], slot_kwh[order]
+        slot_starts = start_times[chosen]
+        slot_ends = slot_starts + pd.to_timedelta(chosen_kwh / config['max_power'], unit='h').round('us')
+        charging_slots_df = pd.DataFrame({
+            'start_time': slot_starts,
+            'end_time': slot_ends,
+            'kwh': chosen_kwh,
+            'cost': prices[chosen] * chosen_kwh
+        })
+
+        optimal_slot = {
+            'start_time': slot_starts[0],
+            'end_time': slot_ends[-1],
+            'total_cost': total_cost,
+            'duration_hours': duration_hours,
+            'kwh_needed': kwh_needed_from_grid
+        }
+
+        # 3. Continuous-block costs per start time, so the cost chart can show what was avoided
+        contiguous_slots = int(np.ceil(duration_hours / slot_hours))
+        window_sums = _rolling_sums(_masked_prefix(prices), contiguous_slots, progress)
+        if window_sums is None:
+            return dict(CANCELLED_RESULT)
+        window_costs = window_sums / contiguous_slots * kwh_needed_from_grid
+        # Without a fully priced block, the plan's first slot stands in for the comparison
+        has_block = not np.isnan(window_costs).all()
+        all_slots_df = pd.DataFrame({
+            'start_time': start_times[:len(window_costs)],
+            'total_cost': window_costs
+        })
+
+        return {
+            'success': True,
+            'optimal_slot': optimal_slot,
+            'charging_slots': charging_slots_df,
+            'contiguous_start_time': start_times[int(np.nanargmin(window_costs))] if has_block else slot_starts[0],
+            'all_slots': all_slots_df,
+            'savings_eur': savings,
+            'message': 'Analysis successful.'
+        }
+
+    except Exception as e:
+        return {'success': False, 'message': f'An unexpected error occurred during analysis: {e}'}
+
+# --- Departure Deadline with SoC-Dependent Power ---
+# SoC resolution of the dynamic program. 0.5% of a 60 kWh battery is 0.3 kWh.
+SOC_STEP_PERCENT = 0.5
+# How often (in price slots) the forward pass reports progress to a background job.
+PROGRESS_EVERY_SLOTS = 64
+
+def get_power_curve(config):
+    """
+    Returns the charging power limit as (soc breakpoints in %, power in kW) arrays. config may
+    hold 'power_curve' as [[soc, kW], ...]; the limit is interpolated linearly between points
+    and never exceeds max_power. Without a curve the power is max_power at every SoC.
+    """
+    curve = config.get('power_curve')
+    if not curve:
+        return np.array([0.0, 100.0]), np.array([config['max_power']] * 2, dtype=float)
+    curve = np.asarray(sorted(curve), dtype=float)
+    return curve[:, 0], np.minimum(curve[:, 1], config['max_power'])
+
+def _time_to_charge(soc_grid, config):
+    """
+    Cumulative hours needed to charge from soc_grid[0] to every grid point at the highest
+    power the curve allows (evaluated at the middle of each SoC step).
+    """
+    curve_soc, curve_kw = get_power_curve(config)
+    midpoints = (soc_grid[1:] + soc_grid[:-1]) / 2
+    power_kw = np.interp(midpoints, curve_soc, curve_kw)
+    # Battery energy per step divided by the grid power actually stored (power x efficiency)
+    step_hours = np.diff(soc_grid) / 100 * config['capacity'] / (power_kw * config['efficiency'] / 100)
+    return np.concatenate(([0.0], np.cumsum(step_hours)))
+
+def _range_argmin(values, lo, hi):
+    """
+    Index of the minimum of values[lo[j]:hi[j] + 1] for every j, using a sparse table, so all
+    ranges are answered with O(n log n) vectorized work.
+    """
+    n = len(values)
+    table = [np.arange(n)]
+    width = 1
+    while 2 * width <= n:
+        previous = table[-1]
+        left, right = previous[:n - 2 * width + 1], previous[width:n - width + 1]
+        table.append(np.where(values[right] < values[left], right, left))
+        width *= 2
+
+    level = np.floor(np.log2(hi - lo + 1)).astype(np.int64)
+    first = np.empty(len(lo), dtype=np.int64)
+    second = np.empty(len(lo), dtype=np.int64)
+    for k in np.unique(level):
+        rows = level == k
+        first[rows] = table[k][lo[rows]]
+        second[rows] = table[k][hi[rows] - (1 << int(k)) + 1]
+    return np.where(values[second] < values[first], second, first)
+
+def find_optimal_charging_deadline(price_df, config, progress=None):
+    """
+    Cheapest schedule that reaches soc_target by config['departure_time'] while respecting an
+    SoC-dependent power limit (see get_power_curve), e.g. the taper above 80% SoC.
+
+    Dynamic program over (price slot, SoC): in each slot the car may charge any amount up to
+    what the curve allows from its current SoC. With a fixed slot length, the lowest SoC that
+    can still reach a given SoC within one slot comes from a single searchsorted on the
+    cumulative time-to-charge, and each slot's transition becomes a range minimum.
+    Only slots that end by the departure time are used.
+
+    Returns a dictionary in the format of find_optimal_charging_flexible. 'all_slots' holds the
+    cost of an uninterrupted charge (following the curve) for every start time that still
+    finishes by departure, and savings are measured against charging immediately.
+
+    progress, if given, is called with the completed fraction of the forward pass every
+    PROGRESS_EVERY_SLOTS slots; returning False stops the analysis.
+    """
+    try:
+        start_times, prices = _sorted_price_arrays(price_df)
+        slot_hours = get_slot_hours(start_times)
+        departure = pd.Timestamp(config['departure_time'])
+        if departure.tzinfo is None:
+            departure = departure.tz_localize(start_times.tz)
+
+        kwh_to_add = (config['soc_target'] - config['soc_current']) / 100 * config['capacity']
+        if kwh_to_add <= 0:
+            return {'success': False, 'message': 'Target SoC must be higher than current SoC.'}
+        kwh_needed_from_grid = kwh_to_add / (config['efficiency'] / 100)
+
+        usable = start_times + pd.Timedelta(hours=slot_hours) <= departure
+        start_times, prices = start_times[usable], prices[usable]
+        if len(prices) == 0:
+            return {'success': False, 'message': 'No price slots are available before the departure time.'}
+
+        # 1. SoC grid from the current to the target SoC, and the fastest possible progress
+        n_steps = max(1, int(np.ceil((config['soc_target'] - config['soc_current']) / SOC_STEP_PERCENT)))
+        soc_grid = np.linspace(config['soc_current'], config['soc_target'], n_steps + 1)
+        hours_to = _time_to_charge(soc_grid, config)
+        # Lowest grid SoC from which each grid SoC can be reached within one slot
+        reachable_from = np.searchsorted(hours_to, hours_to - slot_hours - 1e-9, side='left')
+        grid_kwh_per_percent = config['capacity'] / config['efficiency']
+        offsets = soc_grid - soc_grid[0]
+
+        # 2. Forward pass: cost[j] is the cheapest way to be at soc_grid[j] after the slots so far
+        cost = np.full(len(soc_grid), np.inf)
+        cost[0] = 0.0
+        parents = np.empty((len(prices), len(soc_grid)), dtype=np.int64)
+        index = np.arange(len(soc_grid))
+        for t, price in enumerate(prices):
+            if progress is not None and t % PROGRESS_EVERY_SLOTS == 0 and progress(t / len(prices)) is False:
+                return dict(CANCELLED_RESULT)
+            if np.isnan(price):
+                parents[t] = index
+                continue
+            # cost of going i -> j is price * kWh(j - i), so minimise cost[i] - price * kWh(i)
+            shifted = cost - price * grid_kwh_per_percent * offsets
+            best = _range_argmin(shifted, reachable_from, index)
+            cost = shifted[best] + price * grid_kwh_per_percent * offsets
+            parents[t] = best
+
+        if not np.isfinite(cost[-1]):
+            reachable_soc = soc_grid[np.isfinite(cost)].max()
+            return {'success': False, 'message': f'The target SoC cannot be reached by the departure time; at most {reachable_soc:.0f}% is possible.'}
+
+        # 3. Walk back through the chosen transitions to get the energy per slot
+        soc_index = np.empty(len(prices) + 1, dtype=np.int64)
+        soc_index[-1] = len(soc_grid) - 1
+        for t in range(len(prices) - 1, -1, -1):
+            soc_index[t] = parents[t, soc_index[t + 1]]
+        slot_kwh = np.diff(offsets[soc_index]) * grid_kwh_per_percent
+        charge_hours = np.diff(hours_to[soc_index])
+
+        charging = slot_kwh > 1e-9
+        slot_starts = start_times[charging]
+        slot_ends = slot_starts + pd.to_timedelta(charge_hours[charging], unit='h').round('us')
+        charging_slots_df = pd.DataFrame({
+            'start_time': slot_starts,
+            'end_time': slot_ends,
+            'kwh': slot_kwh[charging],
+            'cost': prices[charging] * slot_kwh[charging]
+        })
+        total_cost = float(cost[-1])
+
+        # 4. Uninterrupted charge following the curve, for every start that finishes in time
+        full_power_hours = np.arange(int(np.ceil(hours_to[-1] / slot_hours)) + 1) * slot_hours
+        progress_kwh = np.interp(full_power_hours, hours_to, offsets) * grid_kwh_per_percent
+        profile_kwh = np.diff(progress_kwh)
+        block_costs = np.correlate(prices, profile_kwh, mode='valid') if len(profile_kwh) <= len(prices) else np.array([])
+
+        optimal_slot = {
+            'start_time': slot_starts[0],
+            'end_time': slot_ends[-1],
+            'total_cost': total_cost,
+            'duration_hours': float(charge_hours.sum()),
+            'kwh_needed': kwh_needed_from_grid
+        }
+
+        return {
+            'success': True,
+            'optimal_slot': optimal_slot,
+            'charging_slots': charging_slots_df,
+            'contiguous_start_time': start_times[int(np.nanargmin(block_costs))] if len(block_costs) else slot_starts[0],
+            'all_slots': pd.DataFrame({'start_time': start_times[:len(block_costs)], 'total_cost': block_costs}),
+            'savings_eur': float(block_costs[0]) - total_cost if len(block_costs) else 0.0,
+            'departure_time': departure,
+            'message': 'Analysis successful.'
+        }
+
+    except Exception as e:
+        return {'success': False, 'message': f'An unexpected error occurred during analysis: {e}'}
+
+def extend_optimal_charging(price_df, config, previous_results, first_new_start):
+    """
+    Updates a find_optimal_charging result after new slots (starting at first_new_start) were
+    appended to the price series. Only the windows that overlap the new slots are evaluated.
+
+    Returns (changed, results): changed is False and the previous results are returned as-is
+    when none of the new windows beats the previous optimum.
+    """
+    series = as_price_series(price_df)
+    start_times = series.start_times
+    duration_hours = ((config['soc_target'] - config['soc_current']) / 100 * config['capacity']
+                      / (config['efficiency'] / 100) / config['max_power'])
+    slots_needed = int(np.ceil(duration_hours / get_slot_hours(start_times)))
+
+    # The earliest window containing a new slot starts slots_needed - 1 slots before it
+    first_new = int(start_times.searchsorted(pd.Timestamp(first_new_start)))
+    tail_start = max(0, first_new - slots_needed + 1)
+    tail_results = find_optimal_charging(series.slice(tail_start), config)
+
+    if not tail_results['success'] or tail_results['optimal_slot']['total_cost'] >= previous_results['optimal_slot']['total_cost']:
+        return False, previous_results
+
+    previous_slots = previous_results['all_slots']
+    new_slots = tail_results['all_slots']
+    all_slots_df = pd.concat([
+        previous_slots[previous_slots['start_time'] < new_slots['start_time'].iloc[0]],
+        new_slots
+    ], ignore_index=True)
+    most_expensive_cost = all_slots_df['total_cost'].max()
+
+    return True, {
+        **tail_results,
+        'all_slots': all_slots_df,
+        'savings_eur': most_expensive_cost - tail_results['optimal_slot']['total_cost']
+    }
+
+def extend_optimal_charging_flexible(price_df, config, previous_results, first_new_start):
+    """
+    Counterpart of extend_optimal_charging for find_optimal_charging_flexible results.
+    The plan is only recomputed if a new slot is cheaper than the priciest slot it uses.
+
+    Returns (changed, results).
+    """
+    series = as_price_series(price_df)
+    new_prices = series.prices[series.start_times >= pd.Timestamp(first_new_start)]
+    charging_slots = previous_results['charging_slots']
+    highest_used_price = (charging_slots['cost'] / charging_slots['kwh']).max()
+
+    if new_prices.size == 0 or np.nanmin(new_prices) >= highest_used_price:
+        return False, previous_results
+
+    results = find_optimal_charging_flexible(series, config)
+    if not results['success']:
+        return False, previous_results
+    return True, results
+
+def extend_optimal_charging_deadline(price_df, config, previous_results, first_new_start):
+    """
+    Counterpart of extend_optimal_charging for find_optimal_charging_deadline results.
+    Slots after the departure time cannot change the plan, so it is only recomputed when new
+    slots start before departure.
+
+    Returns (changed, results).
+    """
+    if pd.Timestamp(first_new_start) >= pd.Timestamp(config['departure_time']):
+        return False, previous_results
+
+    results = find_optimal_charging_deadline(price_df, config)
+    if not results['success'] or results['optimal_slot']['total_cost'] >= previous_results['optimal_slot']['total_cost']:
+        return False, previous_results
+    return True, results
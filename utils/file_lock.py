@@ -0,0 +1,61 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl; locking then only covers threads of the current process.
+    fcntl = None
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+@contextmanager
+def file_lock(lock_path, blocking=True):
+    """
+    Exclusive lock shared by every thread and worker process on this host that uses
+    the same lock file. Used to make sure only one of them performs a given task.
+    Yields whether the lock was acquired; with blocking=False it is not waited for
+    when someone else holds it.
+    """
+    if fcntl is None:
+        with _process_locks_guard:
+            lock = _process_locks.setdefault(lock_path, threading.Lock())
+        acquired = lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def write_json_atomic(path, data):
+    """
+    Writes JSON to a temporary file and renames it into place, so readers in other
+    processes never observe a partially written file.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,96 @@
+from utils.ev_logic import _sorted_price_arrays, get_slot_hours
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Energy below this threshold (kWh) is treated as fully delivered.
+ENERGY_TOLERANCE_KWH = 1e-6
+
+def schedule_fleet_charging(price_df, configs, site_limit_kw):
+    """
+    Assigns charging energy to many vehicles so the combined site power never exceeds
+    site_limit_kw while the total cost over the price horizon is minimized.
+
+    Slots are filled in order of increasing price. Within a slot, vehicles that would need the
+    most remaining slots at full power are served first, so no vehicle is left with more energy
+    than the remaining slots can deliver. Every vehicle is assumed to be plugged in for the
+    whole horizon; charging is interruptible and may use partial power in a slot. Slots with a
+    missing (NaN) price are not used.
+
+    `configs` accepts the same formats as find_optimal_charging_batch.
+
+    Returns a dictionary with success status and results:
+        slot_start_times: sorted start times of the price slots
+        schedule_kw: array (vehicles x slots) of average grid power per slot
+        site_load_kw: total site power per slot
+        vehicle_cost: charging cost per vehicle in €
+        unmet_kwh: grid energy per vehicle that could not be scheduled
+        total_cost: cost of the whole plan in €
+    """
+    try:
+        cfg = pd.DataFrame(configs)
+        start_times, prices = _sorted_price_arrays(price_df)
+        if len(prices) == 0:
+            return {'success': False, 'message': 'No price data available for scheduling.'}
+        if site_limit_kw is None or site_limit_kw <= 0:
+            return {'success': False, 'message': 'Site connection limit must be a positive power.'}
+
+        # 1. Grid energy and per-slot energy limit for every vehicle
+        slot_hours = get_slot_hours(start_times)
+        capacity = cfg['capacity'].to_numpy(dtype=float)
+        soc_current = cfg['soc_current'].to_numpy(dtype=float)
+        soc_target = cfg['soc_target'].to_numpy(dtype=float)
+        max_power = cfg['max_power'].to_numpy(dtype=float)
+        efficiency = cfg['efficiency'].to_numpy(dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kwh_needed = (soc_target - soc_current) / 100 * capacity / (efficiency / 100)
+        kwh_needed = np.where(np.isfinite(kwh_needed) & (kwh_needed > 0), kwh_needed, 0.0)
+        slot_energy = np.where(np.isfinite(max_power) & (max_power > 0), max_power * slot_hours, 0.0)
+        site_slot_energy = site_limit_kw * slot_hours
+
+        n_vehicles, n_slots = len(cfg), len(prices)
+        remaining = kwh_needed.copy()
+        schedule_kwh = np.zeros((n_vehicles, n_slots))
+
+        # 2. Fill the cheapest priced slots first, up to the site limit
+        priced_slots = np.flatnonzero(~np.isnan(prices))
+        for slot in priced_slots[np.argsort(prices[priced_slots], kind='stable')]:
+            active = np.flatnonzero((remaining > ENERGY_TOLERANCE_KWH) & (slot_energy > 0))
+            if active.size == 0:
+                break
+            slots_left = remaining[active] / slot_energy[active]
+            order = active[np.argsort(-slots_left, kind='stable')]
+
+            # Each vehicle gets at most what is left of the site limit after the ones before it:
+            # the first to cross the limit gets the leftover capacity, later ones nothing
+            allocation = np.minimum(remaining[order], slot_energy[order])
+            allocated_before = np.concatenate(([0.0], np.cumsum(allocation)[:-1]))
+            allocation = np.clip(site_slot_energy - allocated_before, 0.0, allocation)
+
+            schedule_kwh[order, slot] = allocation
+            remaining[order] -= allocation
+
+        # 3. Summarize the plan
+        unmet_kwh = np.where(remaining > ENERGY_TOLERANCE_KWH, remaining, 0.0)
+        vehicle_cost = schedule_kwh @ np.where(np.isnan(prices), 0.0, prices)
+        unserved = int(np.count_nonzero(unmet_kwh))
+        message = 'Fleet schedule successful.' if unserved == 0 else (
+            f'{unserved} vehicle(s) cannot be fully charged within the price horizon and site limit.'
+        )
+
+        return {
+            'success': unserved == 0,
+            'message': message,
+            'slot_start_times': start_times,
+            'schedule_kw': schedule_kwh / slot_hours,
+            # Summation order can put the load a rounding error above the limit
+            'site_load_kw': np.minimum(schedule_kwh.sum(axis=0) / slot_hours, site_limit_kw),
+            'vehicle_cost': vehicle_cost,
+            'unmet_kwh': unmet_kwh,
+            'total_cost': float(vehicle_cost.sum())
+        }
+
+    except Exception as e:
+        return {'success': False, 'message': f'An unexpected error occurred during fleet scheduling: {e}'}
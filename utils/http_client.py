@@ -0,0 +1,87 @@
+import os
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+from utils.metrics import record_upstream_request
+from utils.lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+# --- Constants ---
+# (connect, read) timeouts in seconds per attempt; a hung upstream must never block a Dash worker for long.
+CONNECT_TIMEOUT_SECONDS = 3.05
+READ_TIMEOUT_SECONDS = 10
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 4.0
+# Budget for all attempts of one request, backoff included, well under a 30 s worker or callback timeout.
+TOTAL_TIMEOUT_SECONDS = 10.0
+# Another attempt is only made if at least this much of the budget is left after the backoff.
+MIN_ATTEMPT_SECONDS = 1.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+POOL_SIZE = 10
+
+_session = {'pid': None, 'session': None}
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns the process-wide pooled session. A new session is created after a fork, so worker
+    processes never share connections with their parent.
+    """
+    with _session_lock:
+        if _session['pid'] != os.getpid():
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session['pid'], _session['session'] = os.getpid(), session
+        return _session['session']
+
+def _backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, honouring a Retry-After header when present."""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+def _sleep_before_retry(deadline, delay):
+    """Sleeps for the backoff delay if another attempt still fits in the budget; returns whether it does."""
+    if deadline - time.monotonic() - delay < MIN_ATTEMPT_SECONDS:
+        return False
+    time.sleep(delay)
+    return True
+
+def get_json(url, params=None):
+    """
+    GETs a JSON document over the pooled session with bounded timeouts. Connection errors,
+    timeouts, 429 and 5xx responses are retried with jittered backoff up to MAX_ATTEMPTS times,
+    as long as the attempt fits in TOTAL_TIMEOUT_SECONDS (each attempt's timeouts are cut to
+    what is left of it). Raises requests exceptions if every attempt fails, ValueError if the
+    body is not JSON.
+    """
+    host = urlparse(url).hostname
+    deadline = time.monotonic() + TOTAL_TIMEOUT_SECONDS
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        remaining = deadline - time.monotonic()
+        timeout = (min(CONNECT_TIMEOUT_SECONDS, remaining), min(READ_TIMEOUT_SECONDS, remaining))
+        started = time.perf_counter()
+        try:
+            response = get_session().get(url, params=params, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            record_upstream_request(host, 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection_error')
+            if attempt == MAX_ATTEMPTS or not _sleep_before_retry(deadline, _backoff_delay(attempt)):
+                raise
+            continue
+
+        record_upstream_request(host, 'ok' if response.ok else str(response.status_code), time.perf_counter() - started)
+        if (response.status_code in RETRY_STATUS_CODES and attempt < MAX_ATTEMPTS
+                and _sleep_before_retry(deadline, _backoff_delay(attempt, response.headers.get('Retry-After')))):
+            continue
+
+        response.raise_for_status()
+        return response.json()
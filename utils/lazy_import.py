@@ -0,0 +1,26 @@
+import importlib
+
+class LazyModule:
+    """
+    Placeholder for a module that is imported on first attribute access, e.g. pd.DataFrame.
+    Keeps heavy libraries (pandas, NumPy, Plotly, requests) out of worker start-up; the import
+    system's own locks make the first access safe from any thread.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """Returns a LazyModule for `name` (e.g. 'plotly.graph_objects')."""
+    return LazyModule(name)
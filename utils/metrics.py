@@ -0,0 +1,128 @@
+import time
+import threading
+import contextvars
+from functools import wraps
+from contextlib import contextmanager
+
+# --- Constants ---
+# In-process metrics rendered in the Prometheus text exposition format. Each worker process keeps
+# its own values, as with the default prometheus_client registry.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_lock = threading.Lock()
+# name -> {'type', 'help', 'buckets', 'values': {label tuple: value or [bucket counts, sum, count]}}
+_metrics = {}
+# Functions returning [(name, type, help, labels dict, value)] evaluated at scrape time
+_collectors = []
+# Name of the callback whose stages are currently being timed
+_current_callback = contextvars.ContextVar('current_callback', default=None)
+
+def _declare(name, metric_type, help_text, buckets=None):
+    if name not in _metrics:
+        _metrics[name] = {'type': metric_type, 'help': help_text, 'buckets': buckets, 'values': {}}
+    return _metrics[name]
+
+def inc_counter(name, help_text, labels=None, amount=1):
+    key = tuple(sorted((labels or {}).items()))
+    with _lock:
+        values = _declare(name, 'counter', help_text)['values']
+        values[key] = values.get(key, 0) + amount
+
+def observe(name, help_text, value, labels=None, buckets=LATENCY_BUCKETS):
+    """Records value in a histogram with the given (cumulative) bucket upper bounds."""
+    key = tuple(sorted((labels or {}).items()))
+    with _lock:
+        metric = _declare(name, 'histogram', help_text, buckets)
+        state = metric['values'].setdefault(key, [[0] * len(metric['buckets']), 0.0, 0])
+        for i, bound in enumerate(metric['buckets']):
+            if value <= bound:
+                state[0][i] += 1
+        state[1] += value
+        state[2] += 1
+
+def register_collector(collector):
+    """Registers a function that returns current gauge values when /metrics is scraped."""
+    _collectors.append(collector)
+
+# --- Callback Instrumentation ---
+
+def instrumented_callback(callback_name):
+    """Decorator recording the total wall time of a Dash callback and enabling stage() inside it."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _current_callback.set(callback_name)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe('gridaware_callback_seconds', "Wall time of Dash callbacks.",
+                        time.perf_counter() - started, {'callback': callback_name})
+                _current_callback.reset(token)
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage(stage_name):
+    """Times one stage (fetch, parse, engine, figure, serialization) of the current callback."""
+    callback_name = _current_callback.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if callback_name is not None:
+            observe('gridaware_callback_stage_seconds', "Wall time of individual callback stages.",
+                    time.perf_counter() - started, {'callback': callback_name, 'stage': stage_name})
+
+def record_payload(callback_name, direction, size_bytes):
+    observe('gridaware_callback_payload_bytes', "Size of Dash callback request and response bodies.",
+            size_bytes, {'callback': callback_name, 'direction': direction}, buckets=SIZE_BUCKETS)
+
+def record_upstream_request(host, outcome, seconds=None):
+    """Counts one upstream HTTP attempt; outcome is 'ok', an HTTP status code, 'timeout' or 'connection_error'."""
+    inc_counter('gridaware_upstream_requests_total', "Upstream HTTP attempts by outcome.",
+                {'host': host, 'outcome': outcome})
+    if seconds is not None:
+        observe('gridaware_upstream_request_seconds', "Latency of upstream HTTP attempts that received a response.",
+                seconds, {'host': host})
+
+# --- Exposition ---
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (k + '="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+               for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metrics():
+    """Returns all metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        for name, metric in sorted(_metrics.items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for labels, value in sorted(metric['values'].items()):
+                if metric['type'] != 'histogram':
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                bucket_counts, total, count = value
+                for bound, bucket_count in zip(metric['buckets'], bucket_counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {bucket_count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    declared = set()
+    for collector in _collectors:
+        for name, metric_type, help_text, labels, value in collector():
+            if name not in declared:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,96 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from utils.price_api import get_fallback_data
+from utils.price_cache import get_all_market_prices, read_cache_expiry
+from utils.price_series import PriceSeries, intern_series
+from utils.price_sources import PRICE_SOURCES
+from utils.zones import DEFAULT_ZONE
+
+# --- Constants ---
+# Bounds for the sleep between refreshes. The upper bound also keeps the warm copy from
+# holding on to slots that have already started.
+MIN_REFRESH_SECONDS = 30
+MAX_REFRESH_SECONDS = 60 * 60
+
+# Prices kept in memory for page loads, per zone: {zone: {'series': PriceSeries, 'source': 'api' | 'fallback'}}
+_warm = {}
+_warm_lock = threading.Lock()
+# Functions called (without arguments) whenever a different price series is loaded
+_price_listeners = []
+_prefetcher = {'pid': None, 'thread': None, 'timezone': None}
+_prefetcher_lock = threading.Lock()
+
+def on_new_prices(listener):
+    """Registers a function that is called whenever the prefetcher loads a different price series."""
+    _price_listeners.append(listener)
+
+def _set_warm(zone, data, source):
+    # Parsed once per fetch; every page load, callback and API request shares this instance
+    series = intern_series(PriceSeries.from_api_data({**data, 'zone': zone}))
+    with _warm_lock:
+        previous = _warm.get(zone)
+        changed = previous is None or previous['series'].version != series.version
+        _warm[zone] = {'series': series, 'source': source}
+    if changed:
+        for listener in _price_listeners:
+            listener()
+
+def _seconds_until_refresh():
+    """Sleeps until the first zone's shared cache expires, i.e. until the next publication is due."""
+    expiries = [read_cache_expiry(zone) for zone in PRICE_SOURCES]
+    if None in expiries:
+        return MIN_REFRESH_SECONDS
+    return min(max(min(expiries) - time.time(), MIN_REFRESH_SECONDS), MAX_REFRESH_SECONDS)
+
+def _run_prefetcher(timezone):
+    # Serve the archived windows until the first fetch completes
+    for zone in PRICE_SOURCES:
+        fallback_data = get_fallback_data(zone)
+        if fallback_data and 'prices' in fallback_data:
+            _set_warm(zone, fallback_data, 'fallback')
+
+    while True:
+        try:
+            # Zones whose cache is still fresh are answered from disk without an upstream request
+            for zone, api_data in get_all_market_prices(timezone).items():
+                if api_data['success']:
+                    _set_warm(zone, api_data, 'api')
+        except Exception:
+            # Never let a single failed refresh stop the scheduler
+            pass
+        time.sleep(_seconds_until_refresh())
+
+def start_prefetcher(timezone):
+    """
+    Starts the background thread that refreshes the shared price caches as soon as they expire
+    (right after each day-ahead publication) and keeps a warm in-memory copy for page loads.
+    Safe to call repeatedly; a new thread is started in each forked worker process.
+    """
+    with _prefetcher_lock:
+        if _prefetcher['pid'] == os.getpid() and _prefetcher['thread'].is_alive():
+            return
+        thread = threading.Thread(target=_run_prefetcher, args=(timezone,), name='price-prefetcher', daemon=True)
+        _prefetcher['pid'], _prefetcher['thread'], _prefetcher['timezone'] = os.getpid(), thread, timezone
+        thread.start()
+
+def get_warm_prices(zone=DEFAULT_ZONE):
+    """
+    Returns (series, source) for the zone's prices held in memory, without touching disk or network.
+    series is a PriceSeries view of the slots that have not started yet; source is 'api' for fresh
+    prices and 'fallback' for archived ones. (None, None) if nothing has been loaded yet.
+    """
+    if _prefetcher['timezone'] is not None:
+        # After a fork only the parent's thread exists; make sure this worker has its own
+        start_prefetcher(_prefetcher['timezone'])
+
+    with _warm_lock:
+        warm = _warm.get(zone)
+    if warm is None:
+        return None, None
+    series = warm['series'].since(datetime.now(dt_timezone.utc))
+    if len(series) == 0:
+        return None, None
+    return series, warm['source']
@@ -1,23 +1,46 @@
-import requests
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
+import os
 import json
 
-API_URL = "https://api.awattar.de/v1/marketdata"
-FALLBACK_FILE = "data/last_prices.json"
+from utils.file_lock import write_json_atomic
+from utils.http_client import get_json
+from utils.price_archive import append_prices, query_prices
+from utils.zones import DEFAULT_ZONE, zone_path
+from utils.lazy_import import lazy_import
 
-def fetch_market_prices(timezone):
+requests = lazy_import('requests')
+pd = lazy_import('pandas')
+
+# Endpoints can be overridden, e.g. to point every worker at a local stand-in during load tests.
+API_URL = os.environ.get('GRIDAWARE_AWATTAR_URL', "https://api.awattar.de/v1/marketdata")
+AT_API_URL = os.environ.get('GRIDAWARE_AWATTAR_AT_URL', "https://api.awattar.at/v1/marketdata")
+# Describes the most recent successful fetch; the prices themselves live in the archive.
+FALLBACK_META_FILE = "data/last_fetch.json"
+# Fallback of versions before the archive: the whole last fetch of the default zone as JSON.
+# It is imported into the archive once, if the fallback is needed before any fetch succeeded.
+LEGACY_FALLBACK_FILE = "data/last_prices.json"
+# Day-ahead prices are never published more than a day in advance, so two days covers them all.
+FETCH_HORIZON = timedelta(days=2)
+
+def fetch_market_prices(timezone, start=None, end=None, url=None):
     """
-    Fetches latest hourly electricity prices from the Awattar API.
-    Returns a dictionary with success status and JSON-serializable data.
+    Fetches latest electricity prices from the Awattar API (API_URL unless another endpoint,
+    e.g. AT_API_URL, is given).
+    Only slots in [start, end) (aware datetimes) are requested; by default from the current hour
+    up to FETCH_HORIZON ahead. The slot resolution (e.g. 60 or 15 minutes) is taken from the data.
+    Returns a dictionary with success status and JSON-serializable data. If the range holds no
+    future prices, the failure result carries 'no_data': True.
     """
     try:
-        response = requests.get(API_URL)
-        response.raise_for_status()
+        if start is None:
+            start = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+        if end is None:
+            end = start + FETCH_HORIZON
+        params = {'start': int(start.timestamp() * 1000), 'end': int(end.timestamp() * 1000)}
 
-        data = response.json()['data']
+        data = get_json(url or API_URL, params=params)['data']
         if not data:
-            return {'success': False, 'error': "API returned no data."}
+            return {'success': False, 'no_data': True, 'error': "API returned no data."}
 
         df = pd.DataFrame(data)
 
@@ -25,13 +48,21 @@ def fetch_market_prices(timezone):
         df['price_eur_kwh'] = df['marketprice'] / 1000
         df['start_time'] = pd.to_datetime(df['start_timestamp'], unit='ms', utc=True)
 
-        # Sort by time and select future prices
+        # Sort by time and determine the slot length of the series
         df = df.sort_values('start_time').reset_index(drop=True)
+        if 'end_timestamp' in df:
+            resolution_minutes = int(round((df['end_timestamp'] - df['start_timestamp']).median() / 60000))
+        elif len(df) > 1:
+            resolution_minutes = int(round(df['start_timestamp'].diff().median() / 60000))
+        else:
+            resolution_minutes = 60
+
+        # Select future prices
         now_utc = datetime.utcnow().replace(tzinfo=pd.Timestamp.utcnow().tz)
         df = df[df['start_time'] >= now_utc].copy()
 
         if df.empty:
-            return {'success': False, 'error': "No future price data available."}
+            return {'success': False, 'no_data': True, 'error': "No future price data available."}
 
         # Create a list of dictionaries that is safe for JSON serialization.
         # Convert Timestamp objects to ISO format strings.
@@ -43,6 +74,7 @@ def fetch_market_prices(timezone):
         return {
             'success': True,
             'prices': prices_for_store, # This is a JSON-serializable list of dicts
+            'resolution_minutes': resolution_minutes,
             'timestamp': datetime.now(timezone).strftime('%Y-%m-%d %H:%M:%S %Z')
         }
 
@@ -51,19 +83,64 @@ def fetch_market_prices(timezone):
     except (KeyError, ValueError) as e:
         return {'success': False, 'error': f"Data processing error: {e}"}
 
-def save_fallback_data(api_data):
-    """Saves the successfully fetched data to a local JSON file."""
+def save_fallback_data(api_data, zone=DEFAULT_ZONE):
+    """
+    Appends the successfully fetched prices to the zone's price archive and records
+    which window was fetched last, so the fallback path can serve it again.
+    """
     try:
-        with open(FALLBACK_FILE, 'w') as f:
-            # The data is already serializable, so we can dump it directly.
-            json.dump(api_data, f)
+        append_prices(api_data['prices'], api_data.get('resolution_minutes', 60), zone)
+        write_json_atomic(zone_path(FALLBACK_META_FILE, zone), {
+            'timestamp': api_data.get('timestamp'),
+            'resolution_minutes': api_data.get('resolution_minutes', 60),
+            'window_start': api_data['prices'][0]['start_time']
+        })
     except IOError:
         pass
 
-def get_fallback_data():
-    """Reads the last known data from the local JSON file."""
+def import_legacy_fallback():
+    """
+    Moves the prices of LEGACY_FALLBACK_FILE into the default zone's archive, unless a fetch
+    has already been recorded there. Returns True if they were imported.
+    """
+    if os.path.exists(FALLBACK_META_FILE):
+        return False
+    try:
+        with open(LEGACY_FALLBACK_FILE, 'r') as f:
+            legacy_data = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return False
+    if not isinstance(legacy_data, dict) or not legacy_data.get('success') or not legacy_data.get('prices'):
+        return False
+    try:
+        save_fallback_data(legacy_data, DEFAULT_ZONE)
+    except (KeyError, TypeError, ValueError):
+        return False
+    return os.path.exists(FALLBACK_META_FILE)
+
+def get_fallback_data(zone=DEFAULT_ZONE):
+    """
+    Reads the last fetched window of a zone from its price archive. Only the records from the
+    start of that window onwards are read; older history stays on disk.
+    """
+    if zone == DEFAULT_ZONE:
+        import_legacy_fallback()
     try:
-        with open(FALLBACK_FILE, 'r') as f:
-            return json.load(f)
+        with open(zone_path(FALLBACK_META_FILE, zone), 'r') as f:
+            meta = json.load(f)
     except (IOError, json.JSONDecodeError):
-        return None
\ No newline at end of file
+        return None
+
+    df = query_prices(start_time=meta['window_start'], zone=zone)
+    if df.empty:
+        return None
+    return {
+        'success': True,
+        'prices': [{
+            'start_time': ts.isoformat(),
+            'price_eur_kwh': price
+        } for ts, price in zip(df['start_time'], df['price_eur_kwh'])],
+        'resolution_minutes': meta.get('resolution_minutes', 60),
+        'timestamp': meta.get('timestamp'),
+        'zone': zone
+    }
@@ -0,0 +1,92 @@
+import os
+
+from utils.file_lock import file_lock
+from utils.zones import DEFAULT_ZONE, zone_path
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Constants ---
+# Fixed-width binary records, appended in time order. The file can be memory-mapped and
+# searched with a binary search, so range queries never load the whole history.
+# Each bidding zone has its own archive (see zone_path).
+ARCHIVE_FILE = "data/price_archive.bin"
+ARCHIVE_LOCK_FILE = "data/price_archive.lock"
+RECORD_DTYPE = [
+    ('start_s', '<i8'),     # Slot start as UTC epoch seconds
+    ('duration_s', '<i4'),  # Slot length in seconds (3600 for hourly, 900 for 15-minute prices)
+    ('price', '<f8')        # Price in €/kWh
+]
+RECORD_SIZE = 8 + 4 + 8  # Packed, as np.dtype(RECORD_DTYPE).itemsize
+
+def _to_epoch_seconds(value):
+    return int(pd.Timestamp(value).timestamp())
+
+def _record_count(size):
+    return size // RECORD_SIZE
+
+def open_archive(zone=DEFAULT_ZONE):
+    """Returns all archived records of a zone as a read-only memory map (an empty array if there are none)."""
+    archive_file = zone_path(ARCHIVE_FILE, zone)
+    try:
+        count = _record_count(os.path.getsize(archive_file))
+    except OSError:
+        count = 0
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(archive_file, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+def append_prices(prices, resolution_minutes=60, zone=DEFAULT_ZONE):
+    """
+    Appends price slots ({'start_time': iso, 'price_eur_kwh': float} dicts) to the archive.
+    Only slots newer than the last archived slot are written, so repeated fetches of the same
+    day never produce duplicates. Returns the number of records added.
+    """
+    records = np.array(
+        [(_to_epoch_seconds(p['start_time']), resolution_minutes * 60, p['price_eur_kwh']) for p in prices],
+        dtype=RECORD_DTYPE
+    )
+    records = np.unique(records)  # Sorts by start time and drops exact repeats
+
+    archive_file = zone_path(ARCHIVE_FILE, zone)
+    os.makedirs(os.path.dirname(archive_file) or '.', exist_ok=True)
+    with file_lock(zone_path(ARCHIVE_LOCK_FILE, zone)):
+        with open(archive_file, 'ab+') as f:
+            size = f.seek(0, os.SEEK_END)
+            complete_size = _record_count(size) * RECORD_SIZE
+            if complete_size != size:
+                # Drop a partially written record left behind by an interrupted append
+                f.truncate(complete_size)
+            if complete_size:
+                f.seek(complete_size - RECORD_SIZE)
+                last_start = np.frombuffer(f.read(RECORD_SIZE), dtype=RECORD_DTYPE)['start_s'][0]
+                records = records[records['start_s'] > last_start]
+            # Keep only the first record per start time
+            records = records[np.concatenate(([True], np.diff(records['start_s']) > 0))] if len(records) else records
+            f.seek(0, os.SEEK_END)
+            f.write(records.tobytes())
+    return len(records)
+
+def query_prices(start_time=None, end_time=None, zone=DEFAULT_ZONE):
+    """
+    Returns archived prices with start_time in [start_time, end_time) as a DataFrame with
+    'start_time' (UTC) and 'price_eur_kwh' columns. Either bound may be None.
+    """
+    archive = open_archive(zone)
+    starts = archive['start_s']
+    first = 0 if start_time is None else int(np.searchsorted(starts, _to_epoch_seconds(start_time), side='left'))
+    last = len(archive) if end_time is None else int(np.searchsorted(starts, _to_epoch_seconds(end_time), side='left'))
+    window = np.array(archive[first:last])
+    return pd.DataFrame({
+        'start_time': pd.to_datetime(window['start_s'], unit='s', utc=True),
+        'price_eur_kwh': window['price']
+    })
+
+def archive_bounds(zone=DEFAULT_ZONE):
+    """Returns (first_start, last_start) of a zone's archive as UTC datetimes, or None if it is empty."""
+    archive = open_archive(zone)
+    if len(archive) == 0:
+        return None
+    return (pd.Timestamp(int(archive['start_s'][0]), unit='s', tz='UTC').to_pydatetime(),
+            pd.Timestamp(int(archive['start_s'][-1]), unit='s', tz='UTC').to_pydatetime())
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytz
+
+from utils.file_lock import file_lock, write_json_atomic
+from utils.price_api import save_fallback_data
+from utils.price_sources import fetch_zone_prices, PRICE_SOURCES
+from utils.zones import DEFAULT_ZONE, zone_path
+
+# --- Constants ---
+# The cache lives on local disk so that every Gunicorn worker on the host shares it.
+# Each zone has its own cache and lock file (see zone_path), so zones refresh independently.
+CACHE_FILE = "data/price_cache.json"
+LOCK_FILE = "data/price_cache.lock"
+
+# Awattar publishes next-day prices after the EPEX day-ahead auction (results ~12:45 CET).
+PUBLICATION_TIMEZONE = pytz.timezone('Europe/Berlin')
+PUBLICATION_HOUR = 14
+PUBLICATION_GRACE_MINUTES = 5
+# How long to wait before asking again when the new day has not been published yet.
+UNPUBLISHED_RETRY_SECONDS = 15 * 60
+# After a failed fetch the source is not asked again for this long, so an upstream outage is not
+# hammered by every session. The last good prices keep being served in the meantime.
+FAILURE_TTL_SECONDS = 60
+
+# Per-process copy of each zone's cache file, reused as long as the file has not changed on disk.
+_memo = {}
+_memo_lock = threading.Lock()
+
+def next_publication_time(now_utc):
+    """Returns the next day-ahead publication time (as an aware UTC datetime) after now_utc."""
+    local_now = now_utc.astimezone(PUBLICATION_TIMEZONE)
+    naive_publication = datetime(local_now.year, local_now.month, local_now.day,
+                                 PUBLICATION_HOUR, PUBLICATION_GRACE_MINUTES)
+    publication = PUBLICATION_TIMEZONE.localize(naive_publication)
+    if publication <= local_now:
+        publication = PUBLICATION_TIMEZONE.localize(naive_publication + timedelta(days=1))
+    return publication.astimezone(dt_timezone.utc)
+
+def compute_expiry(api_data, now_utc):
+    """
+    Decides until when a fetch result may be served from the cache.
+    Successful results stay valid until the next publication, unless the fetch happened
+    after today's publication time but tomorrow's prices were still missing.
+    """
+    last_start = max(datetime.fromisoformat(p['start_time']) for p in api_data['prices'])
+    local_now = now_utc.astimezone(PUBLICATION_TIMEZONE)
+    todays_publication = PUBLICATION_TIMEZONE.localize(
+        datetime(local_now.year, local_now.month, local_now.day, PUBLICATION_HOUR, PUBLICATION_GRACE_MINUTES)
+    )
+    tomorrow_start = PUBLICATION_TIMEZONE.localize(
+        datetime(local_now.year, local_now.month, local_now.day) + timedelta(days=1)
+    )
+    if local_now >= todays_publication and last_start < tomorrow_start:
+        return now_utc + timedelta(seconds=UNPUBLISHED_RETRY_SECONDS)
+    return next_publication_time(now_utc)
+
+def _read_entry(zone=DEFAULT_ZONE):
+    """Reads a zone's shared cache entry, reusing the parsed copy while the file is unchanged."""
+    cache_file = zone_path(CACHE_FILE, zone)
+    try:
+        mtime = os.stat(cache_file).st_mtime_ns
+    except OSError:
+        return None
+    with _memo_lock:
+        memo = _memo.get(zone)
+        if memo is not None and memo['mtime'] == mtime:
+            return memo['entry']
+    try:
+        with open(cache_file, 'r') as f:
+            entry = json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return None
+    with _memo_lock:
+        _memo[zone] = {'mtime': mtime, 'entry': entry}
+    return entry
+
+def _retry_at(entry):
+    """Epoch timestamp before which the source is not asked again: the expiry of the last good
+    prices, or the end of the back-off after a failed fetch, whichever is later."""
+    return max(entry.get('expires_at', 0), entry.get('failed_at', 0) + FAILURE_TTL_SECONDS)
+
+def read_cache_expiry(zone=DEFAULT_ZONE):
+    """Returns when a zone's shared cache entry is next refreshed as an epoch timestamp, or None if there is none."""
+    entry = _read_entry(zone)
+    return _retry_at(entry) if entry else None
+
+def _is_fresh(entry):
+    return entry is not None and _retry_at(entry) > time.time()
+
+def future_prices_only(api_data):
+    """Drops slots that have started since the data was fetched, mirroring fetch_market_prices."""
+    if not api_data.get('success'):
+        return api_data
+
+    now_utc = datetime.now(dt_timezone.utc)
+    prices = [p for p in api_data['prices'] if datetime.fromisoformat(p['start_time']) >= now_utc]
+    if not prices:
+        return {'success': False, 'error': "No future price data available."}
+    return {**api_data, 'prices': prices}
+
+def _serve(entry):
+    """The future slots of an entry's last good prices, or its latest failure if none are left."""
+    data = future_prices_only(entry['data']) if 'data' in entry else entry['failure']
+    if not data['success'] and 'failure' in entry:
+        return entry['failure']
+    return data
+
+def _fetch_missing_slots(timezone, entry, zone):
+    """
+    Refreshes an expired entry. If the cached series still has future slots, only the range after
+    its last slot is requested from the zone's source and appended; otherwise the full window is fetched.
+    """
+    previous = future_prices_only(entry['data']) if entry and 'data' in entry else {'success': False}
+    if not previous['success']:
+        return fetch_zone_prices(zone, timezone)
+
+    last_slot = previous['prices'][-1]
+    resolution = timedelta(minutes=previous.get('resolution_minutes', 60))
+    new_data = fetch_zone_prices(zone, timezone, start=datetime.fromisoformat(last_slot['start_time']) + resolution)
+    if new_data['success']:
+        return {**new_data, 'prices': previous['prices'] + new_data['prices']}
+    if new_data.get('no_data'):
+        # Nothing new has been published yet; keep serving what we have
+        return {**previous, 'timestamp': datetime.now(timezone).strftime('%Y-%m-%d %H:%M:%S %Z')}
+    return new_data
+
+def get_market_prices(timezone, zone=DEFAULT_ZONE):
+    """
+    Returns market prices of a zone in the same format as fetch_market_prices, served from a
+    cache shared by all worker processes. The zone's source is only queried once the cached
+    copy has expired, and concurrent misses are collapsed into a single upstream request.
+    A failed fetch keeps the last good prices and only records when it failed, so they are
+    served (while they still have future slots) until the back-off has passed. While another
+    thread or worker is refreshing an expired entry, its previous contents are served instead
+    of waiting for the upstream request; only a cold cache waits for it.
+    """
+    entry = _read_entry(zone)
+    if _is_fresh(entry):
+        return _serve(entry)
+
+    with file_lock(zone_path(LOCK_FILE, zone), blocking=entry is None) as acquired:
+        if not acquired:
+            return _serve(entry)
+        # Another thread or worker may have refreshed the cache while we waited for the lock.
+        entry = _read_entry(zone)
+        if _is_fresh(entry):
+            return _serve(entry)
+
+        api_data = _fetch_missing_slots(timezone, entry, zone)
+        now_utc = datetime.now(dt_timezone.utc)
+        if api_data['success']:
+            entry = {
+                'data': api_data,
+                'fetched_at': now_utc.timestamp(),
+                'expires_at': compute_expiry(api_data, now_utc).timestamp()
+            }
+        else:
+            entry = {**(entry or {}), 'failure': api_data, 'failed_at': now_utc.timestamp()}
+        write_json_atomic(zone_path(CACHE_FILE, zone), entry)
+        if api_data['success']:
+            save_fallback_data(api_data, zone)
+
+    return _serve(entry)
+
+def get_all_market_prices(timezone, zones=None):
+    """
+    Returns {zone: get_market_prices result} for the given zones (default: all registered ones).
+    Zones are refreshed concurrently, so one slow or failing provider does not hold up the others.
+    """
+    zones = list(zones or PRICE_SOURCES)
+    with ThreadPoolExecutor(max_workers=len(zones), thread_name_prefix='price-zone') as executor:
+        futures = {zone: executor.submit(get_market_prices, timezone, zone) for zone in zones}
+    results = {}
+    for zone, future in futures.items():
+        try:
+            results[zone] = future.result()
+        except (IOError, OSError) as e:
+            results[zone] = {'success': False, 'error': f"Cache error: {e}"}
+    return results
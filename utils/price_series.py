@@ -0,0 +1,157 @@
+import hashlib
+
+from utils.lru_cache import LRUCache
+from utils.zones import DEFAULT_ZONE
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Constants ---
+# Prices are compared and hashed in units of 1e-5 €/kWh (0.01 €/MWh, Awattar's precision).
+PRICE_SCALE = 100_000
+# Distinct series kept per process, so every consumer of a data version shares one instance
+# (and its cached time indexes).
+INTERNED_SERIES = 16
+
+_interned = LRUCache(INTERNED_SERIES)
+
+def quantize_prices(prices):
+    # NaN has no integer value; callers that may see missing prices mask them first
+    return np.rint(np.asarray(prices, dtype=float) * PRICE_SCALE).astype(np.int64)
+
+def _read_only(values, dtype):
+    # Copied, so later changes to the caller's array or DataFrame cannot reach the series
+    owned = np.array(values, dtype=dtype, copy=True)
+    owned.flags.writeable = False
+    return owned
+
+class PriceSeries:
+    """
+    Immutable price series: sorted UTC start times as epoch seconds, prices in €/kWh as floats
+    and metadata of the fetch. Both arrays are read-only, so a series can be shared by every
+    session and thread. The pandas index and local-time labels are built on first use and
+    carried over to slices.
+    """
+    __slots__ = ('epoch_s', 'prices', 'resolution_minutes', 'timestamp', 'zone',
+                 '_version', '_start_times', '_local_labels')
+
+    def __init__(self, epoch_s, prices, resolution_minutes=60, timestamp=None, zone=DEFAULT_ZONE):
+        epoch_s = np.asarray(epoch_s, dtype=np.int64)
+        prices = np.asarray(prices, dtype=float)
+        if len(epoch_s) > 1 and np.any(epoch_s[1:] < epoch_s[:-1]):
+            order = np.argsort(epoch_s, kind='stable')
+            epoch_s, prices = epoch_s[order], prices[order]
+        self._init(_read_only(epoch_s, np.int64), _read_only(prices, float), resolution_minutes, timestamp, zone)
+
+    def _init(self, epoch_s, prices, resolution_minutes, timestamp, zone, start_times=None, local_labels=None):
+        set_slot = object.__setattr__
+        set_slot(self, 'epoch_s', epoch_s)
+        set_slot(self, 'prices', prices)
+        set_slot(self, 'resolution_minutes', resolution_minutes)
+        set_slot(self, 'timestamp', timestamp)
+        set_slot(self, 'zone', zone)
+        set_slot(self, '_version', None)
+        set_slot(self, '_start_times', start_times)
+        set_slot(self, '_local_labels', local_labels or {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PriceSeries is immutable.")
+
+    def __len__(self):
+        return len(self.epoch_s)
+
+    def __reduce__(self):
+        # Rebuilt from the arrays when sent to another process; the cached indexes are not sent
+        return (PriceSeries, (self.epoch_s, self.prices, self.resolution_minutes, self.timestamp, self.zone))
+
+    # --- Constructors ---
+
+    @classmethod
+    def from_api_data(cls, api_data):
+        """Parses fetch results ({'prices': [{'start_time', 'price_eur_kwh'}, ...], ...})."""
+        prices = api_data['prices']
+        start_times = pd.to_datetime([p['start_time'] for p in prices], format='ISO8601', utc=True)
+        return cls(
+            pd.DatetimeIndex(start_times).asi8 // 10**9,
+            np.fromiter((p['price_eur_kwh'] for p in prices), dtype=float, count=len(prices)),
+            api_data.get('resolution_minutes', 60), api_data.get('timestamp'), api_data.get('zone', DEFAULT_ZONE)
+        )
+
+    @classmethod
+    def from_frame(cls, price_df, resolution_minutes=60):
+        """Builds a series from a DataFrame with 'start_time' and 'price_eur_kwh' columns."""
+        start_times = pd.DatetimeIndex(pd.to_datetime(price_df['start_time'], format='ISO8601', utc=True))
+        return cls(start_times.asi8 // 10**9, price_df['price_eur_kwh'], resolution_minutes)
+
+    # --- Derived Views ---
+
+    @property
+    def version(self):
+        """Content hash of the series, used to key caches shared by every session."""
+        if self._version is None:
+            digest = hashlib.sha1(self.epoch_s.astype('<i8').tobytes())
+            missing = np.isnan(self.prices)
+            digest.update(quantize_prices(np.where(missing, 0.0, self.prices)).astype('<i8').tobytes())
+            if missing.any():
+                digest.update(np.packbits(missing).tobytes())
+            digest.update(str(self.resolution_minutes).encode('ascii'))
+            object.__setattr__(self, '_version', digest.hexdigest()[:16])
+        return self._version
+
+    @property
+    def start_times(self):
+        """Start times as a UTC DatetimeIndex."""
+        if self._start_times is None:
+            object.__setattr__(self, '_start_times', pd.DatetimeIndex(pd.to_datetime(self.epoch_s, unit='s', utc=True)))
+        return self._start_times
+
+    def local_labels(self, timezone):
+        """Start times as 'YYYY-MM-DD HH:MM' strings in the given timezone."""
+        key = str(timezone)
+        labels = self._local_labels.get(key)
+        if labels is None:
+            local_times = self.start_times.tz_convert(timezone).tz_localize(None).to_numpy(dtype='datetime64[m]')
+            labels = np.char.replace(np.datetime_as_string(local_times, unit='m'), 'T', ' ')
+            labels.flags.writeable = False
+            self._local_labels[key] = labels
+        return labels
+
+    def slice(self, start=None, stop=None):
+        """Slots [start:stop) as a new series sharing this series' arrays and cached indexes."""
+        window = slice(start, stop)
+        start_times = self._start_times[window] if self._start_times is not None else None
+        local_labels = {key: labels[window] for key, labels in self._local_labels.items()}
+        sliced = object.__new__(PriceSeries)
+        sliced._init(self.epoch_s[window], self.prices[window], self.resolution_minutes, self.timestamp,
+                     self.zone, start_times, local_labels)
+        return sliced
+
+    def since(self, time):
+        """Slots starting at or after time (an aware datetime, Timestamp or ISO string)."""
+        return self.slice(int(np.searchsorted(self.epoch_s, pd.Timestamp(time).timestamp(), side='left')))
+
+    def after(self, time):
+        """Slots starting strictly after time."""
+        return self.slice(int(np.searchsorted(self.epoch_s, pd.Timestamp(time).timestamp(), side='right')))
+
+    def to_records(self):
+        """JSON-ready [{'start_time', 'price_eur_kwh'}, ...] in the format of fetch_market_prices."""
+        return [{'start_time': ts.isoformat(), 'price_eur_kwh': float(price)}
+                for ts, price in zip(self.start_times, self.prices)]
+
+    def to_frame(self):
+        return pd.DataFrame({'start_time': self.start_times, 'price_eur_kwh': self.prices})
+
+def as_price_series(price_data):
+    """Returns price_data unchanged if it is a PriceSeries, otherwise parses it as a DataFrame."""
+    if isinstance(price_data, PriceSeries):
+        return price_data
+    return PriceSeries.from_frame(price_data)
+
+def intern_series(series):
+    """
+    Returns the process-wide instance for series' data version, so the indexes it builds are
+    computed once per version rather than once per caller.
+    """
+    return _interned.get_or_create((series.version, series.timestamp, series.zone), lambda: series)
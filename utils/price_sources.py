@@ -0,0 +1,82 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from utils.price_api import fetch_market_prices, AT_API_URL
+from utils.zones import DEFAULT_ZONE
+from utils.lazy_import import lazy_import
+
+pd = lazy_import('pandas')
+
+# --- Constants ---
+# A CSV (start_time, price_eur_kwh) or JSON file with the same columns; when set, it is offered
+# as an additional zone, e.g. for tariffs that no public API covers or for offline demos.
+PRICE_FILE_ENV = 'GRIDAWARE_PRICE_FILE'
+FILE_ZONE = 'FILE'
+
+# zone -> {'label': str, 'fetch': fetch(timezone, start, end) -> fetch_market_prices-style result}
+PRICE_SOURCES = {}
+
+def register_price_source(zone, label, fetch):
+    """Makes a price source selectable under the given zone code."""
+    PRICE_SOURCES[zone] = {'label': label, 'fetch': fetch}
+
+def list_zones():
+    """Returns [(zone, label)] of all registered price sources, in registration order."""
+    return [(zone, source['label']) for zone, source in PRICE_SOURCES.items()]
+
+def zone_label(zone):
+    source = PRICE_SOURCES.get(zone)
+    return source['label'] if source else zone
+
+def check_zone(zone):
+    if not isinstance(zone, str) or zone not in PRICE_SOURCES:
+        raise ValueError(f"Unknown zone '{zone}'. Expected one of: {', '.join(PRICE_SOURCES)}.")
+
+def fetch_zone_prices(zone, timezone, start=None, end=None):
+    """Fetches prices for one zone from its source; successful results carry the zone code."""
+    api_data = PRICE_SOURCES[zone]['fetch'](timezone, start, end)
+    if api_data['success']:
+        api_data['zone'] = zone
+    return api_data
+
+# --- Sources ---
+
+def fetch_file_prices(path, timezone, start=None, end=None):
+    """
+    Reads prices from a local CSV or JSON file in the same format as fetch_market_prices.
+    start_time values must carry a UTC offset; prices are in €/kWh.
+    """
+    try:
+        if path.endswith('.json'):
+            df = pd.read_json(path)
+        else:
+            df = pd.read_csv(path)
+        df['start_time'] = pd.to_datetime(df['start_time'], format='ISO8601', utc=True)
+        df = df.sort_values('start_time').reset_index(drop=True)
+        resolution_minutes = int(round(df['start_time'].diff().median().total_seconds() / 60)) if len(df) > 1 else 60
+
+        df = df[df['start_time'] >= (start or datetime.now(dt_timezone.utc))]
+        if end is not None:
+            df = df[df['start_time'] < end]
+        if df.empty:
+            return {'success': False, 'no_data': True, 'error': "No future price data available."}
+
+        return {
+            'success': True,
+            'prices': [{
+                'start_time': ts.isoformat(),
+                'price_eur_kwh': float(price)
+            } for ts, price in zip(df['start_time'], df['price_eur_kwh'])],
+            'resolution_minutes': resolution_minutes,
+            'timestamp': datetime.now(timezone).strftime('%Y-%m-%d %H:%M:%S %Z')
+        }
+    except (IOError, KeyError, ValueError) as e:
+        return {'success': False, 'error': f"Could not read price file: {e}"}
+
+register_price_source(DEFAULT_ZONE, "Awattar Germany (DE-LU)", fetch_market_prices)
+register_price_source('AT', "Awattar Austria (AT)",
+                      lambda timezone, start, end: fetch_market_prices(timezone, start, end, url=AT_API_URL))
+
+if os.environ.get(PRICE_FILE_ENV):
+    register_price_source(FILE_ZONE, f"Local file ({os.path.basename(os.environ[PRICE_FILE_ENV])})",
+                          lambda timezone, start, end: fetch_file_prices(os.environ[PRICE_FILE_ENV], timezone, start, end))
@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from utils.file_lock import write_json_atomic
+
+# --- Constants ---
+# Analysis results stay on the server; the browser only holds the key of its current result.
+# Records are files on local disk, so any worker process on the host can resolve a key.
+# Keys are derived from the inputs, so a result is reused by every session, tab and page
+# reload that asks for the same analysis.
+RESULT_DIR = "data/results"
+RESULT_TTL_SECONDS = 6 * 60 * 60
+# Expired records are deleted by put_result, at most once per interval.
+SWEEP_INTERVAL_SECONDS = 10 * 60
+KEY_LENGTH = 24
+
+_stats = {'hits': 0, 'misses': 0, 'last_sweep': 0.0}
+_stats_lock = threading.Lock()
+
+def result_key(*parts):
+    """Key for the result of the given (JSON-serializable) inputs; the same in every process."""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:KEY_LENGTH]
+
+def _record_path(key):
+    return os.path.join(RESULT_DIR, f"{key}.json")
+
+def _valid_key(key):
+    return isinstance(key, str) and len(key) == KEY_LENGTH and all(c in '0123456789abcdef' for c in key)
+
+def _sweep_expired():
+    now = time.time()
+    with _stats_lock:
+        if now - _stats['last_sweep'] < SWEEP_INTERVAL_SECONDS:
+            return
+        _stats['last_sweep'] = now
+    try:
+        names = os.listdir(RESULT_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(RESULT_DIR, name)
+        try:
+            if os.path.getmtime(path) + RESULT_TTL_SECONDS < now:
+                os.remove(path)
+        except OSError:
+            pass
+
+def put_result(key, record):
+    """Stores a JSON-ready record under key for RESULT_TTL_SECONDS."""
+    write_json_atomic(_record_path(key), record)
+    _sweep_expired()
+
+def get_result(key):
+    """The record stored under key, or None if the key is unknown, malformed or expired."""
+    record = None
+    if _valid_key(key):
+        path = _record_path(key)
+        try:
+            if os.path.getmtime(path) + RESULT_TTL_SECONDS >= time.time():
+                with open(path) as f:
+                    record = json.load(f)
+        except (IOError, ValueError):
+            record = None
+    with _stats_lock:
+        _stats['hits' if record is not None else 'misses'] += 1
+    return record
+
+def result_store_stats():
+    """Records on disk and this process's hit/miss counters, in the format of LRUCache.stats."""
+    try:
+        size = sum(1 for name in os.listdir(RESULT_DIR) if name.endswith('.json'))
+    except FileNotFoundError:
+        size = 0
+    with _stats_lock:
+        return {'size': size, 'maxsize': None, 'hits': _stats['hits'], 'misses': _stats['misses']}
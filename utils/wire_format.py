@@ -0,0 +1,203 @@
+import json
+import base64
+from utils.price_series import PriceSeries, PRICE_SCALE, intern_series, quantize_prices
+from utils.zones import DEFAULT_ZONE
+from utils.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# --- Constants ---
+# Compact encodings for the dcc.Store payloads exchanged with the browser.
+# Timestamps are sent as a base epoch plus a fixed step; explicit offsets are only
+# included for irregular series.
+WIRE_FORMAT_VERSION = 1
+# Prices are sent as integer deltas in units of PRICE_SCALE (0.01 €/MWh, Awattar's precision).
+# Integer lists stay short in JSON and can be extended in place with a Dash Patch. Missing
+# prices (NaN, e.g. blank cells in a price file) are sent as null and skipped by the deltas.
+
+def _to_epoch_seconds(start_times):
+    return pd.DatetimeIndex(pd.to_datetime(start_times, format='ISO8601', utc=True)).asi8 // 10**9
+
+def _encode_time_axis(epoch_s, step_s):
+    axis = {'t0': int(epoch_s[0]) if len(epoch_s) else 0, 'step': int(step_s)}
+    if len(epoch_s) > 1 and np.any(np.diff(epoch_s) != step_s):
+        axis['offsets_s'] = (epoch_s - epoch_s[0]).tolist()
+    return axis
+
+def _decode_time_axis(encoded, count):
+    if 'offsets_s' in encoded:
+        offsets = np.asarray(encoded['offsets_s'], dtype=np.int64)
+    else:
+        offsets = np.arange(count, dtype=np.int64) * encoded['step']
+    return pd.to_datetime(encoded['t0'] + offsets, unit='s', utc=True)
+
+def encode_float32(values):
+    """Packs floats as base64-encoded little-endian float32 (about 5.3 characters per value)."""
+    return base64.b64encode(np.asarray(values, dtype='<f4').tobytes()).decode('ascii')
+
+def decode_float32(text):
+    return np.frombuffer(base64.b64decode(text), dtype='<f4').astype(float)
+
+def _encode_price_deltas(prices, previous_q=0):
+    """
+    Returns (deltas, last_q): deltas between consecutive known prices, starting from previous_q,
+    with None for missing prices, and the quantized value of the last known price.
+    """
+    known = ~np.isnan(prices)
+    known_q = quantize_prices(prices[known])
+    deltas = np.diff(known_q, prepend=previous_q).tolist()
+    last_q = int(known_q[-1]) if len(known_q) else previous_q
+    if len(deltas) == len(prices):
+        return deltas, last_q
+    known_deltas = iter(deltas)
+    return [next(known_deltas) if is_known else None for is_known in known.tolist()], last_q
+
+def _decode_price_deltas(deltas):
+    if None not in deltas:
+        return np.cumsum(np.asarray(deltas, dtype=np.int64)) / PRICE_SCALE
+    known = np.fromiter((delta is not None for delta in deltas), dtype=bool, count=len(deltas))
+    prices = np.full(len(deltas), np.nan)
+    prices[known] = np.cumsum(np.asarray([delta for delta in deltas if delta is not None], dtype=np.int64)) / PRICE_SCALE
+    return prices
+
+# --- Market Data Store ---
+
+def encode_price_store(series):
+    """Encodes a PriceSeries for market-data-store."""
+    return {
+        'format': WIRE_FORMAT_VERSION,
+        'success': True,
+        'timestamp': series.timestamp,
+        'zone': series.zone,
+        'resolution_minutes': series.resolution_minutes,
+        **_encode_time_axis(series.epoch_s, series.resolution_minutes * 60),
+        'price_deltas': _encode_price_deltas(series.prices)[0]
+    }
+
+def decode_price_store(store):
+    """
+    Rebuilds the PriceSeries held in market-data-store. Sessions sending the same data get the
+    same interned instance.
+    """
+    prices = _decode_price_deltas(store['price_deltas'])
+    if 'offsets_s' in store:
+        epoch_s = store['t0'] + np.asarray(store['offsets_s'], dtype=np.int64)
+    else:
+        epoch_s = store['t0'] + np.arange(len(prices), dtype=np.int64) * store['step']
+    return intern_series(PriceSeries(
+        epoch_s, prices, store.get('resolution_minutes', 60),
+        store.get('timestamp'), store.get('zone', DEFAULT_ZONE)
+    ))
+
+def price_store_version(store, first_new_start=None):
+    """
+    Small summary of market-data-store, kept in its own store so that periodic update checks
+    do not have to send the full series back. first_new_start marks incrementally added slots.
+    """
+    count = len(store['price_deltas'])
+    last_offset = store['offsets_s'][-1] if 'offsets_s' in store else (count - 1) * store['step']
+    return {
+        'zone': store.get('zone', DEFAULT_ZONE),
+        'last_start': pd.Timestamp(store['t0'] + last_offset, unit='s', tz='UTC').isoformat(),
+        'last_price_q': sum(delta for delta in store['price_deltas'] if delta is not None),
+        'step': store['step'],
+        'regular': 'offsets_s' not in store,
+        'first_new_start': first_new_start
+    }
+
+def price_store_extension(version, new_slots):
+    """
+    Returns (price_deltas, new_version) for appending new_slots (a PriceSeries) to a regular
+    market-data-store in place, or (None, None) if they do not continue it at the same step.
+    """
+    epoch_s = new_slots.epoch_s
+    expected_first = _to_epoch_seconds([version['last_start']])[0] + version['step']
+    if not version['regular'] or epoch_s[0] != expected_first or np.any(np.diff(epoch_s) != version['step']):
+        return None, None
+
+    deltas, last_q = _encode_price_deltas(new_slots.prices, version['last_price_q'])
+    new_version = {
+        **version,
+        'last_start': new_slots.start_times[-1].isoformat(),
+        'last_price_q': last_q,
+        'first_new_start': new_slots.start_times[0].isoformat()
+    }
+    return deltas, new_version
+
+# --- Analysis Results ---
+
+def encode_analysis_results(analysis_results):
+    """Encodes engine results (Timestamps, DataFrames) for the server-side result store."""
+    optimal = analysis_results['optimal_slot']
+    all_slots_df = analysis_results['all_slots']
+    epoch_s = _to_epoch_seconds(all_slots_df['start_time'])
+    step_s = int(np.median(np.diff(epoch_s))) if len(epoch_s) > 1 else 3600
+
+    encoded = {
+        'format': WIRE_FORMAT_VERSION,
+        'success': True,
+        'message': analysis_results['message'],
+        'savings_eur': float(analysis_results['savings_eur']),
+        'optimal_slot': {
+            'start_time': optimal['start_time'].isoformat(),
+            'end_time': optimal['end_time'].isoformat(),
+            'total_cost': float(optimal['total_cost']),
+            'duration_hours': float(optimal['duration_hours']),
+            'kwh_needed': float(optimal['kwh_needed'])
+        },
+        'all_slots': {**_encode_time_axis(epoch_s, step_s), 'total_cost': encode_float32(all_slots_df['total_cost'])}
+    }
+
+    if analysis_results.get('charging_slots') is not None:
+        charging_slots_df = analysis_results['charging_slots']
+        encoded['charging_slots'] = {
+            'start_time': [ts.isoformat() for ts in charging_slots_df['start_time']],
+            'end_time': [ts.isoformat() for ts in charging_slots_df['end_time']],
+            'kwh': charging_slots_df['kwh'].astype(float).tolist(),
+            'cost': charging_slots_df['cost'].astype(float).tolist()
+        }
+        encoded['contiguous_start_time'] = analysis_results['contiguous_start_time'].isoformat()
+    if analysis_results.get('departure_time') is not None:
+        encoded['departure_time'] = analysis_results['departure_time'].isoformat()
+    return encoded
+
+def decode_analysis_results(encoded):
+    """Inverse of encode_analysis_results."""
+    costs = decode_float32(encoded['all_slots']['total_cost'])
+    results = {
+        'success': encoded['success'],
+        'message': encoded['message'],
+        'savings_eur': encoded['savings_eur'],
+        'optimal_slot': {
+            **encoded['optimal_slot'],
+            'start_time': pd.Timestamp(encoded['optimal_slot']['start_time']),
+            'end_time': pd.Timestamp(encoded['optimal_slot']['end_time'])
+        },
+        'all_slots': pd.DataFrame({
+            'start_time': _decode_time_axis(encoded['all_slots'], len(costs)),
+            'total_cost': costs
+        })
+    }
+
+    if 'charging_slots' in encoded:
+        charging_slots = encoded['charging_slots']
+        results['charging_slots'] = pd.DataFrame({
+            'start_time': pd.to_datetime(charging_slots['start_time'], format='ISO8601'),
+            'end_time': pd.to_datetime(charging_slots['end_time'], format='ISO8601'),
+            'kwh': charging_slots['kwh'],
+            'cost': charging_slots['cost']
+        })
+        results['contiguous_start_time'] = pd.Timestamp(encoded['contiguous_start_time'])
+    if 'departure_time' in encoded:
+        results['departure_time'] = pd.Timestamp(encoded['departure_time'])
+    return results
+
+def json_ready(value):
+    """
+    Converts Plotly figures, Dash components and Patches (via their to_plotly_json) into plain
+    lists and dicts, e.g. for results kept on disk or sent back from another process. Dash
+    accepts these in place of the original objects as callback outputs.
+    """
+    from plotly.io.json import to_json_plotly
+    return json.loads(to_json_plotly(value))
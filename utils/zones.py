@@ -0,0 +1,13 @@
+import os
+
+# --- Constants ---
+# Bidding zone used when none is selected. Its files keep the original single-zone names,
+# so existing caches and archives stay valid.
+DEFAULT_ZONE = 'DE'
+
+def zone_path(path, zone):
+    """Returns the per-zone variant of a data file path, e.g. data/price_cache_at.json for 'AT'."""
+    if zone == DEFAULT_ZONE:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{zone.lower()}{ext}"
@@ -0,0 +1,6 @@
+# --- WSGI Entry Point ---
+# Module-level Flask server for production servers, e.g. `gunicorn -w 4 --threads 4 wsgi:server`.
+# Each worker process builds its own app (and starts its own price prefetcher).
+from app import create_app
+
+server = create_app().server